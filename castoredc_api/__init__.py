@@ -1,4 +1,11 @@
 """Module containing all relevant modules to interact with Castor EDC database"""
 from .client.castoredc_api_client import CastorClient, CastorException
+from .client.client_metrics import CastorMetrics
+from .client.client_progress import (
+    CastorProgress,
+    TqdmProgress,
+    LoggingProgress,
+    CallbackProgress,
+)
 from .study.castor_study import CastorStudy
 from .importer.import_data import import_data
@@ -0,0 +1,3 @@
+"""Benchmarks of mapping, exporting and importing against a local mock of Castor EDC"""
+from .mock_castor import MockCastor
+from .benchmark import BENCHMARKS, format_results, mock_study, run_benchmarks
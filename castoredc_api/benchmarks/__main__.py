@@ -0,0 +1,62 @@
+"""Runs the benchmarks from the command line, e.g.
+python -m castoredc_api.benchmarks --records 1000 --latency 0.05"""
+import argparse
+import json
+
+from castoredc_api.benchmarks.benchmark import (
+    BENCHMARKS,
+    format_results,
+    run_benchmarks,
+)
+
+
+def main() -> None:
+    """Parses the arguments, runs the benchmarks and prints the results."""
+    parser = argparse.ArgumentParser(
+        description="Benchmarks castoredc_api against a local mock of Castor EDC."
+    )
+    parser.add_argument("--benchmarks", nargs="+", choices=BENCHMARKS)
+    parser.add_argument("--records", type=int, default=100)
+    parser.add_argument("--fields", type=int, default=20)
+    parser.add_argument("--surveys", type=int, default=2)
+    parser.add_argument("--reports", type=int, default=2)
+    parser.add_argument("--instances", type=int, default=2)
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="Seconds per request."
+    )
+    parser.add_argument(
+        "--rate-limit",
+        type=int,
+        help="Requests per endpoint per rate period before answering 429.",
+    )
+    parser.add_argument("--rate-period", type=float, default=600.0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--import-rows", type=int, default=100)
+    parser.add_argument(
+        "--no-memory", action="store_true", help="Skip measuring peak memory."
+    )
+    parser.add_argument("--output", help="Path to write the results to as json.")
+    arguments = parser.parse_args()
+
+    results = run_benchmarks(
+        benchmarks=arguments.benchmarks,
+        repeat=arguments.repeat,
+        memory=not arguments.no_memory,
+        import_rows=arguments.import_rows,
+        records=arguments.records,
+        fields=arguments.fields,
+        surveys=arguments.surveys,
+        reports=arguments.reports,
+        instances=arguments.instances,
+        latency=arguments.latency,
+        rate_limit=arguments.rate_limit,
+        rate_period=arguments.rate_period,
+    )
+    print(format_results(results))
+    if arguments.output is not None:
+        with open(arguments.output, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,255 @@
+"""Module for benchmarking the mapping, export and import of a study offline."""
+import contextlib
+import io
+import os
+import sqlite3
+import statistics
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import httpx
+import pandas as pd
+
+from castoredc_api import CastorClient, CastorException, CastorStudy
+from castoredc_api.benchmarks.mock_castor import MockCastor
+from castoredc_api.importer.import_data import import_data
+
+BENCHMARKS = (
+    "map_structure",
+    "map_data",
+    "export_to_dataframe",
+    "export_to_csv",
+    "export_to_csv_chunked",
+    "export_to_database",
+    "import_data",
+)
+
+
+def mock_study(mock: MockCastor, **kwargs) -> CastorStudy:
+    """Creates a CastorStudy that is connected to the mock instead of Castor EDC.
+    Keyword arguments are passed to the CastorStudy."""
+    study = CastorStudy("", "", mock.study_id, mock.url, test=True, **kwargs)
+    study.client = CastorClient(
+        "MOCK-CLIENT-ID",
+        "MOCK-CLIENT-SECRET",
+        mock.url,
+        metrics=study.metrics,
+        progress=study.progress,
+        transport=mock,
+    )
+    study.client.link_study(mock.study_id)
+    return study
+
+
+def run_benchmarks(
+    benchmarks: Optional[List[str]] = None,
+    *,
+    repeat: int = 3,
+    memory: bool = True,
+    import_rows: int = 100,
+    **mock_options,
+) -> List[Dict]:
+    """Runs the benchmarks repeat times against a MockCastor created with mock_options.
+    Returns a dict per benchmark with the best and median seconds, rows per second,
+    the requests, downloaded bytes and throttled requests of a single run,
+    and with memory the peak memory allocated in an extra run, measured with tracemalloc.
+    Import_data uploads import_rows records, which are sent one by one
+    and count towards the rate limit of the client.
+    Benchmarks that fail on throttled requests get the error instead of timings."""
+    benchmarks = BENCHMARKS if benchmarks is None else benchmarks
+    for benchmark in benchmarks:
+        if benchmark not in BENCHMARKS:
+            raise CastorException(
+                f"{benchmark} is not a benchmark. Choose from {', '.join(BENCHMARKS)}."
+            )
+    mock = MockCastor(**mock_options)
+    results = []
+    with tempfile.TemporaryDirectory() as directory, _working_directory(directory):
+        for benchmark in benchmarks:
+            throttled = mock.throttled
+            try:
+                result = _benchmark(mock, benchmark, repeat, memory, import_rows)
+            except (httpx.HTTPStatusError, CastorException) as error:
+                # The client doesn't retry requests that were throttled
+                if mock.throttled == throttled:
+                    raise
+                result = {
+                    "benchmark": benchmark,
+                    "throttled": mock.throttled - throttled,
+                    "error": str(error).splitlines()[0],
+                }
+            results.append(result)
+    return results
+
+
+def _benchmark(
+    mock: MockCastor, benchmark: str, repeat: int, memory: bool, import_rows: int
+) -> Dict:
+    """Runs a benchmark repeat times, and once more with memory, returns the result."""
+    prepare, run = BENCHMARK_STEPS[benchmark]
+    timings = [_measure(mock, prepare, run, import_rows) for _ in range(repeat)]
+    seconds = [timing["seconds"] for timing in timings]
+    result = dict(
+        timings[-1],
+        benchmark=benchmark,
+        seconds=min(seconds),
+        median_seconds=statistics.median(seconds),
+        rows_per_second=timings[-1]["rows"] / min(seconds) if min(seconds) else None,
+    )
+    if memory:
+        # Tracing memory slows the benchmark down, so it gets a run of its own
+        traced = _measure(mock, prepare, run, import_rows, memory=True)
+        result["peak_memory"] = traced["peak_memory"]
+    return result
+
+
+def _measure(
+    mock: MockCastor,
+    prepare: Callable[[CastorStudy], None],
+    run: Callable[[CastorStudy, MockCastor, int], int],
+    import_rows: int,
+    memory: bool = False,
+) -> Dict:
+    """Runs a benchmark once on a new study, only measuring run.
+    Returns the seconds, rows, requests, downloaded bytes and throttled requests,
+    and with memory the peak memory allocated by run."""
+    study = mock_study(mock)
+    prepare(study)
+    study.metrics.reset()
+    throttled = mock.throttled
+    if memory:
+        tracemalloc.start()
+    try:
+        start = time.perf_counter()
+        rows = run(study, mock, import_rows)
+        seconds = time.perf_counter() - start
+        peak_memory = tracemalloc.get_traced_memory()[1] if memory else None
+    finally:
+        if memory:
+            tracemalloc.stop()
+    report = study.metrics.report()
+    return {
+        "seconds": seconds,
+        "rows": rows,
+        "requests": report["requests"],
+        "bytes_downloaded": report["bytes_downloaded"],
+        "throttled": mock.throttled - throttled,
+        "peak_memory": peak_memory,
+    }
+
+
+@contextlib.contextmanager
+def _working_directory(path: str) -> Iterator[None]:
+    """Changes the working directory, where exports and imports write their output."""
+    previous = os.getcwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(previous)
+
+
+def _map_structure(study: CastorStudy, _mock: MockCastor, _import_rows: int) -> int:
+    """Maps the structure, returns the number of fields."""
+    study.map_structure()
+    return len(study.get_all_fields())
+
+
+def _map_data(study: CastorStudy, mock: MockCastor, _import_rows: int) -> int:
+    """Maps the data, returns the number of rows of the data export."""
+    study.map_data()
+    return len(mock.data)
+
+
+def _export_to_dataframe(
+    study: CastorStudy, _mock: MockCastor, _import_rows: int
+) -> int:
+    """Exports the mapped data to dataframes, returns the number of rows."""
+    dataframes = study.export_to_dataframe(remap=False)
+    return len(dataframes["Study"]) + sum(
+        len(dataframe)
+        for form_type in ["Surveys", "Reports"]
+        for dataframe in dataframes[form_type].values()
+    )
+
+
+def _export_to_csv(study: CastorStudy, _mock: MockCastor, _import_rows: int) -> int:
+    """Exports the mapped data to csv files, returns the number of rows."""
+    study.export_to_csv(remap=False)
+    return study.metrics.report()["phases"]["write_files"]["rows"]
+
+
+def _export_to_csv_chunked(
+    study: CastorStudy, mock: MockCastor, _import_rows: int
+) -> int:
+    """Streams the mapped data to csv files in chunks of a row per record,
+    so files of forms with instances take multiple chunks. Returns the number of rows.
+    """
+    study.export_to_csv(remap=False, chunk_size=len(mock.records))
+    return study.metrics.report()["phases"]["write_files"]["rows"]
+
+
+def _export_to_database(
+    study: CastorStudy, _mock: MockCastor, _import_rows: int
+) -> int:
+    """Exports the mapped data to an SQLite database, returns the number of rows.
+    The optiongroups table comes from the mapped data, so no requests are made."""
+    path = study.export_to_database("benchmark.db", remap=False)
+    with contextlib.closing(sqlite3.connect(path)) as connection:
+        tables = [
+            row[0]
+            for row in connection.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table'"
+            )
+        ]
+        return sum(
+            connection.execute(f'SELECT COUNT(*) FROM "{table}"').fetchone()[0]
+            for table in tables
+        )
+
+
+def _import_data(study: CastorStudy, mock: MockCastor, import_rows: int) -> int:
+    """Imports rows of study data, returns the number of uploaded rows."""
+    data, links = mock.upload_rows(import_rows)
+    pd.DataFrame(data).to_excel("benchmark_data.xlsx", index=False)
+    pd.DataFrame(links).to_excel("benchmark_links.xlsx", index=False)
+    uploaded = mock.uploaded
+    # Keep the printed import summary out of the benchmark output
+    with contextlib.redirect_stdout(io.StringIO()):
+        import_data(
+            data_source_path="benchmark_data.xlsx",
+            column_link_path="benchmark_links.xlsx",
+            study=study,
+            label_data=False,
+            target="Study",
+        )
+    return mock.uploaded - uploaded
+
+
+def _no_preparation(_study: CastorStudy) -> None:
+    """Prepares nothing, the benchmark starts from an empty study."""
+
+
+def _map_data_first(study: CastorStudy) -> None:
+    """Maps the data before exporting it."""
+    study.map_data()
+
+
+# What to prepare without timing it and what to time per benchmark
+BENCHMARK_STEPS: Dict[str, Tuple[Callable, Callable]] = {
+    "map_structure": (_no_preparation, _map_structure),
+    "map_data": (_no_preparation, _map_data),
+    "export_to_dataframe": (_map_data_first, _export_to_dataframe),
+    "export_to_csv": (_map_data_first, _export_to_csv),
+    "export_to_csv_chunked": (_map_data_first, _export_to_csv_chunked),
+    "export_to_database": (_map_data_first, _export_to_database),
+    "import_data": (_no_preparation, _import_data),
+}
+
+
+def format_results(results: List[Dict]) -> str:
+    """Formats the results of run_benchmarks as a table."""
+    table = pd.DataFrame(results).set_index("benchmark")
+    return table.to_string(float_format=lambda number: f"{number:.3f}")
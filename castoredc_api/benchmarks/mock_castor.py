@@ -0,0 +1,570 @@
+"""Module for a local stand-in of the Castor EDC API, serving a synthetic study."""
+import asyncio
+import csv
+import io
+import json
+import math
+import random
+import re
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+
+# Field types of the synthetic forms, all of them can be exported and imported
+FIELD_TYPES = (
+    "numeric",
+    "string",
+    "radio",
+    "date",
+    "checkbox",
+    "datetime",
+    "dropdown",
+    "year",
+    "time",
+    "textarea",
+)
+OPTIONGROUP_FIELD_TYPES = ("radio", "checkbox", "dropdown")
+# Data names of the paginated endpoints
+PAGINATED_ENDPOINTS = {
+    "field": "fields",
+    "field-dependency": "fieldDependencies",
+    "field-optiongroup": "fieldOptionGroups",
+    "survey": "surveys",
+    "surveypackage": "survey_packages",
+    "surveypackageinstance": "surveypackageinstance",
+    "record": "records",
+    "report-instance": "reportInstances",
+}
+FILLED_IN = "2021-01-15 13:39:47"
+
+
+class MockCastor(httpx.BaseTransport, httpx.AsyncBaseTransport):
+    """Serves a synthetic study in place of the Castor EDC API, without a network.
+    Pass it as transport to a CastorClient. The study has a study form, surveys
+    and reports with fields of all types, records with instances of every survey
+    and report, optiongroups and paginated endpoints.
+    Every request waits latency seconds. With rate_limit, endpoints answer
+    429 Too Many Requests after that many requests in rate_period seconds."""
+
+    # pylint: disable=too-many-arguments
+    # Necessary number of arguments to size the study
+    # pylint: disable=too-many-instance-attributes
+    # Necessary number of attributes to serve the study
+
+    def __init__(
+        self,
+        *,
+        records: int = 100,
+        fields: int = 20,
+        surveys: int = 2,
+        reports: int = 2,
+        instances: int = 2,
+        latency: float = 0.0,
+        rate_limit: Optional[int] = None,
+        rate_period: float = 600.0,
+        seed: int = 0,
+    ) -> None:
+        """Creates a study with records, fields per form, surveys and reports forms,
+        and instances of every survey and report per record.
+        All options are keyword-only, e.g. MockCastor(records=1000)."""
+        self.url = "mock.castoredc.com"
+        self.study_id = "MOCK-STUDY-ID"
+        self.latency = latency
+        self.rate_limit = rate_limit
+        self.rate_period = rate_period
+        # Requests per endpoint, throttled requests and when the rate period started
+        self.requests = Counter()
+        self.throttled = 0
+        self.period_start = time.monotonic()
+        # Rows of data that were uploaded
+        self.uploaded = 0
+        self.__random = random.Random(seed)
+        self.optiongroups = [
+            {
+                "id": f"OPTIONGROUP-ID{number}",
+                "name": f"Optiongroup {number}",
+                "options": [
+                    {
+                        "id": f"OPTION-ID{number}-{value}",
+                        "name": f"Option {value}",
+                        "value": str(value),
+                        "groupOrder": value,
+                    }
+                    for value in range(1, number + 3)
+                ],
+            }
+            for number in range(1, 5)
+        ]
+        self.forms = (
+            [("Study", "MOCK-STUDY-FORM-ID", "Baseline")]
+            + [
+                ("Survey", f"MOCK-SURVEY-ID{number}", f"Survey {number}")
+                for number in range(1, surveys + 1)
+            ]
+            + [
+                ("Report", f"MOCK-REPORT-ID{number}", f"Report {number}")
+                for number in range(1, reports + 1)
+            ]
+        )
+        self.structure = self.__create_structure(fields)
+        self.records = [
+            {
+                "id": f"{number:06}",
+                "_embedded": {
+                    "institute": {
+                        "id": f"INSTITUTE-ID{number % 3}",
+                        "name": f"Institute {number % 3}",
+                    }
+                },
+                "randomization_group_name": None,
+                "randomized_on": None,
+                "archived": False,
+            }
+            for number in range(1, records + 1)
+        ]
+        self.survey_package_instances = []
+        self.report_instances = []
+        self.data = self.__create_data(instances)
+
+    def __create_structure(self, fields: int) -> List[dict]:
+        """Creates the rows of the structure export, fields per form."""
+        structure = []
+        for order, (form_type, form_id, form_name) in enumerate(self.forms, start=1):
+            for number in range(fields):
+                field_type = FIELD_TYPES[number % len(FIELD_TYPES)]
+                optiongroup = (
+                    self.optiongroups[number % len(self.optiongroups)]["id"]
+                    if field_type in OPTIONGROUP_FIELD_TYPES
+                    else ""
+                )
+                name = f"{form_name.lower().replace(' ', '_')}_{field_type}_{number}"
+                structure.append(
+                    {
+                        "Study ID": self.study_id,
+                        "Form Type": form_type,
+                        "Form Collection ID": form_id,
+                        "Form Collection Name": form_name,
+                        "Form Collection Order": str(order),
+                        # Forms have a step per ten fields
+                        "Form ID": f"{form_id}-STEP{number // 10}",
+                        "Form Name": f"{form_name} {number // 10 + 1}",
+                        "Form Order": str(number // 10 + 1),
+                        "Field ID": f"{form_id}-FIELD{number}",
+                        "Field Variable Name": name,
+                        "Field Label": name,
+                        "Field Type": field_type,
+                        "Field Required": "0",
+                        "Field Option Group": optiongroup,
+                        "Field Order": str(number % 10 + 1),
+                    }
+                )
+        return structure
+
+    def __create_data(self, instances: int) -> List[dict]:
+        """Creates the rows of the data export, with instances of every survey and report
+        per record, and the survey package and report instances that go with them."""
+        data = []
+        for record in self.records:
+            data.append(self.__row(record["id"], "", "", "", None))
+            for form_type, form_id, form_name in self.forms:
+                if form_type == "Study":
+                    data.extend(
+                        self.__row(record["id"], "Study", "", form_name, field)
+                        for field in self.__form_fields(form_id)
+                    )
+                    continue
+                for number in range(1, instances + 1):
+                    instance_id = f"{form_id}-{record['id']}-{number}"
+                    # Surveys are exported with the name of the survey
+                    instance_name = (
+                        form_name if form_type == "Survey" else f"{form_name} {number}"
+                    )
+                    if form_type == "Survey":
+                        self.__add_survey_package_instance(
+                            record["id"], instance_id, form_name
+                        )
+                    else:
+                        self.__add_report_instance(
+                            record["id"], instance_id, form_id, instance_name
+                        )
+                    data.extend(
+                        self.__row(
+                            record["id"], form_type, instance_id, instance_name, field
+                        )
+                        for field in self.__form_fields(form_id)
+                    )
+        return data
+
+    def __form_fields(self, form_id: str) -> List[dict]:
+        """Returns the structure rows of the fields of a form."""
+        return [row for row in self.structure if row["Form Collection ID"] == form_id]
+
+    def __row(
+        self,
+        record_id: str,
+        form_type: str,
+        instance_id: str,
+        instance_name: str,
+        field: Optional[dict],
+    ) -> dict:
+        """Creates a row of the data export, a record row without field."""
+        return {
+            "Study ID": self.study_id,
+            "Record ID": record_id,
+            "Form Type": form_type,
+            "Form Instance ID": instance_id,
+            "Form Instance Name": instance_name,
+            "Field ID": "" if field is None else field["Field ID"],
+            "Value": "" if field is None else self.value(field),
+            "Date": "" if field is None else FILLED_IN,
+            "User ID": "" if field is None else "MOCK-USER-ID",
+        }
+
+    def value(self, field: dict) -> str:
+        """Returns a random raw value for a field, empty one in ten times."""
+        if self.__random.random() < 0.1:
+            return ""
+        field_type = field["Field Type"]
+        if field_type in OPTIONGROUP_FIELD_TYPES:
+            values = [
+                option["value"]
+                for option in self.optiongroups[
+                    int(field["Field Option Group"][len("OPTIONGROUP-ID") :]) - 1
+                ]["options"]
+            ]
+            if field_type == "checkbox":
+                return ";".join(
+                    sorted(self.__random.sample(values, self.__random.randint(1, 2)))
+                )
+            return self.__random.choice(values)
+        date = (
+            f"{self.__random.randint(1, 28):02}-{self.__random.randint(1, 12):02}-"
+            f"{self.__random.randint(1950, 2020)}"
+        )
+        time_of_day = (
+            f"{self.__random.randint(0, 23):02}:{self.__random.randint(0, 59):02}"
+        )
+        return {
+            "numeric": str(self.__random.randint(0, 200)),
+            "year": str(self.__random.randint(1950, 2020)),
+            "date": date,
+            "datetime": f"{date};{time_of_day}",
+            "time": time_of_day,
+        }.get(field_type, f"Text {self.__random.randint(0, 1000)}")
+
+    def __add_survey_package_instance(
+        self, record_id: str, instance_id: str, survey_name: str
+    ) -> None:
+        """Adds a survey package instance with a single survey instance."""
+        self.survey_package_instances.append(
+            {
+                "id": f"PACKAGE-{instance_id}",
+                "record_id": record_id,
+                "survey_package_name": f"{survey_name} Package",
+                "created_on": {"date": "2021-01-15 13:39:47.000000"},
+                "sent_on": None,
+                "finished_on": {"date": "2021-01-16 10:00:00.000000"},
+                "archived": False,
+                "_embedded": {
+                    "survey_instances": [
+                        {
+                            "id": instance_id,
+                            "progress": 100,
+                            "_embedded": {"survey": {"name": survey_name}},
+                        }
+                    ]
+                },
+            }
+        )
+
+    def __add_report_instance(
+        self, record_id: str, instance_id: str, report_id: str, name: str
+    ) -> None:
+        """Adds a report instance below the study form."""
+        self.report_instances.append(
+            {
+                "id": instance_id,
+                "name": name,
+                "record_id": record_id,
+                "created_on": FILLED_IN,
+                "parent_type": "phase",
+                "parent_id": "MOCK-STUDY-FORM-ID",
+                "archived": False,
+                "_embedded": {"report": {"id": report_id}},
+            }
+        )
+
+    # TRANSPORT
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        """Answers a request of a synchronous client after the latency."""
+        if self.latency:
+            time.sleep(self.latency)
+        return self.respond(request)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        """Answers a request of an asynchronous client after the latency."""
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self.respond(request)
+
+    def respond(self, request: httpx.Request) -> httpx.Response:
+        """Routes a request to the endpoint that answers it."""
+        request.read()
+        path = request.url.path
+        if path == "/oauth/token":
+            return httpx.Response(
+                200,
+                json={
+                    "access_token": "MOCK-TOKEN",
+                    "expires_in": 18000,
+                    "token_type": "Bearer",
+                    "scope": "default",
+                },
+            )
+        prefix = f"/api/study/{self.study_id}/"
+        if not path.startswith(prefix):
+            return self.__not_found(path)
+        endpoint = path[len(prefix) :]
+        throttled = self.__throttle(request.method, endpoint)
+        if throttled is not None:
+            return throttled
+        if request.method == "GET":
+            return self.__get(endpoint, dict(request.url.params))
+        if request.method == "POST":
+            return self.__post(endpoint, json.loads(request.content))
+        return self.__not_found(path)
+
+    def __throttle(self, method: str, endpoint: str) -> Optional[httpx.Response]:
+        """Counts the request, returns a 429 response when the endpoint is rate limited.
+        Requests for records and instances count for the same endpoint."""
+        key = (method, re.sub(r"/[^/]*\d[^/]*", "/{id}", endpoint))
+        now = time.monotonic()
+        if now - self.period_start >= self.rate_period:
+            self.period_start = now
+            self.requests = Counter()
+        self.requests[key] += 1
+        if self.rate_limit is None or self.requests[key] <= self.rate_limit:
+            return None
+        self.throttled += 1
+        return httpx.Response(
+            429,
+            headers={
+                "Retry-After": str(
+                    math.ceil(self.rate_period - (now - self.period_start))
+                )
+            },
+            json={"status": 429, "detail": "Too many requests."},
+        )
+
+    def __get(self, endpoint: str, params: Dict[str, str]) -> httpx.Response:
+        """Answers a GET request."""
+        # pylint: disable=too-many-return-statements
+        # Necessary number of returns, one per endpoint
+        if endpoint == "export/structure":
+            return self.__csv(self.structure)
+        if endpoint == "export/data":
+            return self.__csv(self.data)
+        if endpoint == "export/optiongroups":
+            return self.__csv(
+                [
+                    {
+                        "Study ID": self.study_id,
+                        "Option Group Id": optiongroup["id"],
+                        "Option Group Name": optiongroup["name"],
+                        "Option Id": option["id"],
+                        "Option Name": option["name"],
+                        "Option Value": option["value"],
+                    }
+                    for optiongroup in self.optiongroups
+                    for option in optiongroup["options"]
+                ]
+            )
+        match = re.fullmatch(
+            r"record/([^/]+)/data-point-collection/(study|survey-instance|report-instance)",
+            endpoint,
+        )
+        if match:
+            return httpx.Response(
+                200,
+                json={
+                    "_embedded": {"items": self.__data_points(*match.groups())},
+                },
+            )
+        if endpoint in PAGINATED_ENDPOINTS:
+            items = self.__items(endpoint, params)
+            if endpoint == "report-instance" and not items:
+                return httpx.Response(
+                    404,
+                    json={"status": 404, "detail": "There are no report instances."},
+                )
+            return self.__page(PAGINATED_ENDPOINTS[endpoint], items, params)
+        return self.__not_found(endpoint)
+
+    def __items(self, endpoint: str, params: Dict[str, str]) -> List[dict]:
+        """Returns all items of a paginated endpoint."""
+        # pylint: disable=too-many-return-statements
+        # Necessary number of returns, one per endpoint
+        if endpoint == "field":
+            return [
+                {
+                    "id": row["Field ID"],
+                    "field_variable_name": row["Field Variable Name"],
+                    "field_type": row["Field Type"],
+                    "field_min": None,
+                    "field_max": None,
+                    "option_group": self.__optiongroup(row["Field Option Group"]),
+                }
+                for row in self.structure
+            ]
+        if endpoint == "field-optiongroup":
+            return self.optiongroups
+        if endpoint == "survey":
+            return [
+                {"id": form_id, "name": form_name}
+                for form_type, form_id, form_name in self.forms
+                if form_type == "Survey"
+            ]
+        if endpoint == "surveypackage":
+            return [
+                {
+                    "id": f"PACKAGE-{form_id}",
+                    "name": f"{form_name} Package",
+                    "_embedded": {"surveys": [{"id": form_id, "name": form_name}]},
+                }
+                for form_type, form_id, form_name in self.forms
+                if form_type == "Survey"
+            ]
+        if endpoint == "surveypackageinstance":
+            return self.survey_package_instances
+        if endpoint == "record":
+            return self.records
+        if endpoint == "report-instance":
+            # Synthetic report instances are never archived
+            return [] if params.get("archived") == "1" else self.report_instances
+        return []
+
+    def __optiongroup(self, optiongroup_id: str) -> Optional[dict]:
+        """Returns the optiongroup on id, None if the field has no optiongroup."""
+        for optiongroup in self.optiongroups:
+            if optiongroup["id"] == optiongroup_id:
+                return optiongroup
+        return None
+
+    def __data_points(self, record_id: str, collection: str) -> List[dict]:
+        """Returns the data points of a collection of a record as the API does."""
+        form_type = {
+            "study": "Study",
+            "survey-instance": "Survey",
+            "report-instance": "Report",
+        }[collection]
+        data_points = []
+        for row in self.data:
+            if (
+                row["Record ID"] != record_id
+                or row["Form Type"] != form_type
+                or not row["Field ID"]
+            ):
+                continue
+            data_point = {
+                "field_id": row["Field ID"],
+                "field_value": row["Value"],
+                "record_id": record_id,
+                "updated_on": row["Date"],
+            }
+            if form_type == "Survey":
+                data_point["survey_instance_id"] = row["Form Instance ID"]
+                data_point["survey_name"] = row["Form Instance Name"]
+            elif form_type == "Report":
+                data_point["report_instance_id"] = row["Form Instance ID"]
+                data_point["report_instance_name"] = row["Form Instance Name"]
+            data_points.append(data_point)
+        return data_points
+
+    def __post(self, endpoint: str, body: dict) -> httpx.Response:
+        """Answers a POST request, only uploads of study data are supported."""
+        match = re.fullmatch(r"record/([^/]+)/data-point-collection/study", endpoint)
+        if match is None:
+            return self.__not_found(endpoint)
+        self.uploaded += 1
+        return httpx.Response(
+            201,
+            json={
+                "total_processed": len(body["data"]),
+                "total_success": len(body["data"]),
+                "total_failed": 0,
+                "success": [
+                    {
+                        "record_id": match.group(1),
+                        "field_id": data_point["field_id"],
+                        "field_value": data_point["field_value"],
+                        "message": "Value saved.",
+                    }
+                    for data_point in body["data"]
+                ],
+                "failed": [],
+            },
+        )
+
+    @staticmethod
+    def __page(
+        data_name: str, items: List[dict], params: Dict[str, str]
+    ) -> httpx.Response:
+        """Returns a page of items, as requested with the page and page_size params."""
+        page = int(params.get("page", 1))
+        page_size = int(params.get("page_size", 25))
+        return httpx.Response(
+            200,
+            json={
+                "_embedded": {
+                    data_name: items[(page - 1) * page_size : page * page_size]
+                },
+                "page_count": max(1, math.ceil(len(items) / page_size)),
+                "page_size": page_size,
+                "page": page,
+                "total_items": len(items),
+            },
+        )
+
+    @staticmethod
+    def __csv(rows: List[dict]) -> httpx.Response:
+        """Returns the rows as a ; separated CSV export."""
+        output = io.StringIO()
+        writer = csv.DictWriter(
+            output, fieldnames=list(rows[0]) if rows else [], delimiter=";"
+        )
+        writer.writeheader()
+        writer.writerows(rows)
+        return httpx.Response(
+            200,
+            headers={"content-type": "text/csv; charset=UTF-8"},
+            content=output.getvalue().encode(),
+        )
+
+    @staticmethod
+    def __not_found(path: str) -> httpx.Response:
+        """Returns a 404 response for endpoints that the mock doesn't serve."""
+        return httpx.Response(
+            404, json={"status": 404, "detail": f"{path} is not served by MockCastor."}
+        )
+
+    def upload_rows(self, rows: int) -> Tuple[List[dict], List[dict]]:
+        """Returns rows of study data to import with import_data, as values,
+        and the column links from the data columns to the study fields."""
+        fields = [field for field in self.structure if field["Form Type"] == "Study"]
+        data = [
+            {
+                "patient": record["id"],
+                **{
+                    f"column_{number}": self.value(field) or None
+                    for number, field in enumerate(fields)
+                },
+            }
+            for record in self.records[:rows]
+        ]
+        links = [{"other": "patient", "castor": "record_id"}] + [
+            {"other": f"column_{number}", "castor": field["Field Variable Name"]}
+            for number, field in enumerate(fields)
+        ]
+        return data, links
@@ -5,6 +5,7 @@ import csv
 import json
 import sys
 from datetime import datetime
+from email.utils import parsedate_to_datetime
 from itertools import chain
 from json import JSONDecodeError
 from typing import List, Optional, Union
@@ -12,9 +13,10 @@ from typing import List, Optional, Union
 import httpx
 from httpx import HTTPStatusError
 from ratelimiter import RateLimiter
-from tqdm import tqdm
 
 from castoredc_api.client import client_options
+from castoredc_api.client.client_metrics import CastorMetrics
+from castoredc_api.client.client_progress import CastorProgress
 
 if sys.version_info >= (3, 8):
     from importlib import metadata as pkg_metadata
@@ -35,11 +37,31 @@ class CastorClient:
     # Necessary number of public methods to interact with API
     # pylint: disable=too-many-lines
     # Necessary number of lines to interact with API
+    # pylint: disable=too-many-instance-attributes
+    # Necessary number of attributes to connect and measure requests
 
-    def __init__(self, client_id, client_secret, url):
+    def __init__(
+        self,
+        client_id,
+        client_secret,
+        url,
+        *,
+        metrics=None,
+        progress=None,
+        transport=None,
+    ):
         """Create a CastorClient to communicate with a Castor database.
         Links the CastorClient to an account with client_id and client_secret.
-        URL determines which server is connected to."""
+        URL determines which server is connected to.
+        Metrics is a CastorMetrics that counts the requests and downloaded bytes.
+        Progress is a CastorProgress that reports the downloads, nothing by default.
+        Transport is an httpx transport that sends the requests instead of the network,
+        e.g. a MockCastor for offline benchmarks. It must be both sync and async."""
+        self.transport = transport
+        # Time of the server at the last response, from its Date header
+        self.server_time = None
+        self.metrics = CastorMetrics() if metrics is None else metrics
+        self.progress = CastorProgress() if progress is None else progress
         # Instantiate URLs
         self.base_url = f"https://{url}/api"
         self.auth_url = f"https://{url}/oauth/token"
@@ -70,6 +92,10 @@ class CastorClient:
             },
             limits=client_options.LIMITS,
             timeout=client_options.TIMEOUT,
+            event_hooks={
+                "response": [self.metrics.count_response, self.__track_server_time]
+            },
+            transport=self.transport,
         )
 
         # Grab authentication token for given client
@@ -83,6 +109,12 @@ class CastorClient:
         """Link a study based on the study_id."""
         self.study_url = self.base_url + "/study/" + study_id
 
+    def __track_server_time(self, response: httpx.Response) -> None:
+        """Keeps the time of the server from a response, used as httpx event hook."""
+        date = response.headers.get("date")
+        if date is not None:
+            self.server_time = parsedate_to_datetime(date)
+
     # API ENDPOINTS
     # AUDIT TRAIL
     @RateLimiter(**client_options.SYNC_OPTIONS)
@@ -93,7 +125,7 @@ class CastorClient:
         user_id: Optional[str] = None,
         event_types: Optional[List] = None,
     ):
-        """Returns a dict of the audit trail.
+        """Returns a list of the events in the audit trail, from all pages.
         date_from and date_to need to be a datetime object or strings formatted as yyyy-mm-dd.
         """
         url = self.study_url + "/audit-trail"
@@ -110,7 +142,21 @@ class CastorClient:
             params["user_id"] = user_id
         if event_types:
             params["event_types"] = ",".join(event_types)
-        return self.sync_get(url, params)["items"]
+        params["page_size"] = page_size = client_options.AUDIT_TRAIL_PAGE_SIZE
+        params["page"] = 1
+        response = self.sync_get(url, params)
+        events = list(response["items"])
+        # Without a page count, a page that isn't full is the last one
+        while (
+            params["page"] < response["page_count"]
+            if "page_count" in response
+            else len(response["items"]) == page_size
+        ):
+            params["page"] += 1
+            with self.sync_rate_limiter:
+                response = self.sync_get(url, params)
+            events.extend(response["items"])
+        return events
 
     # COUNTRY
     @RateLimiter(**client_options.SYNC_OPTIONS)
@@ -204,6 +250,32 @@ class CastorClient:
         url = f"/record/{record_id}/data-point-collection/survey-instance/{survey_instance_id}"
         return self.retrieve_data_points(url)
 
+    def all_data_points_records(self, record_ids, collection):
+        """Returns a dict of {record_id: list of all data collected for the record}.
+        Collection is study, report-instance or survey-instance.
+        Downloads the records concurrently."""
+        urls = [
+            self.study_url + f"/record/{record_id}/data-point-collection/{collection}"
+            for record_id in record_ids
+        ]
+        try:
+            # Test if there is a running event loop
+            # If there is, we can't use async code
+            asyncio.get_running_loop()
+            responses = []
+            for url in self.progress.track(urls, "Downloading"):
+                # Every request counts towards the rate limit, like the sync endpoints
+                with self.sync_rate_limiter:
+                    responses.append(self.sync_get(url, {}))
+        except RuntimeError:
+            # No running event loop, free to use async code
+            responses = asyncio.run(self.async_get_urls(urls=urls))
+            responses = [self.handle_response(response) for response in responses]
+        return {
+            record_id: response["_embedded"]["items"]
+            for record_id, response in zip(record_ids, responses)
+        }
+
     @RateLimiter(**client_options.SYNC_OPTIONS)
     def single_survey_package_data_points_record(
         self, record_id, survey_package_instance_id
@@ -1262,7 +1334,10 @@ class CastorClient:
             # If there is, we can't use async code
             # Solution for IPython consoles (Jupiter Notebooks, Spyder3)
             asyncio.get_running_loop()
-            responses = [self.sync_get(url, param) for param in tqdm(params)]
+            responses = [
+                self.sync_get(url, param)
+                for param in self.progress.track(params, "Downloading")
+            ]
         except RuntimeError:
             # No running event loop, free to use async code
             responses = asyncio.run(self.async_get(url=url, params=params))
@@ -1306,7 +1381,6 @@ class CastorClient:
     def sync_put(self, url, body: dict):
         """Helper function to send put to url."""
         response = self.client.put(url=url, json=body)
-        print(response.json())
         response.raise_for_status()
         return {"code": response.status_code, "json": response.json()}
 
@@ -1331,19 +1405,49 @@ class CastorClient:
                     headers=self.headers,
                     timeout=client_options.TIMEOUT,
                     limits=client_options.LIMITS,
+                    event_hooks={"response": [self.metrics.count_async_response]},
+                    transport=self.transport,
                 ) as client:
                     tasks = [client.get(url=url, params=param) for param in chunk]
                     temp_responses = [
                         await response
-                        for response in tqdm(
+                        for response in self.progress.track(
                             asyncio.as_completed(tasks),
+                            f"Async Downloading {idx + 1}/{len(chunks)}",
                             total=len(tasks),
-                            desc=f"Async Downloading {idx + 1}/{len(chunks)}",
                         )
                     ]
                     responses = responses + temp_responses
         return responses
 
+    async def async_get_urls(self, urls: list) -> list:
+        """Queries the Castor EDC API once for each url in the urls list.
+        Returns a list of responses in the order of the urls.
+
+        :param urls: a list of urls for the requests
+        """
+        # Split list to handle error when len(tasks) > max_connections
+        chunks = [
+            urls[x : x + client_options.MAX_CONNECTIONS]
+            for x in range(0, len(urls), client_options.MAX_CONNECTIONS)
+        ]
+        responses = []
+        with self.async_rate_limiter:
+            for chunk in self.progress.track(chunks, "Async Downloading"):
+                async with httpx.AsyncClient(
+                    headers=self.headers,
+                    timeout=client_options.TIMEOUT,
+                    limits=client_options.LIMITS,
+                    event_hooks={"response": [self.metrics.count_async_response]},
+                    transport=self.transport,
+                ) as client:
+                    # Gather keeps the order of the urls
+                    temp_responses = await asyncio.gather(
+                        *[client.get(url=url) for url in chunk]
+                    )
+                    responses = responses + list(temp_responses)
+        return responses
+
     @staticmethod
     def handle_response(response: httpx.Response) -> dict:
         """Reads response and handles errors."""
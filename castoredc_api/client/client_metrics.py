@@ -0,0 +1,129 @@
+"""Module for measuring where the time of interacting with Castor EDC goes."""
+import contextlib
+import logging
+import sys
+import threading
+import time
+from typing import Callable, Dict, Iterator, Optional, Any
+
+import httpx
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows, peak memory is then not measured
+    resource = None
+
+
+class CastorMetrics:
+    """Collects timings, row counts, requests, downloaded bytes and peak memory.
+    Timings are collected per phase, e.g. downloading or interpreting the data.
+    Every finished phase is emitted to the logger and callback, if given."""
+
+    def __init__(
+        self,
+        logger: Optional[logging.Logger] = None,
+        callback: Optional[Callable[[dict], None]] = None,
+    ) -> None:
+        """Creates a CastorMetrics. Logger is a logging.Logger that receives an info
+        message per finished phase, callback is called with a dict per finished phase.
+        """
+        self.logger = logger
+        self.callback = callback
+        # Phases and threads of the requests can finish at the same time
+        self.lock = threading.Lock()
+        self.phases = {}
+        self.requests = 0
+        self.bytes_downloaded = 0
+
+    def __getstate__(self) -> dict:
+        """Copies and pickles the metrics without the lock."""
+        state = self.__dict__.copy()
+        del state["lock"]
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        """Restores the metrics with a new lock."""
+        self.__dict__.update(state)
+        self.lock = threading.Lock()
+
+    def reset(self) -> None:
+        """Clears all collected metrics."""
+        with self.lock:
+            self.phases = {}
+            self.requests = 0
+            self.bytes_downloaded = 0
+
+    @contextlib.contextmanager
+    def phase(self, name: str, rows: int = 0) -> Iterator[Dict[str, int]]:
+        """Times the code in the with block as phase name, processing rows.
+        Yields a dict in which rows can be updated when they are known later.
+        Phases with the same name are summed."""
+        counts = {"rows": rows}
+        start = time.perf_counter()
+        try:
+            yield counts
+        finally:
+            seconds = time.perf_counter() - start
+            with self.lock:
+                phase = self.phases.setdefault(
+                    name, {"seconds": 0.0, "calls": 0, "rows": 0}
+                )
+                phase["seconds"] += seconds
+                phase["calls"] += 1
+                phase["rows"] += counts["rows"]
+            self.__emit(
+                {
+                    "phase": name,
+                    "seconds": seconds,
+                    "rows": counts["rows"],
+                    "peak_memory": self.peak_memory(),
+                }
+            )
+
+    def count_response(self, response: httpx.Response) -> None:
+        """Counts a response of a request, used as httpx event hook."""
+        response.read()
+        self.__count(response)
+
+    async def count_async_response(self, response: httpx.Response) -> None:
+        """Counts a response of an async request, used as httpx event hook."""
+        await response.aread()
+        self.__count(response)
+
+    def __count(self, response: httpx.Response) -> None:
+        """Adds a response to the requests and downloaded bytes."""
+        with self.lock:
+            self.requests += 1
+            # Transports that don't download, e.g. mocks, only have the content
+            self.bytes_downloaded += response.num_bytes_downloaded or len(
+                response.content
+            )
+
+    @staticmethod
+    def peak_memory() -> Optional[int]:
+        """Returns the peak memory use of the process in bytes, None if unknown."""
+        if resource is None:
+            return None
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reports kilobytes, macOS bytes
+        return peak if sys.platform == "darwin" else peak * 1024
+
+    def report(self) -> Dict[str, Any]:
+        """Returns the collected metrics as a dict."""
+        with self.lock:
+            return {
+                "phases": {name: dict(phase) for name, phase in self.phases.items()},
+                "requests": self.requests,
+                "bytes_downloaded": self.bytes_downloaded,
+                "peak_memory": self.peak_memory(),
+            }
+
+    def __emit(self, event: dict) -> None:
+        """Sends the metrics of a finished phase to the logger and callback."""
+        if self.logger is not None:
+            self.logger.info(
+                "Phase %(phase)s took %(seconds).3f seconds for %(rows)d rows", event
+            )
+        if self.callback is not None:
+            self.callback(event)
@@ -10,6 +10,8 @@ LIMITS = httpx.Limits(max_connections=MAX_CONNECTIONS)
 SYNC_LIMIT = 600
 PERIOD_LIMIT = 600
 ASYNC_LIMIT = SYNC_LIMIT / MAX_CONNECTIONS
+# Events per page of the audit trail
+AUDIT_TRAIL_PAGE_SIZE = 1000
 
 
 def limit_callback(until):
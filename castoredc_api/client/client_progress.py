@@ -0,0 +1,118 @@
+"""Module for reporting the progress of interacting with Castor EDC."""
+import logging
+import sys
+import time
+from typing import Any, Callable, Iterable, Iterator, Optional, TypeVar
+
+from tqdm import tqdm
+
+Item = TypeVar("Item")
+
+
+class CastorProgress:
+    """Reports the progress of downloading, mapping, exporting and importing.
+    Reports nothing and returns iterables untouched, so it adds no overhead.
+    Subclasses report to tqdm, logging or a callback."""
+
+    def message(self, text: str) -> None:
+        """Reports that a step started, e.g. a download."""
+
+    def track(
+        self, iterable: Iterable[Item], description: str, total: Optional[int] = None
+    ) -> Iterable[Item]:
+        """Returns the iterable, reporting the progress of looping over it.
+        Total is the number of items, taken from the iterable if it has a length."""
+        # pylint: disable=unused-argument
+        # Arguments are used by the subclasses
+        return iterable
+
+    @staticmethod
+    def _total(iterable: Iterable[Any], total: Optional[int]) -> Optional[int]:
+        """Returns the total number of items, None if unknown."""
+        if total is None and hasattr(iterable, "__len__"):
+            return len(iterable)
+        return total
+
+
+class TqdmProgress(CastorProgress):
+    """Reports steps on stderr and loops with tqdm progress bars."""
+
+    def message(self, text: str) -> None:
+        print(text, flush=True, file=sys.stderr)
+
+    def track(
+        self, iterable: Iterable[Item], description: str, total: Optional[int] = None
+    ) -> Iterable[Item]:
+        return tqdm(iterable, desc=description, total=total)
+
+
+class LoggingProgress(CastorProgress):
+    """Reports steps and the start and end of loops to a logger."""
+
+    def __init__(
+        self, logger: Optional[logging.Logger] = None, level: int = logging.INFO
+    ) -> None:
+        """Creates a LoggingProgress, logging to the castoredc_api logger by default."""
+        self.logger = logging.getLogger("castoredc_api") if logger is None else logger
+        self.level = level
+
+    def message(self, text: str) -> None:
+        self.logger.log(self.level, text)
+
+    def track(
+        self, iterable: Iterable[Item], description: str, total: Optional[int] = None
+    ) -> Iterable[Item]:
+        return self.__track(iterable, description, self._total(iterable, total))
+
+    def __track(
+        self, iterable: Iterable[Item], description: str, total: Optional[int]
+    ) -> Iterator[Item]:
+        """Yields the items, logging the start and end of the loop."""
+        self.logger.log(self.level, "%s: started %s items", description, total)
+        start = time.perf_counter()
+        completed = 0
+        for completed, item in enumerate(iterable, start=1):
+            yield item
+        self.logger.log(
+            self.level,
+            "%s: finished %d items in %.3f seconds",
+            description,
+            completed,
+            time.perf_counter() - start,
+        )
+
+
+class CallbackProgress(CastorProgress):
+    """Reports steps and loops to a callback, called with a dict per update.
+    The dict holds the description and the completed and total number of items,
+    both None for steps."""
+
+    def __init__(self, callback: Callable[[dict], None], every: int = 1000) -> None:
+        """Creates a CallbackProgress that reports loops every that many items."""
+        self.callback = callback
+        self.every = every
+
+    def message(self, text: str) -> None:
+        self.callback({"description": text, "completed": None, "total": None})
+
+    def track(
+        self, iterable: Iterable[Item], description: str, total: Optional[int] = None
+    ) -> Iterable[Item]:
+        return self.__track(iterable, description, self._total(iterable, total))
+
+    def __track(
+        self, iterable: Iterable[Item], description: str, total: Optional[int]
+    ) -> Iterator[Item]:
+        """Yields the items, reporting every so many and the last item."""
+        completed = 0
+        self.callback({"description": description, "completed": 0, "total": total})
+        for completed, item in enumerate(iterable, start=1):
+            yield item
+            if completed % self.every == 0:
+                self.callback(
+                    {"description": description, "completed": completed, "total": total}
+                )
+        if completed % self.every != 0:
+            self.callback(
+                {"description": description, "completed": completed, "total": total}
+            )
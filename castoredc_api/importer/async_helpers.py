@@ -5,7 +5,6 @@ import typing
 from json import JSONDecodeError
 
 import httpx
-from tqdm import tqdm
 
 from castoredc_api.client import client_options
 from castoredc_api.importer.helpers import (
@@ -15,10 +14,12 @@ from castoredc_api.importer.helpers import (
 )
 
 if typing.TYPE_CHECKING:
-    from castoredc_api import CastorStudy
+    from castoredc_api import CastorStudy, CastorProgress
 
 
-async def async_update_study_data(data: list, study: "CastorStudy") -> list:
+async def async_update_study_data(
+    data: list, study: "CastorStudy", *, progress: "CastorProgress"
+) -> list:
     """Updates the Castor EDC database with given study datapoints."""
     # Split list to handle error when len(tasks) > max_connections
     chunks = [
@@ -34,16 +35,17 @@ async def async_update_study_data(data: list, study: "CastorStudy") -> list:
                 headers=study.client.headers,
                 timeout=client_options.TIMEOUT,
                 limits=client_options.LIMITS,
+                transport=study.client.transport,
             ) as client:
                 tasks = [async_upload_study_data(item, client, study) for item in chunk]
 
-                # Show progress bar while running tasks
+                # Report progress while running tasks
                 temp_responses = [
                     await response
-                    for response in tqdm(
+                    for response in progress.track(
                         asyncio.as_completed(tasks),
+                        f"Async Uploading {idx + 1}/{len(chunks)}",
                         total=len(tasks),
-                        desc=f"Async Uploading {idx + 1}/{len(chunks)}",
                     )
                 ]
                 responses = responses + temp_responses
@@ -75,7 +77,11 @@ async def async_upload_study_data(item, client, study):
 
 
 async def async_update_survey_data(
-    data: list, study: "CastorStudy", change_reason: str
+    data: list,
+    study: "CastorStudy",
+    change_reason: str,
+    *,
+    progress: "CastorProgress",
 ) -> list:
     """Updates the Castor EDC database with given survey datapoints."""
     # Split list to handle error when len(tasks) > max_connections
@@ -91,19 +97,20 @@ async def async_update_survey_data(
                 headers=study.client.headers,
                 timeout=client_options.TIMEOUT,
                 limits=client_options.LIMITS,
+                transport=study.client.transport,
             ) as client:
                 tasks = [
                     async_upload_survey_data(item, client, study, change_reason)
                     for item in chunk
                 ]
 
-                # Show progress bar when handling responses
+                # Report progress when handling responses
                 temp_responses = [
                     await response
-                    for response in tqdm(
+                    for response in progress.track(
                         asyncio.as_completed(tasks),
+                        f"Async Uploading {idx + 1}/{len(chunks)}",
                         total=len(tasks),
-                        desc=f"Async Uploading {idx + 1}/{len(chunks)}",
                     )
                 ]
                 responses = responses + temp_responses
@@ -169,7 +176,9 @@ async def async_create_survey_package_instance(
     return response.json()
 
 
-async def async_update_report_data(data: list, study: "CastorStudy") -> list:
+async def async_update_report_data(
+    data: list, study: "CastorStudy", *, progress: "CastorProgress"
+) -> list:
     """Updates the Castor EDC database with given report datapoints."""
     # Split list to handle error when len(tasks) > max_connections
     chunks = [
@@ -184,18 +193,19 @@ async def async_update_report_data(data: list, study: "CastorStudy") -> list:
                 headers=study.client.headers,
                 timeout=client_options.TIMEOUT,
                 limits=client_options.LIMITS,
+                transport=study.client.transport,
             ) as client:
                 tasks = [
                     async_upload_report_data(item, client, study) for item in chunk
                 ]
 
-                # Show progress bar while handling responses
+                # Report progress while handling responses
                 temp_responses = [
                     await response
-                    for response in tqdm(
+                    for response in progress.track(
                         asyncio.as_completed(tasks),
+                        f"Async Uploading {idx + 1}/{len(chunks)}",
                         total=len(tasks),
-                        desc=f"Async Uploading {idx + 1}/{len(chunks)}",
                     )
                 ]
                 responses = responses + temp_responses
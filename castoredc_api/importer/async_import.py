@@ -14,7 +14,7 @@ from castoredc_api.importer.async_helpers import (
 from castoredc_api.importer.helpers import create_feedback
 
 if typing.TYPE_CHECKING:
-    from castoredc_api import CastorStudy
+    from castoredc_api import CastorStudy, CastorProgress
 
 
 def upload_study_async(
@@ -22,6 +22,8 @@ def upload_study_async(
     common: dict,
     upload_datetime: str,
     study: "CastorStudy",
+    *,
+    progress: "CastorProgress",
 ) -> dict:
     """Uploads study data to the study asynchronously."""
     data = []
@@ -42,7 +44,7 @@ def upload_study_async(
         data.append({"body": body, "common": common, "row": row})
 
     # Upload data
-    imported = asyncio.run(async_update_study_data(data, study))
+    imported = asyncio.run(async_update_study_data(data, study, progress=progress))
     # Create feedback for user
     feedback = create_feedback(imported)
     # Output log of upload
@@ -63,6 +65,8 @@ def upload_survey_async(
     package_id: str,
     email: str,
     change_reason: str,
+    *,
+    progress: "CastorProgress",
 ) -> dict:
     """Uploads survey data to the study."""
     data = []
@@ -70,7 +74,9 @@ def upload_survey_async(
     for row in castorized_dataframe.to_dict("records"):
         data.append({"row": row, "package_id": package_id, "email": email})
     # Upload data
-    imported = asyncio.run(async_update_survey_data(data, study, change_reason))
+    imported = asyncio.run(
+        async_update_survey_data(data, study, change_reason, progress=progress)
+    )
     # Save output
     pd.DataFrame(imported).to_csv(
         pathlib.Path(
@@ -91,6 +97,8 @@ def upload_report_async(
     upload_datetime: str,
     study: "CastorStudy",
     report_id: str,
+    *,
+    progress: "CastorProgress",
 ) -> dict:
     """Uploads report data to the study asynchronously."""
     data = []
@@ -106,7 +114,7 @@ def upload_report_async(
             }
         )
     # Upload data for the user
-    imported = asyncio.run(async_update_report_data(data, study))
+    imported = asyncio.run(async_update_report_data(data, study, progress=progress))
 
     # Save output
     pd.DataFrame(imported).to_csv(
@@ -11,7 +11,7 @@ from castoredc_api.client.castoredc_api_client import CastorException
 
 if typing.TYPE_CHECKING:
     from castoredc_api import CastorStudy
-    from castoredc_api.study.castor_objects import CastorField
+    from castoredc_api.study.castor_objects import CastorField, CastorOptionGroup
 
 
 def read_excel(path: str) -> pd.DataFrame:
@@ -165,7 +165,7 @@ def castorize_column_helper(
                 ]
             }
     elif target == "Survey":
-        package = study.all_survey_packages.get(target_name, None)
+        package = study.get_single_survey_package(target_name)
         if package is None:
             return {
                 new_name[0]: ["Error: survey package does not exist" for _ in to_import]
@@ -256,17 +256,12 @@ def castorize_optiongroup_column_helper(
     label_data, new_name, study, target_field, to_import, variable_translation
 ):
     """Helper function to select the right function to castorize an optiongroup column"""
-    options = {
-        option["name"]: option["value"]
-        for option in study.get_single_optiongroup(target_field.field_option_group)[
-            "options"
-        ]
-    }
+    optiongroup = study.get_single_optiongroup_lookup(target_field.field_option_group)
     if len(new_name) == 1:
         # There is no dependent 'other' field in the Castor database
         return_value = castorize_optiongroup_column(
             to_import,
-            options,
+            optiongroup,
             new_name[0],
             label_data,
             None,
@@ -280,7 +275,7 @@ def castorize_optiongroup_column_helper(
         # Castorize the parent column
         parent_import = castorize_optiongroup_column(
             to_import,
-            options,
+            optiongroup,
             new_name[0],
             label_data,
             parent_value,
@@ -316,7 +311,7 @@ def castorize_dep_column(
 
 def castorize_optiongroup_column(
     to_import: pd.Series,
-    options: dict,
+    optiongroup: "CastorOptionGroup",
     new_name: str,
     label_data: bool,
     parent_value: typing.Optional[str],
@@ -329,7 +324,7 @@ def castorize_optiongroup_column(
     # To each element in the series, translate the value/label to the correct optiongroup value
     to_import = to_import.apply(
         castorize_optiongroup_datapoint,
-        args=(options, label_data, parent_value, variable_translation, other_name),
+        args=(optiongroup, label_data, parent_value, variable_translation, other_name),
     )
     # Merge them to a ; seperated string for import in castor
     to_import = to_import.str.join(";")
@@ -338,7 +333,7 @@ def castorize_optiongroup_column(
 
 def castorize_optiongroup_datapoint(
     values: list,
-    options: dict,
+    optiongroup: "CastorOptionGroup",
     label_data: bool,
     parent_value: typing.Optional[str],
     variable_translation: typing.Optional[dict],
@@ -358,20 +353,20 @@ def castorize_optiongroup_datapoint(
         # False or parent_value for failures
         if label_data:
             new_values = translate_value_data(
-                new_values, options, parent_value, translate_dict, values
+                new_values, optiongroup, parent_value, translate_dict, values
             )
         # If value data was provided, check if this exists in the optiongroup
         # False or parent_value for failures
         else:
             new_values = translate_label_data(
-                new_values, options, parent_value, translate_dict, values
+                new_values, optiongroup, parent_value, translate_dict, values
             )
     return new_values
 
 
 def translate_label_data(
     new_values: list,
-    options: dict,
+    optiongroup: "CastorOptionGroup",
     parent_value: str,
     translate_dict: typing.Optional[dict],
     values: list,
@@ -381,14 +376,14 @@ def translate_label_data(
         if pd.isnull(parent_value):
             if translate_dict:
                 value = translate_dict.get(str(value), "Error: no translation provided")
-            if str(value) in options.values():
+            if str(value) in optiongroup.option_values:
                 new_values.append(value)
             else:
                 new_values.append("Error: non-existent option")
         else:
             if translate_dict:
                 value = translate_dict.get(str(value), parent_value)
-            if str(value) in options.values():
+            if str(value) in optiongroup.option_values:
                 new_values.append(value)
             else:
                 new_values.append(parent_value)
@@ -397,12 +392,13 @@ def translate_label_data(
 
 def translate_value_data(
     new_values: list,
-    options: dict,
+    optiongroup: "CastorOptionGroup",
     parent_value: str,
     translate_dict: typing.Optional[dict],
     values: list,
 ):
     """Translates value data if necessary and checks if it falls within the Castor optiongroup"""
+    options = optiongroup.name_to_value
     for value in values:
         if pd.isnull(parent_value):
             if translate_dict:
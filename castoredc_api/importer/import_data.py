@@ -19,7 +19,7 @@ from castoredc_api.importer.sync_import import (
 )
 
 if typing.TYPE_CHECKING:
-    from castoredc_api import CastorStudy
+    from castoredc_api import CastorStudy, CastorProgress
 
 
 def import_data(
@@ -34,9 +34,13 @@ def import_data(
     merge_path: typing.Optional[str] = None,
     format_options=None,
     use_async=False,
+    *,
+    progress: typing.Optional["CastorProgress"] = None,
 ) -> dict:
     """Imports data from data_source_path to study with configuration options.
+    Progress reports the upload, defaults to the progress of the study.
     Returns a dict with successful and failed uploads."""
+    progress = study.progress if progress is None else progress
     # Set configuration options
     configuration = {
         "date": "%d-%m-%Y",
@@ -46,8 +50,8 @@ def import_data(
     if format_options:
         configuration.update(format_options)
 
-    # Map the structure of your study locally
-    study.map_structure()
+    # Map the structure of your study locally, other components load when used
+    study.map_structure(components=[])
 
     # Prepare output directory
     pathlib.Path(pathlib.Path.cwd(), "output").mkdir(parents=True, exist_ok=True)
@@ -84,10 +88,16 @@ def import_data(
         )
     # Upload the data
     upload = upload_data(
-        castorized_dataframe, study, target, target_name, email, use_async
+        castorized_dataframe,
+        study,
+        target,
+        target_name,
+        email,
+        use_async,
+        progress=progress,
     )
 
-    # Print results
+    # Print results, these are always shown whatever the progress reporter
     print(
         f"Success: {sum(len(row['success']) for key, item in upload.items() for row in item)} \n"
         f"Failure: {sum(len(row['failed']) for key, item in upload.items() for row in item)} \n"
@@ -104,8 +114,12 @@ def upload_data(
     target_name: typing.Optional[str],
     email: typing.Optional[str],
     use_async: bool = False,
+    *,
+    progress: typing.Optional["CastorProgress"] = None,
 ) -> dict:
-    """Uploads each row from the castorized dataframe as a new form"""
+    """Uploads each row from the castorized dataframe as a new form.
+    Progress reports the upload, defaults to the progress of the study."""
+    progress = study.progress if progress is None else progress
     # Shared Data
     upload_datetime = datetime.now().strftime("%Y%m%d %H%M%S")
     common = {
@@ -116,19 +130,22 @@ def upload_data(
     if target == "Study":
         if use_async:
             upload = upload_study_async(
-                castorized_dataframe, common, upload_datetime, study
+                castorized_dataframe,
+                common,
+                upload_datetime,
+                study,
+                progress=progress,
             )
         else:
-            upload = upload_study(castorized_dataframe, common, upload_datetime, study)
+            upload = upload_study(
+                castorized_dataframe,
+                common,
+                upload_datetime,
+                study,
+                progress=progress,
+            )
     elif target == "Survey":
-        target_form = next(
-            (
-                form
-                for form in study.client.all_survey_packages()
-                if form["name"] == target_name
-            ),
-            None,
-        )
+        target_form = study.get_single_survey_package(target_name)
         if use_async:
             upload = upload_survey_async(
                 castorized_dataframe,
@@ -136,6 +153,7 @@ def upload_data(
                 target_form["id"],
                 email,
                 f"api_upload_{target}_{upload_datetime}",
+                progress=progress,
             )
         else:
             upload = upload_survey(
@@ -144,6 +162,7 @@ def upload_data(
                 target_form["id"],
                 email,
                 f"api_upload_{target}_{upload_datetime}",
+                progress=progress,
             )
     elif target == "Report":
         target_form = study.get_single_form_name(target_name)
@@ -154,6 +173,7 @@ def upload_data(
                 upload_datetime,
                 study,
                 target_form.form_id,
+                progress=progress,
             )
         else:
             upload = upload_report(
@@ -162,6 +182,7 @@ def upload_data(
                 upload_datetime,
                 study,
                 target_form.form_id,
+                progress=progress,
             )
     else:
         raise CastorException(
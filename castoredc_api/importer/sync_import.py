@@ -7,7 +7,6 @@ from json import JSONDecodeError
 
 import pandas as pd
 from httpx import HTTPStatusError, RequestError
-from tqdm import tqdm
 
 from castoredc_api.importer.helpers import (
     format_feedback,
@@ -20,7 +19,7 @@ from castoredc_api.importer.helpers import (
 )
 
 if typing.TYPE_CHECKING:
-    from castoredc_api import CastorStudy
+    from castoredc_api import CastorStudy, CastorProgress
 
 
 def upload_study(
@@ -28,12 +27,16 @@ def upload_study(
     common: dict,
     upload_datetime: str,
     study: "CastorStudy",
+    *,
+    progress: "CastorProgress",
 ) -> dict:
     """Uploads study data to the study."""
     imported = []
 
     with study.client.sync_rate_limiter:
-        for row in tqdm(castorized_dataframe.to_dict("records"), "Uploading Data"):
+        for row in progress.track(
+            castorized_dataframe.to_dict("records"), "Uploading Data"
+        ):
             body = [
                 {
                     "field_id": study.get_single_field(field).field_id,
@@ -91,12 +94,16 @@ def upload_survey(
     package_id: str,
     email: str,
     change_reason: str,
+    *,
+    progress: "CastorProgress",
 ) -> dict:
     """Uploads survey data to the study."""
     imported = []
 
     with study.client.sync_rate_limiter:
-        for row in tqdm(castorized_dataframe.to_dict("records"), "Uploading Data"):
+        for row in progress.track(
+            castorized_dataframe.to_dict("records"), "Uploading Data"
+        ):
             instance = create_survey_package_instance(
                 study, imported, package_id, row, email
             )
@@ -165,11 +172,15 @@ def upload_report(
     upload_datetime: str,
     study: "CastorStudy",
     package_id: str,
+    *,
+    progress: "CastorProgress",
 ) -> dict:
     """Uploads report data to the study."""
     imported = []
     with study.client.sync_rate_limiter:
-        for row in tqdm(castorized_dataframe.to_dict("records"), "Uploading Data"):
+        for row in progress.track(
+            castorized_dataframe.to_dict("records"), "Uploading Data"
+        ):
             # Create a report instance
             instance = create_report_instance(study, imported, package_id, row)
             # Create the report body
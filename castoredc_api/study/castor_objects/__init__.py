@@ -3,6 +3,8 @@ from .castor_record import CastorRecord
 from .castor_form import CastorForm
 from .castor_step import CastorStep
 from .castor_field import CastorField
+from .castor_option_group import CastorOptionGroup
+from .castor_data_store import CastorDataStore, CastorDataPointView
 
 from .castor_form_instance import CastorFormInstance
 from .castor_survey_form_instance import CastorSurveyFormInstance
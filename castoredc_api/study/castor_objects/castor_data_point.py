@@ -1,18 +1,41 @@
 """Module for representing a Castor datapoint in Python."""
+import sys
 from datetime import datetime
 import typing
 import numpy as np
 import pandas as pd
 from castoredc_api import CastorException
+from castoredc_api.study.data_interpretation import (
+    NOT_RECOGNIZED,
+    USER_MISSINGS,
+    USER_MISSING_STRINGS,
+    parse_filled_in,
+    user_missing_type,
+)
 
 if typing.TYPE_CHECKING:
     from castoredc_api.study.castor_objects.castor_field import CastorField
     from castoredc_api.study.castor_study import CastorStudy
 
+# Marks a value that is not interpreted yet, as None can be an interpreted value
+_UNSET = object()
+
 
 class CastorDataPoint:
     """Object representing a Castor datapoint.
-    Is an instance of a field with a value for a record.."""
+    Is an instance of a field with a value for a record.
+    The value and filled_in date are interpreted on first access and then cached.
+    The value is read-only, as exports interpret the raw value."""
+
+    __slots__ = (
+        "field_id",
+        "raw_value",
+        "study",
+        "instance_of",
+        "form_instance",
+        "_filled_in",
+        "_value",
+    )
 
     def __init__(
         self,
@@ -22,21 +45,39 @@ class CastorDataPoint:
         filled_in: str,
     ) -> None:
         """Creates a CastorField."""
-        self.field_id = field_id
+        # Data points of a field share a single id string
+        self.field_id = sys.intern(field_id)
         self.raw_value = raw_value
+        self.study = study
         self.instance_of = self.find_field(study)
         if self.instance_of is None:
             raise CastorException(
                 "The field that this is an instance of does not exist in the study!"
             )
         self.form_instance = None
-        self.filled_in = (
-            None
-            if filled_in == ""
-            else datetime.strptime(filled_in, "%Y-%m-%d %H:%M:%S")
-        )
-        # Is missing
-        self.value = self.__interpret(study)
+        # Raw string until first access, parsed datetime (or None) afterwards
+        self._filled_in = filled_in
+        # _UNSET until first access, interpreted value afterwards
+        self._value = _UNSET
+
+    @property
+    def value(self) -> typing.Any:
+        """Returns the interpreted value, interpreting the raw value on first access."""
+        if self._value is _UNSET:
+            self._value = self.__interpret(self.study)
+        return self._value
+
+    @property
+    def filled_in(self) -> typing.Optional[datetime]:
+        """Returns the datetime the data point was filled in, parsed on first access."""
+        if isinstance(self._filled_in, str):
+            self._filled_in = parse_filled_in(self._filled_in)
+        return self._filled_in
+
+    @filled_in.setter
+    def filled_in(self, filled_in: typing.Optional[datetime]) -> None:
+        """Overrides the datetime the data point was filled in."""
+        self._filled_in = filled_in
 
     # Helpers
     def find_field(self, study: "CastorStudy") -> "CastorField":
@@ -64,14 +105,18 @@ class CastorDataPoint:
             interpreted_value = self.raw_value
         elif self.instance_of.field_type in ["datetime"]:
             interpreted_value = self.__interpret_datetime(
-                study.configuration["datetime"]
+                study, study.configuration["datetime"]
             )
         elif self.instance_of.field_type in ["date"]:
-            interpreted_value = self.__interpret_date(study.configuration["date"])
+            interpreted_value = self.__interpret_date(
+                study, study.configuration["date"]
+            )
         elif self.instance_of.field_type in ["time"]:
             interpreted_value = self.__interpret_time(study.configuration["time"])
         elif self.instance_of.field_type in ["numberdate"]:
-            interpreted_value = self.__interpret_numberdate(study.configuration["date"])
+            interpreted_value = self.__interpret_numberdate(
+                study, study.configuration["date"]
+            )
         else:
             interpreted_value = "Error"
         return interpreted_value
@@ -81,51 +126,23 @@ class CastorDataPoint:
         if self.raw_value == "":
             new_value = ""
         elif "Missing" in self.raw_value:
-            if "measurement failed" in self.raw_value:
-                new_value = "-95"
-            elif "not applicable" in self.raw_value:
-                new_value = "-96"
-            elif "not asked" in self.raw_value:
-                new_value = "-97"
-            elif "asked but unknown" in self.raw_value:
-                new_value = "-98"
-            elif "not done" in self.raw_value:
-                new_value = "-99"
-            else:
-                new_value = "Missing value not recognized"
+            new_value = USER_MISSING_STRINGS.get(
+                user_missing_type(self.raw_value), NOT_RECOGNIZED
+            )
         else:
             new_value = (
                 datetime.strptime(self.raw_value, "%H:%M").time().strftime(time_format)
             )
         return new_value
 
-    def __interpret_datetime(self, datetime_format: str):
+    def __interpret_datetime(self, study: "CastorStudy", datetime_format: str):
         """Interprets date and datetime data while handling user missings."""
         if self.raw_value == "":
             new_value = np.nan
         elif "Missing" in self.raw_value:
-            if "measurement failed" in self.raw_value:
-                new_value = pd.Period(year=2995, month=1, day=1, freq="S").strftime(
-                    datetime_format
-                )
-            elif "not applicable" in self.raw_value:
-                new_value = pd.Period(year=2996, month=1, day=1, freq="S").strftime(
-                    datetime_format
-                )
-            elif "not asked" in self.raw_value:
-                new_value = pd.Period(year=2997, month=1, day=1, freq="S").strftime(
-                    datetime_format
-                )
-            elif "asked but unknown" in self.raw_value:
-                new_value = pd.Period(year=2998, month=1, day=1, freq="S").strftime(
-                    datetime_format
-                )
-            elif "not done" in self.raw_value:
-                new_value = pd.Period(year=2999, month=1, day=1, freq="S").strftime(
-                    datetime_format
-                )
-            else:
-                new_value = "Missing value not recognized"
+            new_value = study.get_missing_dates("S", datetime_format).get(
+                user_missing_type(self.raw_value), NOT_RECOGNIZED
+            )
         else:
             try:
                 new_value = pd.Period(
@@ -138,33 +155,14 @@ class CastorDataPoint:
 
         return new_value
 
-    def __interpret_date(self, date_format: str):
+    def __interpret_date(self, study: "CastorStudy", date_format: str):
         """Interprets date and datetime data while handling user missings."""
         if self.raw_value == "":
             new_value = np.nan
         elif "Missing" in self.raw_value:
-            if "measurement failed" in self.raw_value:
-                new_value = pd.Period(year=2995, month=1, day=1, freq="D").strftime(
-                    date_format
-                )
-            elif "not applicable" in self.raw_value:
-                new_value = pd.Period(year=2996, month=1, day=1, freq="D").strftime(
-                    date_format
-                )
-            elif "not asked" in self.raw_value:
-                new_value = pd.Period(year=2997, month=1, day=1, freq="D").strftime(
-                    date_format
-                )
-            elif "asked but unknown" in self.raw_value:
-                new_value = pd.Period(year=2998, month=1, day=1, freq="D").strftime(
-                    date_format
-                )
-            elif "not done" in self.raw_value:
-                new_value = pd.Period(year=2999, month=1, day=1, freq="D").strftime(
-                    date_format
-                )
-            else:
-                new_value = "Missing value not recognized"
+            new_value = study.get_missing_dates("D", date_format).get(
+                user_missing_type(self.raw_value), NOT_RECOGNIZED
+            )
         else:
             new_value = pd.Period(
                 datetime.strptime(self.raw_value, "%d-%m-%Y"), freq="D"
@@ -177,18 +175,7 @@ class CastorDataPoint:
         if self.raw_value == "":
             new_value = ""
         elif "Missing" in self.raw_value:
-            if "measurement failed" in self.raw_value:
-                new_value = "measurement failed"
-            elif "not applicable" in self.raw_value:
-                new_value = "not applicable"
-            elif "not asked" in self.raw_value:
-                new_value = "not asked"
-            elif "asked but unknown" in self.raw_value:
-                new_value = "asked but unknown"
-            elif "not done" in self.raw_value:
-                new_value = "not done"
-            else:
-                new_value = "Missing value not recognized"
+            new_value = user_missing_type(self.raw_value) or NOT_RECOGNIZED
         else:
             new_value = self.__interpret_optiongroup_helper(study)
         return new_value
@@ -197,16 +184,13 @@ class CastorDataPoint:
         """Interprets values in an optiongroup field."""
         # Get the optiongroup for this data point
         optiongroup = self.instance_of.field_option_group
-        # Retrieve the options
-        study_optiongroup = study.get_single_optiongroup(optiongroup)
-        if study_optiongroup is None:
+        # Retrieve the lookup table of value: name
+        lookup = study.get_single_optiongroup_lookup(optiongroup)
+        if lookup is None:
             raise CastorException(
                 "Optiongroup not found. Is id correct and are optiongroups loaded?"
             )
-        # Get options
-        options = study_optiongroup["options"]
-        # Transform options into dict value: name
-        link = {item["value"]: item["name"] for item in options}
+        link = lookup.value_to_name
         # Get values, split by ; for checklists
         value_list = self.raw_value.split(";")
         # Values to names
@@ -219,7 +203,8 @@ class CastorDataPoint:
                 new_values = [link[value] for value in value_list]
             except KeyError as error:
                 raise CastorException(
-                    f"Optional value mapping failed for optiongroup: {study_optiongroup}"
+                    f"Optional value mapping failed for optiongroup: "
+                    f"{lookup.optiongroup_name} ({lookup.optiongroup_id}) "
                     f"Key `{self.raw_value}` not present in the keys of the optiongroup"
                     f"of field: {self.field_id} ({self.instance_of.field_name})"
                 ) from error
@@ -232,18 +217,9 @@ class CastorDataPoint:
         if self.raw_value == "":
             new_value = np.nan
         elif "Missing" in self.raw_value:
-            if "measurement failed" in self.raw_value:
-                new_value = -95
-            elif "not applicable" in self.raw_value:
-                new_value = -96
-            elif "not asked" in self.raw_value:
-                new_value = -97
-            elif "asked but unknown" in self.raw_value:
-                new_value = -98
-            elif "not done" in self.raw_value:
-                new_value = -99
-            else:
-                new_value = "Missing value not recognized"
+            new_value = USER_MISSINGS.get(
+                user_missing_type(self.raw_value), NOT_RECOGNIZED
+            )
         else:
             new_value = float(self.raw_value)
         return new_value
@@ -253,23 +229,14 @@ class CastorDataPoint:
         if self.raw_value == "":
             new_value = np.nan
         elif "Missing" in self.raw_value:
-            if "measurement failed" in self.raw_value:
-                new_value = -95
-            elif "not applicable" in self.raw_value:
-                new_value = -96
-            elif "not asked" in self.raw_value:
-                new_value = -97
-            elif "asked but unknown" in self.raw_value:
-                new_value = -98
-            elif "not done" in self.raw_value:
-                new_value = -99
-            else:
-                new_value = "Missing value not recognized"
+            new_value = USER_MISSINGS.get(
+                user_missing_type(self.raw_value), NOT_RECOGNIZED
+            )
         else:
             new_value = int(self.raw_value)
         return new_value
 
-    def __interpret_numberdate(self, date_format: str):
+    def __interpret_numberdate(self, study: "CastorStudy", date_format: str):
         """Interprets numberdate data while handling user missings."""
         if self.raw_value == "":
             new_value = [
@@ -277,45 +244,13 @@ class CastorDataPoint:
                 np.nan,
             ]
         elif "Missing" in self.raw_value:
-            if "measurement failed" in self.raw_value:
-                new_value = [
-                    -95,
-                    pd.Period(year=2995, month=1, day=1, freq="D").strftime(
-                        date_format
-                    ),
-                ]
-            elif "not applicable" in self.raw_value:
-                new_value = [
-                    -96,
-                    pd.Period(year=2996, month=1, day=1, freq="D").strftime(
-                        date_format
-                    ),
-                ]
-            elif "not asked" in self.raw_value:
-                new_value = [
-                    -97,
-                    pd.Period(year=2997, month=1, day=1, freq="D").strftime(
-                        date_format
-                    ),
-                ]
-            elif "asked but unknown" in self.raw_value:
-                new_value = [
-                    -98,
-                    pd.Period(year=2998, month=1, day=1, freq="D").strftime(
-                        date_format
-                    ),
-                ]
-            elif "not done" in self.raw_value:
-                new_value = [
-                    -99,
-                    pd.Period(year=2999, month=1, day=1, freq="D").strftime(
-                        date_format
-                    ),
-                ]
+            missing_type = user_missing_type(self.raw_value)
+            if missing_type is None:
+                new_value = [NOT_RECOGNIZED, NOT_RECOGNIZED]
             else:
                 new_value = [
-                    "Missing value not recognized",
-                    "Missing value not recognized",
+                    USER_MISSINGS[missing_type],
+                    study.get_missing_dates("D", date_format)[missing_type],
                 ]
         else:
             # Get number and date from the string
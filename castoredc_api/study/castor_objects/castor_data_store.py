@@ -0,0 +1,332 @@
+"""Module for storing the data points of a Castor study in columns."""
+import sys
+import typing
+from array import array
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from castoredc_api import CastorException
+from castoredc_api.study.castor_objects.castor_data_point import _UNSET
+from castoredc_api.study.data_interpretation import interpret_column, parse_filled_in
+
+if typing.TYPE_CHECKING:
+    from castoredc_api.study.castor_objects.castor_field import CastorField
+    from castoredc_api.study.castor_objects.castor_form_instance import (
+        CastorFormInstance,
+    )
+    from castoredc_api.study.castor_objects.castor_record import CastorRecord
+    from castoredc_api.study.castor_study import CastorStudy
+
+
+class CastorDataStore:
+    """Object storing all data points of a study in column arrays.
+    Records, form instances and fields are integer coded, every data point is a row.
+    Alternative to a CastorDataPoint object per data point, see CastorStudy(storage=).
+    """
+
+    # pylint: disable=too-many-instance-attributes
+    # One attribute per column plus the indexes
+
+    def __init__(self, study: "CastorStudy") -> None:
+        """Creates an empty CastorDataStore."""
+        self.study = study
+        # Codes: position in these lists
+        self.records = []
+        self.form_instances = []
+        self.fields = []
+        self.record_codes = {}
+        self.instance_codes = {}
+        self.field_codes = {}
+        # Columns, one entry per data point
+        self.record_column = array("i")
+        self.instance_column = array("i")
+        self.field_column = array("i")
+        self.raw_values = []
+        self.filled_in = []
+        self.values = None
+        self.interpreted_fields = set()
+        # Rows grouped per form instance, created on first lookup
+        self._order = None
+        self._starts = None
+        # Incremented when rows are removed, as views of the old rows are then stale
+        self.generation = 0
+
+    def __len__(self) -> int:
+        return len(self.raw_values)
+
+    def add_data_point(
+        self,
+        field_id: str,
+        raw_value: str,
+        filled_in: str,
+        form_instance: "CastorFormInstance",
+    ) -> None:
+        """Adds a data point of field_id to the form instance."""
+        field_code = self.field_codes.get(field_id)
+        if field_code is None:
+            field = self.study.get_single_field(field_id)
+            if field is None:
+                raise CastorException(
+                    "The field that this is an instance of does not exist in the study!"
+                )
+            field_code = self.__add_code(
+                field, field.field_id, self.fields, self.field_codes
+            )
+            # Data points can also be added on field name
+            self.field_codes[field_id] = field_code
+        instance_key = (form_instance.record.record_id, form_instance.instance_id)
+        instance_code = self.instance_codes.get(instance_key)
+        if instance_code is None:
+            instance_code = self.__add_code(
+                form_instance, instance_key, self.form_instances, self.instance_codes
+            )
+        record_code = self.record_codes.get(form_instance.record.record_id)
+        if record_code is None:
+            record_code = self.__add_code(
+                form_instance.record,
+                form_instance.record.record_id,
+                self.records,
+                self.record_codes,
+            )
+        else:
+            # Records are replaced when their data is mapped again
+            self.records[record_code] = form_instance.record
+        self.record_column.append(record_code)
+        self.instance_column.append(instance_code)
+        self.field_column.append(field_code)
+        self.raw_values.append(raw_value)
+        # Only a few distinct dates exist, so share the strings
+        self.filled_in.append(sys.intern(filled_in))
+        # The new value of the field is interpreted on the next lookup
+        self.interpreted_fields.discard(field_code)
+        self._order = None
+
+    def remove_records(self, record_ids: typing.Iterable[str]) -> None:
+        """Removes all data points of the records in a single pass.
+        Records keep their codes, so they keep their position when data is added again.
+        Values of the remaining data points stay interpreted.
+        Removing shifts the rows, so views created before raise an error when used."""
+        record_ids = set(record_ids)
+        record_codes = [
+            self.record_codes[record_id]
+            for record_id in record_ids
+            if record_id in self.record_codes
+        ]
+        if not record_codes:
+            return
+        keep = ~np.isin(np.frombuffer(self.record_column, dtype=np.intc), record_codes)
+        rows = np.flatnonzero(keep).tolist()
+        for name in ("record_column", "instance_column", "field_column"):
+            column = np.frombuffer(getattr(self, name), dtype=np.intc)[keep]
+            setattr(self, name, array("i", column.tobytes()))
+        self.raw_values = [self.raw_values[row] for row in rows]
+        self.filled_in = [self.filled_in[row] for row in rows]
+        if self.values is not None:
+            # Rows added after the last interpretation have no value yet
+            self.values = self.values[keep[: len(self.values)]]
+        # Form instances of the records get new codes when added again
+        for key in [key for key in self.instance_codes if key[0] in record_ids]:
+            del self.instance_codes[key]
+        self._order = None
+        self.generation += 1
+
+    @staticmethod
+    def __add_code(item: typing.Any, key: typing.Any, items: list, codes: dict) -> int:
+        """Adds an item to a coded list and returns its code."""
+        codes[key] = len(items)
+        items.append(item)
+        return codes[key]
+
+    # Lookups
+    def __index(self) -> None:
+        """Groups the rows per form instance and checks for duplicated data points."""
+        if self._order is not None:
+            return
+        instances = np.frombuffer(self.instance_column, dtype=np.intc)
+        fields = np.frombuffer(self.field_column, dtype=np.intc)
+        # Data points are unique per form instance and field
+        keys = instances * max(len(self.fields), 1) + fields
+        if np.unique(keys).size != keys.size:
+            raise CastorException("Duplicated data point found!")
+        self._order = np.argsort(instances, kind="stable")
+        self._starts = np.searchsorted(
+            instances[self._order], np.arange(len(self.form_instances) + 1)
+        )
+
+    def __instance_rows(self, instance_code: int) -> np.ndarray:
+        """Returns the rows of a single form instance."""
+        self.__index()
+        return self._order[
+            self._starts[instance_code] : self._starts[instance_code + 1]
+        ]
+
+    def get_all_data_points(self) -> typing.List["CastorDataPointView"]:
+        """Returns views of all data points, grouped per record and form instance."""
+        self.__index()
+        records = np.frombuffer(self.record_column, dtype=np.intc)
+        instances = np.frombuffer(self.instance_column, dtype=np.intc)
+        order = np.lexsort((instances, records))
+        return [CastorDataPointView(self, row) for row in order.tolist()]
+
+    def get_instance_data_points(
+        self, record_id: str, form_instance_id: str
+    ) -> typing.List["CastorDataPointView"]:
+        """Returns views of all data points of a single form instance."""
+        instance_code = self.instance_codes.get((record_id, form_instance_id))
+        if instance_code is None:
+            return []
+        return [
+            CastorDataPointView(self, row)
+            for row in self.__instance_rows(instance_code).tolist()
+        ]
+
+    def get_single_data_point(
+        self, record_id: str, form_instance_id: str, field_id_or_name: str
+    ) -> typing.Optional["CastorDataPointView"]:
+        """Returns a view of a single data point based on id or name.
+        Returns None if not found."""
+        instance_code = self.instance_codes.get((record_id, form_instance_id))
+        field_code = self.field_codes.get(field_id_or_name)
+        if field_code is None:
+            field = self.study.get_single_field(field_id_or_name)
+            field_code = None if field is None else self.field_codes.get(field.field_id)
+        if instance_code is None or field_code is None:
+            return None
+        rows = self.__instance_rows(instance_code)
+        found = rows[
+            np.frombuffer(self.field_column, dtype=np.intc)[rows] == field_code
+        ]
+        if found.size == 0:
+            return None
+        return CastorDataPointView(self, int(found[0]))
+
+    def get_raw_values(
+        self, form_instances: typing.List["CastorFormInstance"]
+    ) -> typing.Dict[str, str]:
+        """Returns the raw values of the form instances as {field_name: raw_value}."""
+        rows = [
+            self.__instance_rows(self.instance_codes[key])
+            for key in (
+                (instance.record.record_id, instance.instance_id)
+                for instance in form_instances
+            )
+            if key in self.instance_codes
+        ]
+        if not rows:
+            return {}
+        rows = np.concatenate(rows).tolist()
+        return {
+            self.fields[self.field_column[row]].field_name: self.raw_values[row]
+            for row in rows
+        }
+
+    # Values
+    def get_value(self, row: int) -> typing.Any:
+        """Returns the interpreted value of a row.
+        All values of the field of this row are interpreted at once on first access."""
+        field_code = self.field_column[row]
+        if field_code not in self.interpreted_fields:
+            self.__interpret_field(field_code)
+        return self.values[row]
+
+    def __interpret_field(self, field_code: int) -> None:
+        """Interprets the raw values of a single field that are not interpreted yet."""
+        if self.values is None:
+            self.values = np.full(len(self), _UNSET, dtype=object)
+        elif len(self.values) < len(self):
+            self.values = np.concatenate(
+                [self.values, np.full(len(self) - len(self.values), _UNSET)]
+            )
+        rows = [
+            row
+            for row in np.flatnonzero(
+                np.frombuffer(self.field_column, dtype=np.intc) == field_code
+            ).tolist()
+            if self.values[row] is _UNSET
+        ]
+        if rows:
+            raw = pd.Series([self.raw_values[row] for row in rows], dtype=object)
+            interpreted = interpret_column(raw, self.fields[field_code], self.study)
+            for row, value in zip(rows, interpreted.tolist()):
+                self.values[row] = value
+        self.interpreted_fields.add(field_code)
+
+
+class CastorDataPointView:
+    """Lightweight view of a data point in a CastorDataStore.
+    Has the same attributes as a CastorDataPoint, but only holds the row number.
+    Views are invalidated when records are removed from the store,
+    e.g. by map_data(incremental=True), get them again afterwards."""
+
+    __slots__ = ("store", "row", "generation")
+
+    def __init__(self, store: CastorDataStore, row: int) -> None:
+        """Creates a CastorDataPointView."""
+        self.store = store
+        self.row = row
+        self.generation = store.generation
+
+    def __valid_row(self) -> int:
+        """Returns the row of the data point, raises an error if the view is stale."""
+        if self.generation != self.store.generation:
+            raise CastorException(
+                "Data point view is outdated as records were removed from the store. "
+                "Get the data point again."
+            )
+        return self.row
+
+    @property
+    def instance_of(self) -> "CastorField":
+        """Returns the field that this data point is an instance of."""
+        return self.store.fields[self.store.field_column[self.__valid_row()]]
+
+    @property
+    def field_id(self) -> str:
+        """Returns the id of the field of the data point."""
+        return self.instance_of.field_id
+
+    @property
+    def raw_value(self) -> str:
+        """Returns the raw value as exported from Castor."""
+        return self.store.raw_values[self.__valid_row()]
+
+    @property
+    def form_instance(self) -> "CastorFormInstance":
+        """Returns the form instance of the data point."""
+        return self.store.form_instances[self.store.instance_column[self.__valid_row()]]
+
+    @property
+    def record(self) -> "CastorRecord":
+        """Returns the record of the data point."""
+        return self.store.records[self.store.record_column[self.__valid_row()]]
+
+    @property
+    def value(self) -> typing.Any:
+        """Returns the interpreted value."""
+        return self.store.get_value(self.__valid_row())
+
+    @property
+    def filled_in(self) -> typing.Optional[datetime]:
+        """Returns the datetime the data point was filled in."""
+        return parse_filled_in(self.store.filled_in[self.__valid_row()])
+
+    # Standard Operators
+    def __eq__(self, other: typing.Any) -> typing.Union[bool, type(NotImplemented)]:
+        if not isinstance(other, CastorDataPointView):
+            return NotImplemented
+        return (
+            self.store is other.store
+            and self.row == other.row
+            and self.generation == other.generation
+        )
+
+    def __repr__(self) -> str:
+        return (
+            self.record.record_id
+            + " - "
+            + self.form_instance.instance_of.form_name
+            + " - "
+            + self.instance_of.field_name
+        )
@@ -1,4 +1,5 @@
 """Module for representing a CastorField in Python."""
+import sys
 from typing import Optional, Union, Any
 
 
@@ -8,6 +9,20 @@ class CastorField:
     # pylint: disable=too-many-instance-attributes
     # Field has more attributes
 
+    __slots__ = (
+        "field_id",
+        "field_name",
+        "field_label",
+        "field_type",
+        "field_required",
+        "field_option_group",
+        "field_order",
+        "step",
+        "_field_dependency",
+        "_field_max",
+        "_field_min",
+    )
+
     def __init__(
         self,
         field_name: str,
@@ -19,7 +34,7 @@ class CastorField:
         field_order: str,
     ) -> None:
         """Creates a CastorField."""
-        self.field_id = field_id
+        self.field_id = sys.intern(field_id)
         self.field_name = field_name
         self.field_label = field_label
         self.field_type = field_type
@@ -27,9 +42,47 @@ class CastorField:
         self.field_option_group = field_option_group
         self.field_order = field_order
         self.step = None
-        self.field_dependency = None
-        self.field_max = None
-        self.field_min = None
+        self._field_dependency = None
+        self._field_max = None
+        self._field_min = None
+
+    # Loaded from the study on first access when map_structure skipped them
+    @property
+    def field_dependency(self) -> Optional[dict]:
+        """The parent field and value this field depends on."""
+        self.__load_component("dependencies")
+        return self._field_dependency
+
+    @field_dependency.setter
+    def field_dependency(self, dependency: Optional[dict]) -> None:
+        self._field_dependency = dependency
+
+    @property
+    def field_max(self) -> Optional[float]:
+        """The maximum value of the field."""
+        self.__load_component("fields")
+        return self._field_max
+
+    @field_max.setter
+    def field_max(self, field_max: Optional[float]) -> None:
+        self._field_max = field_max
+
+    @property
+    def field_min(self) -> Optional[float]:
+        """The minimum value of the field."""
+        self.__load_component("fields")
+        return self._field_min
+
+    @field_min.setter
+    def field_min(self, field_min: Optional[float]) -> None:
+        self._field_min = field_min
+
+    def __load_component(self, component: str) -> None:
+        """Lets the study load a component of its structure if not loaded yet."""
+        if self.step is not None and self.step.form is not None:
+            study = self.step.form.study
+            if study is not None and component in study.pending_components:
+                study.load_components([component])
 
     # Standard Operators
     def __eq__(self, other: Any) -> Union[bool, type(NotImplemented)]:
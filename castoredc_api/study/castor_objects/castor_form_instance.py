@@ -4,6 +4,7 @@ from castoredc_api import CastorException
 
 if typing.TYPE_CHECKING:
     from castoredc_api.study.castor_objects.castor_data_point import CastorDataPoint
+    from castoredc_api.study.castor_objects.castor_data_store import CastorDataStore
     from castoredc_api.study.castor_objects.castor_form import CastorForm
     from castoredc_api.study.castor_study import CastorStudy
 
@@ -12,6 +13,16 @@ class CastorFormInstance:
     """Object representing a Castor form instance.
     Examples are survey instance or report instance."""
 
+    __slots__ = (
+        "instance_id",
+        "name_of_form",
+        "instance_type",
+        "record",
+        "data_points_on_id",
+        "data_points_on_name",
+        "instance_of",
+    )
+
     def __init__(
         self,
         instance_id: str,
@@ -42,6 +53,11 @@ class CastorFormInstance:
 
     def get_all_data_points(self) -> typing.List["CastorDataPoint"]:
         """Returns all data_points of the form instance"""
+        data_store = self.__data_store()
+        if data_store is not None:
+            return data_store.get_instance_data_points(
+                self.record.record_id, self.instance_id
+            )
         return list(self.data_points_on_id.values())
 
     def get_single_data_point(
@@ -49,12 +65,23 @@ class CastorFormInstance:
     ) -> typing.Optional["CastorDataPoint"]:
         """Returns a single data_point based on id or name.
         Returns None if not found on id or name."""
+        data_store = self.__data_store()
+        if data_store is not None:
+            return data_store.get_single_data_point(
+                self.record.record_id, self.instance_id, field_id_or_name
+            )
         data_point = self.data_points_on_id.get(field_id_or_name)
         if data_point is None:
             return self.data_points_on_name.get(field_id_or_name)
         return data_point
 
     # Helpers
+    def __data_store(self) -> typing.Optional["CastorDataStore"]:
+        """Returns the data store of the study if data points are stored in columns."""
+        if self.record is None or self.record.study is None:
+            return None
+        return self.record.study.data_store
+
     def find_form(
         self, study: "CastorStudy"
     ) -> typing.Union["CastorForm", CastorException]:
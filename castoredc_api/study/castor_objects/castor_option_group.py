@@ -0,0 +1,41 @@
+"""Module for representing a Castor optiongroup in Python."""
+import typing
+from types import MappingProxyType
+
+from castoredc_api.study.data_interpretation import USER_MISSINGS
+
+
+class CastorOptionGroup:
+    """Object representing a Castor optiongroup.
+    Holds read-only lookup tables that are created once per optiongroup."""
+
+    def __init__(self, optiongroup: dict) -> None:
+        """Creates a CastorOptionGroup from the optiongroup data of the API."""
+        self.optiongroup_id = optiongroup["id"]
+        self.optiongroup_name = optiongroup.get("name")
+        options = optiongroup["options"]
+        self._value_to_name = {option["value"]: option["name"] for option in options}
+        self._name_to_value = {option["name"]: option["value"] for option in options}
+        self.option_names = tuple(option["name"] for option in options)
+        self.option_values = frozenset(self._value_to_name)
+        # Categories for categorical columns: options + missings without duplicates
+        self.categories = tuple(set(list(self.option_names) + list(USER_MISSINGS)))
+
+    @property
+    def value_to_name(self) -> typing.Mapping[str, str]:
+        """Returns a read-only mapping of {option value: option name}."""
+        return MappingProxyType(self._value_to_name)
+
+    @property
+    def name_to_value(self) -> typing.Mapping[str, str]:
+        """Returns a read-only mapping of {option name: option value}."""
+        return MappingProxyType(self._name_to_value)
+
+    # Standard Operators
+    def __eq__(self, other: typing.Any) -> typing.Union[bool, type(NotImplemented)]:
+        if not isinstance(other, CastorOptionGroup):
+            return NotImplemented
+        return self.optiongroup_id == other.optiongroup_id
+
+    def __repr__(self) -> str:
+        return str(self.optiongroup_name)
@@ -12,6 +12,16 @@ if typing.TYPE_CHECKING:
 class CastorRecord:
     """Object representing a Castor Record."""
 
+    __slots__ = (
+        "record_id",
+        "institute",
+        "randomisation_group",
+        "randomisation_datetime",
+        "study",
+        "form_instances_ids",
+        "archived",
+    )
+
     def __init__(self, record_id: str) -> None:
         """Creates a CastorRecord."""
         self.record_id = record_id
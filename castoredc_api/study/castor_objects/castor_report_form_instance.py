@@ -9,6 +9,8 @@ if typing.TYPE_CHECKING:
 class CastorReportFormInstance(CastorFormInstance):
     """Object representing a Castor report form instance."""
 
+    __slots__ = ("created_on", "parent", "archived")
+
     def __init__(
         self,
         instance_id: str,
@@ -17,3 +19,8 @@ class CastorReportFormInstance(CastorFormInstance):
     ) -> None:
         """Creates a CastorFormInstance."""
         super().__init__(instance_id, name_of_form, study, "Report")
+
+        # Relevant report data
+        self.created_on = None
+        self.parent = None
+        self.archived = None
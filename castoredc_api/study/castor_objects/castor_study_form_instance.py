@@ -9,6 +9,8 @@ if typing.TYPE_CHECKING:
 class CastorStudyFormInstance(CastorFormInstance):
     """Object representing a Castor study form instance."""
 
+    __slots__ = ()
+
     def __init__(
         self,
         instance_id: str,
@@ -12,6 +12,17 @@ class CastorSurveyFormInstance(CastorFormInstance):
 
     # pylint: disable=too-many-instance-attributes
 
+    __slots__ = (
+        "created_on",
+        "parent",
+        "archived",
+        "sent_on",
+        "progress",
+        "completed_on",
+        "survey_package_id",
+        "survey_package_name",
+    )
+
     def __init__(
         self,
         instance_id: str,
@@ -1,21 +1,42 @@
 """Module for representing a CastorStudy in Python."""
+import functools
+import hashlib
 import itertools
+import json
 import math
 import pathlib
 import re
-import sys
-from datetime import datetime
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
 from operator import attrgetter
-from typing import List, Optional, Any, Union, Dict
+from typing import List, Optional, Any, Union, Dict, Callable, Iterator, Tuple
 
 import pandas as pd
-from tqdm import tqdm
+import pyarrow as pa
 
-from castoredc_api import CastorClient, CastorException
+from castoredc_api import (
+    CastorClient,
+    CastorException,
+    CastorMetrics,
+    CastorProgress,
+)
 from castoredc_api.study.castor_objects.castor_data_point import CastorDataPoint
+from castoredc_api.study.data_interpretation import (
+    OPTIONGROUP_TYPES,
+    USER_MISSINGS,
+    checkbox_dummies,
+    interpret_column,
+    interpret_numberdate,
+    interpreted_dtypes,
+    format_missing_dates,
+    raw_value_kind,
+)
 from castoredc_api.study.castor_objects import (
     CastorField,
     CastorFormInstance,
+    CastorOptionGroup,
+    CastorDataStore,
     CastorRecord,
     CastorStep,
     CastorForm,
@@ -24,6 +45,61 @@ from castoredc_api.study.castor_objects import (
     CastorReportFormInstance,
 )
 
+# Audit trail events without a record that can't change the data,
+# all other events without a record map all data again
+HARMLESS_EVENT_TYPES = ("login", "logged in", "logout", "logged out", "export")
+# User missing types on their numeric code
+USER_MISSING_CODES = {
+    code: missing_type for missing_type, code in USER_MISSINGS.items()
+}
+# Columns of the export data, also used to store data in snapshots
+EXPORT_COLUMNS = (
+    "Record ID",
+    "Form Type",
+    "Form Instance ID",
+    "Form Instance Name",
+    "Field ID",
+    "Value",
+    "Date",
+)
+# Data point collections of the API holding the data of each form type
+DATA_POINT_COLLECTIONS = {
+    "Study": "study",
+    "Survey": "survey-instance",
+    "Report": "report-instance",
+}
+# Selected records are downloaded per record when this takes at most this many
+# requests and fewer requests than the study has records
+RECORD_DOWNLOAD_LIMIT = 150
+# Auxiliary structure that map_structure can download later, on first access
+STRUCTURE_COMPONENTS = ("fields", "dependencies", "optiongroups", "survey_packages")
+# Increased when snapshots of older versions can no longer be loaded
+SNAPSHOT_VERSION = 1
+# Field types without data, these are left out of exports
+NON_DATA_FIELD_TYPES = (
+    "remark",
+    "repeated_measures",
+    "add_report_button",
+    "summary",
+    "image",
+)
+# Columns of the long format export, one row per data point
+LONG_COLUMNS = (
+    "record_id",
+    "form_type",
+    "form",
+    "instance_id",
+    "step",
+    "field",
+    "raw_value",
+    "value",
+    "filled_in",
+)
+# Embedded databases that export_to_database can write to
+DATABASE_BACKENDS = ("sqlite", "duckdb")
+# SQLite column types on the kind of the dtype, other columns are stored as text
+SQLITE_TYPES = {"b": "INTEGER", "i": "INTEGER", "u": "INTEGER", "f": "REAL"}
+
 
 class CastorStudy:
     """Object representing a study in Castor.
@@ -37,6 +113,8 @@ class CastorStudy:
     # Necessary number of public methods to interact with study
     # pylint: disable=too-many-arguments
     # Necessary number of arguments to setup study
+    # pylint: disable=too-many-lines
+    # Necessary number of lines to interact with study
     def __init__(
         self,
         client_id: str,
@@ -46,9 +124,22 @@ class CastorStudy:
         test=False,
         format_options=None,
         pass_keyerrors=False,
+        *,
+        storage="objects",
+        metrics=None,
+        progress=None,
     ) -> None:
-        """Create a CastorStudy object."""
+        """Create a CastorStudy object.
+        Storage controls how data points are kept: a CastorDataPoint per data point ("objects")
+        or in a CastorDataStore of column arrays ("columnar").
+        Metrics is a CastorMetrics that times the phases of mapping and exporting.
+        Progress is a CastorProgress that reports the progress, nothing by default."""
         self.study_id = study_id
+        if storage not in ("objects", "columnar"):
+            raise CastorException(
+                f"{storage} is not a valid storage. Use objects/columnar."
+            )
+        self.storage = storage
         # Set configuration settings
         self.configuration = {
             "date": "%d-%m-%Y",
@@ -58,9 +149,19 @@ class CastorStudy:
         }
         if format_options:
             self.configuration.update(format_options)
+        # Timings, requests and memory use of mapping and exporting
+        self.metrics = CastorMetrics() if metrics is None else metrics
+        # Reports the progress of downloading, mapping and exporting
+        self.progress = CastorProgress() if progress is None else progress
         # Create the client to interact with the study
         if test is False:
-            self.client = CastorClient(client_id, client_secret, url)
+            self.client = CastorClient(
+                client_id,
+                client_secret,
+                url,
+                metrics=self.metrics,
+                progress=self.progress,
+            )
             self.client.link_study(study_id)
         # Optionally pass missing keys forward as field values
         self.pass_keyerrors = pass_keyerrors
@@ -71,28 +172,90 @@ class CastorStudy:
         self.form_links = {}
         # List of all records in the study - data
         self.records = {}
-        # List of dictionaries of optiongroups
-        self.optiongroups = {}
+        # Column arrays of all data points when using columnar storage
+        self.data_store = None
+        # Optiongroups on id as returned by the API, None until downloaded
+        self._optiongroups = {}
+        # Lookup tables of the optiongroups
+        self.optiongroup_lookups = {}
+        # Formatted user missing dates per (frequency, format)
+        self.missing_dates = {}
         # Container variables to save time querying the database
         self.all_report_instances = {}
-        self.all_survey_packages = {}
+        # Structure components that are downloaded on first access
+        self.pending_components = set()
+        self._all_survey_packages = {}
+        # State of the last data mapping, for incremental mapping
+        self.mapped_on = None
+        self.mapped_archived = None
+        self.mapped_selection = None
+        # Ids of the selected records and forms to map, None maps all
+        self.selected_records = None
+        self.selected_forms = None
 
     # STRUCTURE MAPPING
-    def map_structure(self) -> None:
-        """Maps the structure for the study."""
+    def map_structure(self, components: Optional[List[str]] = None) -> None:
+        """Maps the structure for the study.
+        Components selects the auxiliary structure to download now, from fields,
+        dependencies, optiongroups and survey_packages. Default is all components.
+        The other components are downloaded on first access."""
+        components = STRUCTURE_COMPONENTS if components is None else components
+        for component in components:
+            if component not in STRUCTURE_COMPONENTS:
+                raise CastorException(
+                    f"{component} is not a structure component. "
+                    f"Choose from {', '.join(STRUCTURE_COMPONENTS)}."
+                )
         # Reset structure & data
         self.forms_on_id = {}
         self.forms_on_name = {}
         self.form_links = {}
         self.records = {}
-        self.optiongroups = {}
+        self.data_store = None
+        self.mapped_on = None
+        self.mapped_archived = None
+        self.mapped_selection = None
+        self.selected_records = None
+        self.selected_forms = None
+        self._optiongroups = None
+        self.optiongroup_lookups = {}
         self.all_report_instances = {}
         self.all_survey_packages = {}
+        self.pending_components = set(STRUCTURE_COMPONENTS)
         # Get the structure from the API
-        print("Downloading Study Structure.", flush=True, file=sys.stderr)
-        data = self.client.export_study_structure()
+        with self.metrics.phase("map_structure"):
+            self.progress.message("Downloading Study Structure.")
+            self.__map_forms(self.client.export_study_structure())
+            self.load_components(components)
+
+    def load_components(self, components: List[str]) -> None:
+        """Downloads the auxiliary structure components that are not loaded yet."""
+        for component in STRUCTURE_COMPONENTS:
+            if component not in components or component not in self.pending_components:
+                continue
+            self.pending_components.discard(component)
+            if component == "fields":
+                # Augment field data
+                self.progress.message("Downloading Field Information")
+                all_fields = self.client.all_fields()
+                self.__load_field_information(all_fields)
+                if self._optiongroups is None:
+                    # Fields embed their optiongroups, no need to download them again
+                    self.__load_optiongroups(self.__embedded_optiongroups(all_fields))
+            elif component == "dependencies":
+                self.progress.message("Downloading Field Dependencies")
+                self.__map_field_dependencies(self.client.all_field_dependencies())
+            elif component == "optiongroups":
+                self.progress.message("Downloading Optiongroups")
+                self.__load_optiongroup_lookups(self.__download_optiongroups())
+            else:
+                self.progress.message("Downloading Survey Packages")
+                self.__map_survey_packages(self.client.all_survey_packages())
+
+    def __map_forms(self, data: List[dict]) -> None:
+        """Creates the forms, steps and fields from the study structure."""
         # Loop over all fields
-        for field in tqdm(data, desc="Mapping Study Structure"):
+        for field in self.progress.track(data, "Mapping Study Structure"):
             # Check if the form for the field exists, if not, create it
             form = self.get_single_form(field["Form Collection ID"])
             if form is None:
@@ -123,36 +286,71 @@ class CastorStudy:
                 field_order=field["Field Order"],
             )
             step.add_field(new_field)
-        # Augment field data
-        self.__load_field_information()
-
-        # Map the field dependencies and optiongroups
-        self.__map_field_dependencies()
-        self.__load_optiongroups()
-
-        # Map the survey packages
-        self.__map_survey_packages()
 
     # DATA MAPPING
-    def map_data(self, archived: bool = False) -> None:
-        """Maps the data for the study. Archived controls whether archived data is extracted"""
-        self.map_structure()
-        self.update_links(archived)
-        self.__link_data(archived)
-        self.__load_record_information(archived)
-        self.__load_survey_information(archived)
-        self.__load_report_information()
+    def map_data(
+        self,
+        archived: bool = False,
+        *,
+        incremental: bool = False,
+        records: Optional[List[str]] = None,
+        institutes: Optional[List[str]] = None,
+        forms: Optional[List[str]] = None,
+    ) -> None:
+        """Maps the data for the study. Archived controls whether archived data is extracted.
+        Incremental only maps the records that changed since the last mapping,
+        based on the audit trail. Falls back to mapping all data when the audit trail
+        holds changes that are not linked to a record, such as changes in the structure.
+        Records (ids), institutes (names or ids) and forms (names or ids) limit the mapping
+        to a selection of the study. Small selections are downloaded per record.
+        """
+        # pylint: disable=too-many-arguments
+        # Necessary number of arguments to select data
+        # Changes during the mapping show up in the next audit trail
+        mapped_on = self.__server_time()
+        selection = {
+            "records": None if records is None else list(records),
+            "institutes": None if institutes is None else list(institutes),
+            "forms": None if forms is None else list(forms),
+        }
+        if (
+            incremental
+            and self.mapped_on is not None
+            and self.mapped_archived == archived
+            and self.mapped_selection == selection
+            and self.__map_changed_data(archived)
+        ):
+            self.mapped_on = mapped_on
+            return
+        # Only optiongroups are needed to interpret the data
+        self.map_structure(components=["optiongroups"])
+        if self.storage == "columnar":
+            self.data_store = CastorDataStore(self)
+        with self.metrics.phase("download_links"):
+            self.update_links(archived)
+        with self.metrics.phase("download_records") as phase:
+            record_data = self.__download_record_information(archived)
+            phase["rows"] = len(record_data)
+        self.__select(record_data, selection)
+        self.__link_data(archived, record_data)
+        with self.metrics.phase("load_information"):
+            self.__load_record_information(record_data)
+            self.__load_survey_information(archived)
+            self.__load_report_information()
+        self.mapped_on = mapped_on
+        self.mapped_archived = archived
+        self.mapped_selection = selection
 
     def update_links(self, archived: bool) -> None:
         """Creates the links between form and form instances."""
         # Reset form links
         self.form_links = {}
         # Get the name of the survey forms, as the export data can only be linked on name, not on id
-        print("Downloading Surveys.", flush=True, file=sys.stderr)
+        self.progress.message("Downloading Surveys.")
         surveys = self.client.all_surveys()
         self.form_links["Survey"] = {survey["name"]: survey["id"] for survey in surveys}
         # Get all report instances that need to be linked
-        print("Downloading Report Instances.", flush=True, file=sys.stderr)
+        self.progress.message("Downloading Report Instances.")
         # Save this data from the database to save time later
         report_instances = self.client.all_report_instances(archived=0)
         if archived:
@@ -171,27 +369,313 @@ class CastorStudy:
             for instance_id in self.all_report_instances
         }
 
+    # DATA SELECTION
+    def __select(self, record_data: List[dict], selection: dict) -> None:
+        """Resolves the selected records, institutes and forms to the ids to map."""
+        self.selected_records = None
+        if selection["records"] is not None or selection["institutes"] is not None:
+            record_ids = {record["id"] for record in record_data}
+            for record_id in selection["records"] or []:
+                if record_id not in record_ids:
+                    raise CastorException(f"Record {record_id} does not exist.")
+            self.selected_records = {
+                record["id"]
+                for record in record_data
+                if (
+                    selection["records"] is None or record["id"] in selection["records"]
+                )
+                and (
+                    selection["institutes"] is None
+                    or record["_embedded"]["institute"]["name"]
+                    in selection["institutes"]
+                    or record["_embedded"]["institute"]["id"] in selection["institutes"]
+                )
+            }
+        self.selected_forms = None
+        if selection["forms"] is not None:
+            self.selected_forms = set()
+            for form_id_or_name in selection["forms"]:
+                form = self.get_single_form(
+                    form_id_or_name
+                ) or self.get_single_form_name(form_id_or_name)
+                if form is None:
+                    raise CastorException(f"Form {form_id_or_name} does not exist.")
+                self.selected_forms.add(form.form_id)
+
+    def __selected(self, record_id: str, form_id: Optional[str] = None) -> bool:
+        """Returns whether the record and form are part of the selection to map."""
+        return (
+            self.selected_records is None or record_id in self.selected_records
+        ) and (
+            form_id is None
+            or self.selected_forms is None
+            or form_id in self.selected_forms
+        )
+
+    def __row_form_id(self, row: dict) -> Optional[str]:
+        """Returns the id of the form of a row of the export data."""
+        if row["Field ID"] != "":
+            field = self.get_single_field(row["Field ID"])
+            return None if field is None else field.step.form.form_id
+        if row["Form Type"] == "Survey":
+            return self.form_links["Survey"].get(row["Form Instance Name"])
+        if row["Form Type"] == "Report":
+            return self.form_links["Report"].get(row["Form Instance ID"])
+        return None
+
+    def __selected_collections(self) -> List[str]:
+        """Returns the data point collections that hold data of the selected forms."""
+        form_types = {
+            form.form_type
+            for form in self.get_all_forms()
+            if self.selected_forms is None or form.form_id in self.selected_forms
+        }
+        return [
+            collection
+            for form_type, collection in DATA_POINT_COLLECTIONS.items()
+            if form_type in form_types
+        ]
+
+    # INCREMENTAL DATA MAPPING
+    def __map_changed_data(self, archived: bool) -> bool:
+        """Maps the data of records that changed since the last mapping.
+        Returns False if the changes can't be mapped incrementally."""
+        self.progress.message("Downloading Audit Trail.")
+        # The audit trail works per day in the timezone of the server, so changes
+        # on the day of the last mapping are mapped again, with a day of margin
+        # on both ends for the difference between the server timezone and UTC
+        events = self.client.audit_trail(
+            date_from=self.mapped_on - timedelta(days=1),
+            date_to=max(self.__server_time(), datetime.now(timezone.utc))
+            + timedelta(days=1),
+        )
+        changed_ids = set()
+        for event in events:
+            event_record_ids = self.__event_record_ids(event["event_details"])
+            if event_record_ids:
+                changed_ids.update(event_record_ids)
+            elif not any(
+                harmless in event["event_type"].lower()
+                for harmless in HARMLESS_EVENT_TYPES
+            ):
+                # Changes without a record, e.g. in the structure, can change any record
+                return False
+        self.update_links(archived)
+        record_data = self.__download_record_information(archived)
+        self.__select(record_data, self.mapped_selection)
+        record_ids = [
+            record["id"]
+            for record in record_data
+            if record["id"] in changed_ids and self.__selected(record["id"])
+        ]
+        if self.data_store is not None:
+            # Removing the changed records at once only rebuilds the columns once
+            self.data_store.remove_records(changed_ids)
+        # Records that were archived, deleted or left the selection
+        for record_id in changed_ids.difference(record_ids):
+            self.records.pop(record_id, None)
+        self.progress.message("Downloading Changed Record Data.")
+        rows = self.__download_records_data(record_ids)
+        for record_id in self.progress.track(record_ids, "Mapping Changed Records"):
+            self.__remap_record(record_id, rows[record_id])
+        self.__load_record_information(record_data)
+        self.__load_survey_information(archived)
+        self.__load_report_information()
+        return True
+
+    def __server_time(self) -> datetime:
+        """Returns the time of the server at the last response of the client.
+        Falls back to the current time in UTC before the first response."""
+        if self.client.server_time is None:
+            return datetime.now(timezone.utc)
+        return self.client.server_time
+
+    @staticmethod
+    def __event_record_ids(event_details: Union[dict, list]) -> List[str]:
+        """Returns the ids of the records that an audit trail event changed.
+        Searches nested dicts and lists of the event details."""
+        record_ids = []
+        details = [event_details]
+        while details:
+            detail = details.pop()
+            if isinstance(detail, list):
+                details.extend(detail)
+            elif isinstance(detail, dict):
+                for key, value in detail.items():
+                    if isinstance(value, (dict, list)):
+                        details.append(value)
+                    elif value and re.sub(r"[\s_]", "", key.lower()) in (
+                        "recordid",
+                        "participantid",
+                    ):
+                        record_ids.append(value)
+        return record_ids
+
+    def __remap_record(self, record_id: str, rows: List[dict]) -> None:
+        """Replaces all data of a record with the rows of its current data.
+        Data points in the data store are removed beforehand, see remove_records."""
+        # Replacing the record keeps its position in the study
+        self.add_record(CastorRecord(record_id=record_id))
+        for row in rows:
+            self.__handle_row(row)
+
+    # PER RECORD DATA
+    def __download_records_data(self, record_ids: List[str]) -> Dict[str, List[dict]]:
+        """Downloads the data of the selected forms of records, per record.
+        Returns a dict of {record_id: rows of the export data}."""
+        collections = self.__selected_collections()
+        rows = {record_id: [] for record_id in record_ids}
+        for collection in collections:
+            data_points = self.client.all_data_points_records(record_ids, collection)
+            for record_id, record_data_points in data_points.items():
+                rows[record_id].extend(
+                    self.__export_rows(record_id, collection, record_data_points)
+                )
+        # Only keep the data of the selected forms
+        return {
+            record_id: [
+                row
+                for row in record_rows
+                if self.__selected(record_id, self.__row_form_id(row))
+            ]
+            for record_id, record_rows in rows.items()
+        }
+
+    def __export_rows(
+        self, record_id: str, collection: str, data_points: List[dict]
+    ) -> List[dict]:
+        """Formats the data points of a data point collection as rows of the export data."""
+        if collection == "study":
+            return [
+                self.__export_row(
+                    record_id,
+                    "Study",
+                    "",
+                    self.get_single_field(data_point["field_id"]).step.form.form_name,
+                    data_point,
+                )
+                for data_point in data_points
+            ]
+        if collection == "survey-instance":
+            return [
+                self.__export_row(
+                    record_id,
+                    "Survey",
+                    data_point["survey_instance_id"],
+                    data_point["survey_name"],
+                    data_point,
+                )
+                for data_point in data_points
+            ]
+        return [
+            self.__export_row(
+                record_id,
+                "Report",
+                data_point["report_instance_id"],
+                data_point["report_instance_name"],
+                data_point,
+            )
+            for data_point in data_points
+            # Archived report instances are only mapped when requested
+            if data_point["report_instance_id"] in self.all_report_instances
+        ]
+
+    @staticmethod
+    def __export_row(
+        record_id: str,
+        form_type: str,
+        instance_id: str,
+        instance_name: str,
+        data_point: dict,
+    ) -> dict:
+        """Formats a data point from the API as a row of the export data."""
+        value = data_point["field_value"]
+        user_missing = re.fullmatch(r"##USER_MISSING_(\d+)##", value)
+        if user_missing:
+            # The export shows user missings as "Missing (<missing type>)"
+            missing_type = USER_MISSING_CODES.get(-int(user_missing.group(1)), "")
+            value = f"Missing ({missing_type})"
+        return {
+            "Record ID": record_id,
+            "Form Type": form_type,
+            "Form Instance ID": instance_id,
+            "Form Instance Name": instance_name,
+            "Field ID": data_point["field_id"],
+            "Value": value,
+            "Date": (data_point["updated_on"] or "")[:19],
+        }
+
     # OPTIONGROUPS
-    def __load_optiongroups(self) -> None:
-        """Loads all optiongroups through the client"""
-        # Get the optiongroups
-        print("Downloading Optiongroups", flush=True, file=sys.stderr)
-        optiongroups = self.client.all_field_optiongroups()
-        self.optiongroups = {
+    def __download_optiongroups(self) -> List[dict]:
+        """Downloads all optiongroups from the optiongroup export.
+        This is a single request, where the optiongroup endpoint is paginated.
+        The export lacks the description, layout and order of the options,
+        so these optiongroups are only used for the lookup tables."""
+        optiongroups = {}
+        for row in self.client.export_option_groups():
+            optiongroup = optiongroups.setdefault(
+                row["Option Group Id"],
+                {
+                    "id": row["Option Group Id"],
+                    "name": row["Option Group Name"],
+                    "options": [],
+                },
+            )
+            optiongroup["options"].append(
+                {
+                    "id": row["Option Id"],
+                    "name": row["Option Name"],
+                    "value": row["Option Value"],
+                }
+            )
+        return list(optiongroups.values())
+
+    @staticmethod
+    def __embedded_optiongroups(all_fields: List[dict]) -> List[dict]:
+        """Returns the optiongroups embedded in the field data, once per optiongroup."""
+        optiongroups = {}
+        for api_field in all_fields:
+            optiongroup = api_field.get("option_group")
+            if optiongroup is not None:
+                optiongroups.setdefault(optiongroup["id"], optiongroup)
+        return list(optiongroups.values())
+
+    def __load_optiongroups(self, optiongroups: List[dict]) -> None:
+        """Loads all optiongroups as returned by the API and their lookup tables."""
+        self._optiongroups = {
             optiongroup["id"]: optiongroup for optiongroup in optiongroups
         }
+        self.__load_optiongroup_lookups(optiongroups)
+
+    def __load_optiongroup_lookups(self, optiongroups: List[dict]) -> None:
+        """Loads the lookup tables of all optiongroups."""
+        self.pending_components.discard("optiongroups")
+        # Build the lookup tables once for interpretation, formatting and import
+        self.optiongroup_lookups = {
+            optiongroup["id"]: CastorOptionGroup(optiongroup)
+            for optiongroup in optiongroups
+        }
 
     # AUXILIARY DATA
-    def __load_record_information(self, archived: bool) -> None:
-        """Adds auxiliary data to records."""
-        print("Downloading Record Information.", flush=True, file=sys.stderr)
-        record_data = (
+    def __download_record_information(self, archived: bool) -> List[dict]:
+        """Downloads the auxiliary data of all records."""
+        self.progress.message("Downloading Record Information.")
+        return (
             self.client.all_records()
             if archived
             else self.client.all_records(archived=0)
         )
-        for record_api in tqdm(record_data, desc="Augmenting Record Data"):
+
+    def __load_record_information(self, record_data: List[dict]) -> None:
+        """Adds auxiliary data to the selected records."""
+        for record_api in self.progress.track(record_data, "Augmenting Record Data"):
+            if not self.__selected(record_api["id"]):
+                continue
             record = self.get_single_record(record_api["id"])
+            if record is None:
+                # Records without data, e.g. created since an incremental mapping
+                record = CastorRecord(record_id=record_api["id"])
+                self.add_record(record)
             record.institute = record_api["_embedded"]["institute"]["name"]
             record.randomisation_group = record_api["randomization_group_name"]
             record.randomisation_datetime = self.__get_date_or_none(
@@ -200,8 +684,10 @@ class CastorStudy:
             record.archived = record_api["archived"]
 
     def __load_survey_information(self, archived: bool) -> None:
-        """Adds auxiliary data to survey forms."""
-        print("Downloading Survey Information.", flush=True, file=sys.stderr)
+        """Adds auxiliary data to the selected survey forms."""
+        if "survey-instance" not in self.__selected_collections():
+            return
+        self.progress.message("Downloading Survey Information.")
         survey_package_data = self.client.all_survey_package_instances()
         # Create mapping {survey_instance_id: survey_package}
         survey_data = {
@@ -212,15 +698,29 @@ class CastorStudy:
             }
             for package in survey_package_data
             for survey in package["_embedded"]["survey_instances"]
-            if not package["archived"] or archived
+            if (not package["archived"] or archived)
+            and self.__selected(
+                package["record_id"],
+                self.form_links["Survey"].get(survey["_embedded"]["survey"]["name"]),
+            )
         }
-        for survey_instance, values in tqdm(
-            survey_data.items(), desc="Augmenting Survey Data"
+        for survey_instance, values in self.progress.track(
+            survey_data.items(), "Augmenting Survey Data"
         ):
             # Test if instance in study
             local_instance = self.get_single_form_instance_on_id(
                 instance_id=survey_instance, record_id=values["record"]
             )
+            if local_instance is None:
+                # Empty surveys, which have no data points to map incrementally
+                local_instance = CastorSurveyFormInstance(
+                    instance_id=survey_instance,
+                    name_of_form=values["survey"]["_embedded"]["survey"]["name"],
+                    study=self,
+                )
+                self.get_single_record(values["record"]).add_form_instance(
+                    local_instance
+                )
             local_instance.created_on = self.__get_date_or_none(
                 values["package"]["created_on"]
             )
@@ -238,15 +738,29 @@ class CastorStudy:
             ]
 
     def __load_report_information(self) -> None:
-        """Adds auxiliary data to report forms."""
-        for instance_id, report_instance in tqdm(
+        """Adds auxiliary data to the selected report forms."""
+        for instance_id, report_instance in self.progress.track(
             self.all_report_instances.items(),
             "Augmenting Report Data",
         ):
+            if not self.__selected(
+                report_instance["record_id"], self.form_links["Report"][instance_id]
+            ):
+                continue
             # Test if instance in study
             local_instance = self.get_single_form_instance_on_id(
                 instance_id=instance_id, record_id=report_instance["record_id"]
             )
+            if local_instance is None:
+                # Empty reports, which have no data points to map incrementally
+                local_instance = CastorReportFormInstance(
+                    instance_id=instance_id,
+                    name_of_form=report_instance["name"],
+                    study=self,
+                )
+                self.get_single_record(report_instance["record_id"]).add_form_instance(
+                    local_instance
+                )
             local_instance.created_on = datetime.strptime(
                 report_instance["created_on"], "%Y-%m-%d %H:%M:%S"
             ).strftime(self.configuration["datetime_seconds"])
@@ -262,9 +776,8 @@ class CastorStudy:
                 local_instance.parent = "No parent"
             local_instance.archived = report_instance["archived"]
 
-    def __load_field_information(self):
+    def __load_field_information(self, all_fields: List[dict]) -> None:
         """Adds auxillary information to fields."""
-        all_fields = self.client.all_fields()
         for api_field in all_fields:
             field = self.get_single_field(api_field["id"])
             # Use -inf and inf for easy numeric comparison
@@ -287,17 +800,13 @@ class CastorStudy:
         return date
 
     # SURVEY PACKAGES
-    def __map_survey_packages(self) -> None:
+    def __map_survey_packages(self, all_survey_packages: List[dict]) -> None:
         """Maps all survey packages for easier finding."""
-        print("Downloading Survey Packages", flush=True, file=sys.stderr)
-        all_survey_packages = self.client.all_survey_packages()
         self.all_survey_packages = {item["name"]: item for item in all_survey_packages}
 
     # FIELD DEPENDENCIES
-    def __map_field_dependencies(self) -> None:
-        """Retrieves all field_dependencies and links them to the right field."""
-        print("Downloading Field Dependencies", flush=True, file=sys.stderr)
-        dependencies = self.client.all_field_dependencies()
+    def __map_field_dependencies(self, dependencies: List[dict]) -> None:
+        """Links all field_dependencies to the right field."""
         # Format to dict of {child_id: {"parent_field": parent_field, "parent_value": value}
         dependencies = {
             dep["child_id"]: {
@@ -309,58 +818,951 @@ class CastorStudy:
         for child_id in dependencies:
             self.get_single_field(child_id).field_dependency = dependencies[child_id]
 
+    # SNAPSHOTS
+    def save_snapshot(self, path: str) -> str:
+        """Saves the mapped study to the folder path, to be loaded with load_snapshot.
+        Structure and auxiliary data are saved as json, the data as parquet.
+        The state of the last mapping is saved too, so incremental mapping continues
+        from the snapshot in another process. Returns the folder location."""
+        if self.mapped_on is None:
+            raise CastorException("Map the study data before saving a snapshot.")
+        self.load_components(STRUCTURE_COMPONENTS)
+        path = pathlib.Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        # Data is saved as the export data it was mapped from
+        pd.DataFrame(self.__snapshot_rows(), columns=EXPORT_COLUMNS).to_parquet(
+            path / "data.parquet", index=False
+        )
+        metadata = {
+            "snapshot_version": SNAPSHOT_VERSION,
+            "study_id": self.study_id,
+            "storage": self.storage,
+            "configuration": self.configuration,
+            "pass_keyerrors": self.pass_keyerrors,
+            "mapped_on": self.mapped_on.isoformat(),
+            "mapped_archived": self.mapped_archived,
+            "mapped_selection": self.mapped_selection,
+            "selected_records": None
+            if self.selected_records is None
+            else sorted(self.selected_records),
+            "selected_forms": None
+            if self.selected_forms is None
+            else sorted(self.selected_forms),
+            "structure": self.__snapshot_structure(),
+            "fields": [
+                {
+                    "id": field.field_id,
+                    "field_min": None
+                    if field.field_min == -math.inf
+                    else field.field_min,
+                    "field_max": None
+                    if field.field_max == math.inf
+                    else field.field_max,
+                }
+                for field in self.get_all_fields()
+            ],
+            "dependencies": [
+                {
+                    "child_id": field.field_id,
+                    "parent_id": field.field_dependency["parent_field"].field_id,
+                    "value": field.field_dependency["parent_value"],
+                }
+                for field in self.get_all_fields()
+                if field.field_dependency is not None
+            ],
+            "optiongroups": list(self.optiongroups.values()),
+            "survey_packages": list(self.all_survey_packages.values()),
+            "form_links": self.form_links,
+            "report_instances": list(self.all_report_instances.values()),
+            "records": [
+                {
+                    "id": record.record_id,
+                    "institute": record.institute,
+                    "randomisation_group": record.randomisation_group,
+                    "randomisation_datetime": record.randomisation_datetime,
+                    "archived": record.archived,
+                }
+                for record in self.get_all_records()
+            ],
+            # Auxiliary data of survey and report instances
+            "form_instances": [
+                {
+                    "record_id": instance.record.record_id,
+                    "instance_id": instance.instance_id,
+                    "attributes": {
+                        attribute: getattr(instance, attribute)
+                        for attribute in type(instance).__slots__
+                    },
+                }
+                for instance in self.get_all_form_instances()
+                if instance.instance_type != "Study"
+            ],
+        }
+        with open(path / "metadata.json", "w", encoding="utf-8") as file:
+            json.dump(metadata, file)
+        return str(path)
+
+    @classmethod
+    def load_snapshot(
+        cls,
+        path: str,
+        *,
+        client_id: Optional[str] = None,
+        client_secret: Optional[str] = None,
+        url: Optional[str] = None,
+        progress: Optional[CastorProgress] = None,
+    ) -> "CastorStudy":
+        """Loads a study saved with save_snapshot, without downloading from Castor.
+        Supply credentials to connect the study to Castor, e.g. for incremental mapping.
+        Progress is a CastorProgress that reports the loading, nothing by default.
+        """
+        # pylint: disable=too-many-locals
+        # Necessary number of variables to restore the study
+        path = pathlib.Path(path)
+        metadata = json.loads((path / "metadata.json").read_text(encoding="utf-8"))
+        if metadata.get("snapshot_version") != SNAPSHOT_VERSION:
+            raise CastorException(
+                f"{path} is not a snapshot of version {SNAPSHOT_VERSION}."
+            )
+        study = cls(
+            client_id,
+            client_secret,
+            metadata["study_id"],
+            url,
+            test=client_id is None,
+            format_options=metadata["configuration"],
+            pass_keyerrors=metadata["pass_keyerrors"],
+            storage=metadata["storage"],
+            progress=progress,
+        )
+        # Structure
+        study.__map_forms(metadata["structure"])
+        study.__load_field_information(metadata["fields"])
+        study.__map_field_dependencies(metadata["dependencies"])
+        study.__load_optiongroups(metadata["optiongroups"])
+        study.__map_survey_packages(metadata["survey_packages"])
+        # Data
+        if study.storage == "columnar":
+            study.data_store = CastorDataStore(study)
+        study.form_links = metadata["form_links"]
+        study.all_report_instances = {
+            report_instance["id"]: report_instance
+            for report_instance in metadata["report_instances"]
+        }
+        data = pd.read_parquet(path / "data.parquet").to_dict("records")
+        for row in study.progress.track(data, "Mapping Data"):
+            study.__handle_row(row)
+        for record_info in metadata["records"]:
+            record = study.get_single_record(record_info["id"])
+            record.institute = record_info["institute"]
+            record.randomisation_group = record_info["randomisation_group"]
+            record.randomisation_datetime = record_info["randomisation_datetime"]
+            record.archived = record_info["archived"]
+        for instance_info in metadata["form_instances"]:
+            instance = study.get_single_form_instance_on_id(
+                instance_info["record_id"], instance_info["instance_id"]
+            )
+            for attribute, value in instance_info["attributes"].items():
+                setattr(instance, attribute, value)
+        study.mapped_on = datetime.fromisoformat(metadata["mapped_on"])
+        study.mapped_archived = metadata["mapped_archived"]
+        study.mapped_selection = metadata["mapped_selection"]
+        if metadata["selected_records"] is not None:
+            study.selected_records = set(metadata["selected_records"])
+        if metadata["selected_forms"] is not None:
+            study.selected_forms = set(metadata["selected_forms"])
+        return study
+
+    def __snapshot_structure(self) -> List[dict]:
+        """Returns the mapped structure as rows of the structure export."""
+        return [
+            {
+                "Form Type": form.form_type,
+                "Form Collection ID": form.form_id,
+                "Form Collection Name": form.form_name,
+                "Form Collection Order": str(form.form_order),
+                "Form ID": step.step_id,
+                "Form Name": step.step_name,
+                "Form Order": str(step.step_order),
+                "Field ID": field.field_id,
+                "Field Variable Name": field.field_name,
+                "Field Label": field.field_label,
+                "Field Type": field.field_type,
+                "Field Required": "1" if field.field_required else "0",
+                "Field Option Group": field.field_option_group,
+                "Field Order": field.field_order,
+            }
+            for form in self.get_all_forms()
+            for step in form.get_all_steps()
+            for field in step.get_all_fields()
+        ]
+
+    def __snapshot_rows(self) -> List[tuple]:
+        """Returns the mapped data as rows of the export data."""
+        data_points = {}
+        for data_point in self.get_all_data_points():
+            form_instance = data_point.form_instance
+            key = (form_instance.record.record_id, form_instance.instance_id)
+            data_points.setdefault(key, []).append(data_point)
+        rows = []
+        for record in self.get_all_records():
+            # Records without data are a row without form type
+            rows.append((record.record_id, "", "", "", "", "", ""))
+            for instance in record.get_all_form_instances():
+                # Study form instances are found through their fields
+                instance_id = (
+                    "" if instance.instance_type == "Study" else instance.instance_id
+                )
+                instance_data_points = data_points.get(
+                    (record.record_id, instance.instance_id), []
+                )
+                if not instance_data_points:
+                    # Empty surveys and reports are a row without field
+                    rows.append(
+                        (
+                            record.record_id,
+                            instance.instance_type,
+                            instance_id,
+                            instance.name_of_form,
+                            "",
+                            "",
+                            "",
+                        )
+                    )
+                for data_point in instance_data_points:
+                    filled_in = data_point.filled_in
+                    rows.append(
+                        (
+                            record.record_id,
+                            instance.instance_type,
+                            instance_id,
+                            instance.name_of_form,
+                            data_point.field_id,
+                            data_point.raw_value,
+                            ""
+                            if filled_in is None
+                            else filled_in.strftime("%Y-%m-%d %H:%M:%S"),
+                        )
+                    )
+        return rows
+
     # DATA ANALYSIS
-    def export_to_dataframe(self, archived=False) -> dict:
-        """Exports all data from a study into a dict of dataframes for statistical analysis."""
-        self.map_data(archived=archived)
+    def export_to_dataframe(
+        self, archived=False, *, incremental=False, remap=True, processes=None
+    ) -> dict:
+        """Exports all data from a study into a dict of dataframes for statistical analysis.
+        Incremental only maps the data that changed since the last mapping.
+        Remap=False exports the data as mapped before, e.g. loaded from a snapshot.
+        Processes creates the dataframes of the forms in that many worker processes."""
+        self.__map_for_export(archived, incremental, remap)
+        survey_views = self.__export_survey_views(archived)
+        report_views = self.__export_report_views(archived)
+        with self.metrics.phase("export_dataframes") as phase:
+            exported = self.__export_dataframes(
+                [self.__export_study_view(archived)]
+                + list(survey_views.values())
+                + list(report_views.values()),
+                processes,
+            )
+            phase["rows"] = sum(len(dataframe) for dataframe in exported)
         dataframes = {
-            "Study": self.__export_study_data(archived),
-            "Surveys": self.__export_survey_data(archived),
-            "Reports": self.__export_report_data(archived),
+            "Study": exported[0],
+            "Surveys": dict(zip(survey_views, exported[1 : len(survey_views) + 1])),
+            "Reports": dict(zip(report_views, exported[len(survey_views) + 1 :])),
         }
         return dataframes
 
-    def export_to_csv(self, archived=False) -> dict:
-        """Exports all data to csv files.
+    def export_long(
+        self, archived=False, *, incremental=False, remap=True
+    ) -> pd.DataFrame:
+        """Exports all data points into a single dataframe in long format,
+        with a row per data point instead of a column per field.
+        Values are interpreted as in export_to_dataframe, but not split up."""
+        self.__map_for_export(archived, incremental, remap)
+        rows = []
+        # Rows to interpret at once, on field type or on field for optiongroups
+        interpret_rows = {}
+        for data_point in self.get_all_data_points():
+            field = data_point.instance_of
+            instance = data_point.form_instance
+            if field.field_type in NON_DATA_FIELD_TYPES:
+                continue
+            # Study form instances can't be archived themselves
+            if not archived and (
+                instance.record.archived or getattr(instance, "archived", False)
+            ):
+                continue
+            interpret_rows.setdefault(
+                field.field_id
+                if field.field_type in OPTIONGROUP_TYPES
+                else field.field_type,
+                (field, []),
+            )[1].append(len(rows))
+            rows.append(
+                [
+                    instance.record.record_id,
+                    instance.instance_type,
+                    instance.instance_of.form_name,
+                    instance.instance_id,
+                    field.step.step_name,
+                    field.field_name,
+                    data_point.raw_value,
+                    None,
+                    data_point.filled_in,
+                ]
+            )
+        raw_value, value = LONG_COLUMNS.index("raw_value"), LONG_COLUMNS.index("value")
+        for field, numbers in interpret_rows.values():
+            interpreted = interpret_column(
+                pd.Series(
+                    [rows[number][raw_value] for number in numbers], dtype=object
+                ),
+                field,
+                self,
+            )
+            for number, interpreted_value in zip(numbers, interpreted.tolist()):
+                rows[number][value] = interpreted_value
+        return pd.DataFrame.from_records(rows, columns=LONG_COLUMNS)
+
+    def __map_for_export(self, archived: bool, incremental: bool, remap: bool) -> None:
+        """Maps the data to export, or checks that data was mapped before."""
+        if remap:
+            self.map_data(archived=archived, incremental=incremental)
+        elif self.mapped_on is None:
+            raise CastorException("No data mapped, export with remap=True.")
+
+    def export_to_csv(
+        self,
+        archived=False,
+        *,
+        incremental=False,
+        remap=True,
+        processes=None,
+        threads=None,
+        chunk_size=None,
+        delta=False,
+        manifest=False,
+    ) -> dict:
+        """Exports all data to csv files, written in a pool of threads.
+        With chunk_size, each file is streamed in chunks of that many rows,
+        without creating the dataframes of the whole study in memory.
+        With delta, only files that changed since the previous export are written.
+        Manifest writes a manifest of the files, which delta exports always write.
         Returns dict with file locations."""
+        if delta and chunk_size is not None:
+            raise CastorException("Delta exports can't be streamed, remove chunk_size.")
         now = f"{datetime.now().strftime('%Y%m%d %H%M%S.%f')[:-3]}"
-        dataframes = self.export_to_dataframe(archived=archived)
+        if chunk_size is None:
+            tables = self.export_to_dataframe(
+                archived=archived,
+                incremental=incremental,
+                remap=remap,
+                processes=processes,
+            )
+        else:
+            self.__map_for_export(archived, incremental, remap)
+            tables = {
+                "Study": self.__export_study_view(archived),
+                "Surveys": self.__export_survey_views(archived),
+                "Reports": self.__export_report_views(archived),
+            }
         # Instantiate output folder
         pathlib.Path(pathlib.Path.cwd(), "output").mkdir(parents=True, exist_ok=True)
         # Export dataframes
-        dataframes["Study"] = self.export_dataframe_to_csv(
-            dataframes["Study"], "Study", now
-        )
-        for survey in dataframes["Surveys"]:
-            dataframes["Surveys"][survey] = self.export_dataframe_to_csv(
-                dataframes["Surveys"][survey], survey, now
-            )
-        for report in dataframes["Reports"]:
-            dataframes["Reports"][report] = self.export_dataframe_to_csv(
-                dataframes["Reports"][report], report, now
+        if chunk_size is None:
+            return self.__export_files(
+                tables,
+                now,
+                lambda dataframe, name: (
+                    self.export_dataframe_to_csv(dataframe, name, now),
+                    dataframe.shape,
+                ),
+                threads=threads,
+                extension=".csv",
+                delta=delta,
+                manifest=manifest,
             )
-        return dataframes
+        return self.__export_files(
+            tables,
+            now,
+            lambda view, name: self.__stream_view_to_csv(view, name, now, chunk_size),
+            threads=threads,
+            extension=".csv",
+            manifest=manifest,
+        )
 
-    def export_to_feather(self, archived=False) -> dict:
-        """Exports all data to feather files.
+    def export_to_feather(
+        self,
+        archived=False,
+        *,
+        incremental=False,
+        remap=True,
+        processes=None,
+        compression="uncompressed",
+        batch_size=None,
+        threads=None,
+        delta=False,
+        manifest=False,
+    ) -> dict:
+        """Exports all data to feather files, compressed with compression (lz4/zstd).
+        Batch_size writes the files in record batches of that many rows.
+        With delta, only files that changed since the previous export are written.
+        Manifest writes a manifest of the files, which delta exports always write.
         Returns dict of file locations for export into R."""
         now = f"{datetime.now().strftime('%Y%m%d %H%M%S.%f')[:-3]}"
-        dataframes = self.export_to_dataframe(archived)
+        dataframes = self.export_to_dataframe(
+            archived, incremental=incremental, remap=remap, processes=processes
+        )
+        # Instantiate output folder
+        pathlib.Path(pathlib.Path.cwd(), "output").mkdir(parents=True, exist_ok=True)
+        self.progress.message("Writing data to feather files...")
+        return self.__export_files(
+            dataframes,
+            now,
+            lambda dataframe, name: (
+                self.export_dataframe_to_feather(
+                    dataframe,
+                    name,
+                    now,
+                    compression=compression,
+                    batch_size=batch_size,
+                ),
+                dataframe.shape,
+            ),
+            threads=threads,
+            extension=".feather",
+            delta=delta,
+            manifest=manifest,
+        )
+
+    def export_to_parquet(
+        self,
+        archived=False,
+        *,
+        incremental=False,
+        remap=True,
+        processes=None,
+        compression="snappy",
+        partition_cols=None,
+        threads=None,
+        delta=False,
+        manifest=False,
+    ) -> dict:
+        """Exports all data to parquet files, compressed with compression (e.g. snappy/zstd).
+        Partition_cols splits each file into folders per value of these columns,
+        e.g. ["institute"].
+        With delta, only files that changed since the previous export are written.
+        Manifest writes a manifest of the files, which delta exports always write.
+        Returns dict of file locations."""
+        now = f"{datetime.now().strftime('%Y%m%d %H%M%S.%f')[:-3]}"
+        dataframes = self.export_to_dataframe(
+            archived, incremental=incremental, remap=remap, processes=processes
+        )
         # Instantiate output folder
         pathlib.Path(pathlib.Path.cwd(), "output").mkdir(parents=True, exist_ok=True)
-        print("Writing data to feather files...", flush=True, file=sys.stderr)
-        dataframes["Study"] = self.export_dataframe_to_feather(
-            dataframes["Study"], "Study", now
+        self.progress.message("Writing data to parquet files...")
+        return self.__export_files(
+            dataframes,
+            now,
+            lambda dataframe, name: (
+                self.export_dataframe_to_parquet(
+                    dataframe,
+                    name,
+                    now,
+                    compression=compression,
+                    partition_cols=partition_cols,
+                ),
+                dataframe.shape,
+            ),
+            threads=threads,
+            extension=".parquet",
+            delta=delta,
+            manifest=manifest,
         )
-        for report in dataframes["Reports"]:
-            dataframes["Reports"][report] = self.export_dataframe_to_feather(
-                dataframes["Reports"][report], report, now
+
+    def export_to_database(
+        self,
+        path: str,
+        archived=False,
+        *,
+        incremental=False,
+        remap=True,
+        processes=None,
+        backend="sqlite",
+        batch_size=10000,
+    ) -> str:
+        """Exports all data into tables of an SQLite or DuckDB database file.
+        Next to the Study, survey and report tables (indexed on record_id),
+        the Fields and Optiongroups tables hold the structure of the study.
+        Tables that already exist are replaced. Returns the path of the database."""
+        if backend not in DATABASE_BACKENDS:
+            raise CastorException(
+                f"{backend} is not a valid backend. Use sqlite/duckdb."
             )
-        for survey in dataframes["Surveys"]:
-            dataframes["Surveys"][survey] = self.export_dataframe_to_feather(
-                dataframes["Surveys"][survey], survey, now
+        dataframes = self.export_to_dataframe(
+            archived, incremental=incremental, remap=remap, processes=processes
+        )
+        tables = {"Study": dataframes["Study"]}
+        for name, dataframe in itertools.chain(
+            dataframes["Surveys"].items(),
+            dataframes["Reports"].items(),
+            self.__structure_tables().items(),
+        ):
+            if name in tables:
+                raise CastorException(f"Can't export two tables named {name}.")
+            tables[name] = dataframe
+        self.progress.message("Writing data to database...")
+        if backend == "sqlite":
+            with sqlite3.connect(path) as connection:
+                for name, dataframe in tables.items():
+                    self.__write_sqlite_table(connection, name, dataframe, batch_size)
+            connection.close()
+        else:
+            # pylint: disable=import-outside-toplevel
+            # DuckDB is an optional dependency, only needed for this backend
+            try:
+                import duckdb
+            except ImportError as error:
+                raise CastorException(
+                    "Exporting to DuckDB requires duckdb, "
+                    "install it with pip install castoredc_api[duckdb]."
+                ) from error
+            connection = duckdb.connect(str(path))
+            try:
+                for name, dataframe in tables.items():
+                    self.__write_duckdb_table(connection, name, dataframe)
+            finally:
+                connection.close()
+        return str(path)
+
+    def __structure_tables(self) -> Dict[str, pd.DataFrame]:
+        """Returns the tables with the fields and optiongroups of the study.
+        Optiongroups come from the lookup tables, so they aren't downloaded again."""
+        if "optiongroups" in self.pending_components:
+            self.load_components(["optiongroups"])
+        fields = pd.DataFrame.from_records(
+            [
+                {
+                    "field_id": field.field_id,
+                    "field_name": field.field_name,
+                    "field_label": field.field_label,
+                    "field_type": field.field_type,
+                    "field_required": field.field_required,
+                    "field_option_group": field.field_option_group,
+                    "field_order": field.field_order,
+                    "step_name": field.step.step_name,
+                    "form_name": field.step.form.form_name,
+                    "form_type": field.step.form.form_type,
+                }
+                for field in self.get_all_fields()
+            ],
+            columns=[
+                "field_id",
+                "field_name",
+                "field_label",
+                "field_type",
+                "field_required",
+                "field_option_group",
+                "field_order",
+                "step_name",
+                "form_name",
+                "form_type",
+            ],
+        )
+        optiongroups = pd.DataFrame.from_records(
+            [
+                {
+                    "optiongroup_id": lookup.optiongroup_id,
+                    "optiongroup_name": lookup.optiongroup_name,
+                    "option_name": name,
+                    "option_value": value,
+                }
+                for lookup in self.optiongroup_lookups.values()
+                for value, name in lookup.value_to_name.items()
+            ],
+            columns=[
+                "optiongroup_id",
+                "optiongroup_name",
+                "option_name",
+                "option_value",
+            ],
+        )
+        return {"Fields": fields, "Optiongroups": optiongroups}
+
+    @staticmethod
+    def __quote_identifier(name: str) -> str:
+        """Quotes a table or column name for use in SQL."""
+        return '"' + name.replace('"', '""') + '"'
+
+    @staticmethod
+    def __write_sqlite_table(
+        connection: sqlite3.Connection,
+        name: str,
+        dataframe: pd.DataFrame,
+        batch_size: int,
+    ) -> None:
+        """Replaces a table in an SQLite database with the dataframe.
+        Rows are inserted in batches of batch_size."""
+        table = CastorStudy.__quote_identifier(name)
+        columns = ", ".join(
+            f"{CastorStudy.__quote_identifier(column)} {CastorStudy.__sqlite_type(dtype)}"
+            for column, dtype in dataframe.dtypes.items()
+        )
+        connection.execute(f"DROP TABLE IF EXISTS {table}")
+        connection.execute(f"CREATE TABLE {table} ({columns})")
+        insert = (
+            f"INSERT INTO {table} VALUES ({', '.join('?' * len(dataframe.columns))})"
+        )
+        for start in range(0, len(dataframe), batch_size):
+            batch = dataframe.iloc[start : start + batch_size]
+            values = batch.astype(object)
+            # SQLite has no datetime type, datetimes are stored as ISO text
+            for column, dtype in batch.dtypes.items():
+                if dtype.kind == "M":
+                    values[column] = batch[column].map(
+                        lambda date: date.isoformat(sep=" ")
+                    )
+            connection.executemany(
+                insert,
+                values.where(batch.notna(), None).itertuples(index=False, name=None),
             )
-        return dataframes
+        if "record_id" in dataframe.columns:
+            connection.execute(
+                f"CREATE INDEX {CastorStudy.__quote_identifier(name + ' record_id')} "
+                f"ON {table} (record_id)"
+            )
+
+    @staticmethod
+    def __sqlite_type(dtype: Any) -> str:
+        """Returns the SQLite type of a column with the dtype.
+        Categorical columns get the type of their categories."""
+        if isinstance(dtype, pd.CategoricalDtype):
+            dtype = dtype.categories.dtype
+        return SQLITE_TYPES.get(dtype.kind, "TEXT")
+
+    @staticmethod
+    def __write_duckdb_table(connection: Any, name: str, dataframe: pd.DataFrame):
+        """Replaces a table in a DuckDB database with the dataframe.
+        The dataframe is ingested as an Arrow table."""
+        table = CastorStudy.__quote_identifier(name)
+        connection.register(
+            "export_table", pa.Table.from_pandas(dataframe, preserve_index=False)
+        )
+        connection.execute(
+            f"CREATE OR REPLACE TABLE {table} AS SELECT * FROM export_table"
+        )
+        connection.unregister("export_table")
+        if "record_id" in dataframe.columns:
+            connection.execute(
+                f"CREATE INDEX {CastorStudy.__quote_identifier(name + ' record_id')} "
+                f"ON {table} (record_id)"
+            )
+
+    def __export_files(
+        self,
+        dataframes: dict,
+        now: str,
+        write: Callable[[Any, str], Tuple[str, Tuple[int, int]]],
+        *,
+        threads: Optional[int],
+        extension: str,
+        delta: bool = False,
+        manifest: bool = False,
+    ) -> dict:
+        """Writes all dataframes (or export views) with write(dataframe, name)
+        in a pool of threads, write returns the path and shape of the file.
+        With manifest or delta, also writes a manifest of the files
+        with hashes of their content.
+        With delta, dataframes with the same content as in the previous export
+        with this extension are not written again, but keep the previous file.
+        The changed records are then written to a change log.
+        Returns dict of file locations."""
+        tables = (
+            [("Study", "Study", dataframes["Study"])]
+            + [("Survey", name, frame) for name, frame in dataframes["Surveys"].items()]
+            + [("Report", name, frame) for name, frame in dataframes["Reports"].items()]
+        )
+        # Streamed export views are not hashed, nor files without a manifest
+        hashes = [
+            self.__content_hashes(frame)
+            if (manifest or delta) and isinstance(frame, pd.DataFrame)
+            else {}
+            for _, _, frame in tables
+        ]
+        previous = self.__previous_manifest(extension) if delta else {}
+        # Files of the previous export with the same content are kept
+        files = [
+            self.__unchanged_file(previous.get((form_type, name)), content)
+            for (form_type, name, _), content in zip(tables, hashes)
+        ]
+        changed = [number for number, file in enumerate(files) if file is None]
+        written = dict(
+            zip(
+                changed,
+                self.__write_tables(
+                    [tables[number] for number in changed], write, threads
+                ),
+            )
+        )
+        files = [file or written[number] for number, file in enumerate(files)]
+        if manifest or delta:
+            self.__write_manifest(
+                now, tables, files, hashes, previous if delta else None
+            )
+        return self.__file_locations(dataframes, [path for path, _ in files])
+
+    def __write_manifest(
+        self,
+        now: str,
+        tables: List[Tuple[str, str, Any]],
+        files: List[Tuple[str, Tuple[int, int]]],
+        hashes: List[Dict[str, Any]],
+        previous: Optional[Dict[Tuple[str, str], dict]],
+    ) -> None:
+        """Writes the manifest of the files, and with a previous manifest
+        the change log of a delta export."""
+        manifest = [
+            {
+                "form_type": form_type,
+                "name": name,
+                "path": path,
+                "rows": rows,
+                "columns": columns,
+                **content,
+            }
+            for (form_type, name, _), (path, (rows, columns)), content in zip(
+                tables, files, hashes
+            )
+        ]
+        self.__write_json(now, "manifest", manifest)
+        if previous is not None:
+            self.__write_json(now, "changes", self.__change_log(manifest, previous))
+
+    def __write_tables(
+        self,
+        tables: List[Tuple[str, str, Any]],
+        write: Callable[[Any, str], Tuple[str, Tuple[int, int]]],
+        threads: Optional[int],
+    ) -> List[Tuple[str, Tuple[int, int]]]:
+        """Writes the tables in a pool of threads, returns the paths and shapes."""
+        # Writing files mostly releases the GIL, so threads can write at the same time
+        with self.metrics.phase("write_files") as phase, ThreadPoolExecutor(
+            max_workers=threads
+        ) as executor:
+            written = list(
+                executor.map(lambda table: write(table[2], table[1]), tables)
+            )
+            phase["rows"] = sum(rows for _, (rows, _) in written)
+        return written
+
+    @staticmethod
+    def __file_locations(dataframes: dict, paths: List[str]) -> dict:
+        """Returns the paths of the files in the same structure as the dataframes."""
+        surveys = len(dataframes["Surveys"])
+        return {
+            "Study": paths[0],
+            "Surveys": dict(zip(dataframes["Surveys"], paths[1 : surveys + 1])),
+            "Reports": dict(zip(dataframes["Reports"], paths[surveys + 1 :])),
+        }
+
+    def __write_json(self, now: str, name: str, content: Any) -> None:
+        """Writes content to a json file in the output folder."""
+        pathlib.Path(
+            pathlib.Path.cwd(), "output", f"{now} {self.study_id} {name}.json"
+        ).write_text(json.dumps(content, indent=2), encoding="utf-8")
+
+    @staticmethod
+    def __unchanged_file(
+        entry: Optional[dict], content: dict
+    ) -> Optional[Tuple[str, Tuple[int, int]]]:
+        """Returns the path and shape of the file of a previous manifest entry
+        if it has the same content, otherwise None."""
+        if entry is None or not content or entry.get("hash") != content["hash"]:
+            return None
+        return entry["path"], (entry["rows"], entry["columns"])
+
+    @staticmethod
+    def __content_hashes(dataframe: pd.DataFrame) -> Dict[str, Any]:
+        """Returns a hash of the content of the dataframe and a hash per record."""
+        rows = pd.util.hash_pandas_object(dataframe, index=False).to_numpy()
+        records = {
+            str(record_id): hashlib.blake2b(
+                rows[positions].tobytes(), digest_size=8
+            ).hexdigest()
+            for record_id, positions in dataframe.groupby(
+                "record_id", sort=False
+            ).indices.items()
+        }
+        # Changes to the columns also change the content
+        columns = json.dumps(
+            [[str(column), str(dtype)] for column, dtype in dataframe.dtypes.items()]
+        )
+        content = hashlib.blake2b(columns.encode("utf-8"), digest_size=8)
+        content.update(rows.tobytes())
+        return {"hash": content.hexdigest(), "records": records}
+
+    def __previous_manifest(self, extension: str) -> Dict[Tuple[str, str], dict]:
+        """Returns the entries of the latest manifest of files with this extension
+        on form type and name. Entries of files that no longer exist are left out."""
+        manifests = sorted(
+            pathlib.Path(pathlib.Path.cwd(), "output").glob(
+                f"* {self.study_id} manifest.json"
+            ),
+            reverse=True,
+        )
+        for manifest in manifests:
+            entries = json.loads(manifest.read_text(encoding="utf-8"))
+            if entries and entries[0]["path"].endswith(extension):
+                return {
+                    (entry["form_type"], entry["name"]): entry
+                    for entry in entries
+                    if pathlib.Path(entry["path"]).exists()
+                }
+        return {}
+
+    @staticmethod
+    def __change_log(
+        manifest: List[dict], previous: Dict[Tuple[str, str], dict]
+    ) -> List[dict]:
+        """Returns the changes per file compared to the previous manifest:
+        the status of the file and the added, changed and removed records."""
+        changes = []
+        for entry in manifest:
+            before = previous.pop((entry["form_type"], entry["name"]), None)
+            records = before.get("records", {}) if before else {}
+            if before is None:
+                status = "new"
+            elif before.get("hash") == entry["hash"]:
+                status = "unchanged"
+            else:
+                status = "changed"
+            changes.append(
+                {
+                    "form_type": entry["form_type"],
+                    "name": entry["name"],
+                    "status": status,
+                    "added": [
+                        record for record in entry["records"] if record not in records
+                    ],
+                    "changed": [
+                        record
+                        for record, content in entry["records"].items()
+                        if record in records and records[record] != content
+                    ],
+                    "removed": [
+                        record for record in records if record not in entry["records"]
+                    ],
+                }
+            )
+        # Files of forms that no longer exist
+        for (form_type, name), before in previous.items():
+            changes.append(
+                {
+                    "form_type": form_type,
+                    "name": name,
+                    "status": "removed",
+                    "added": [],
+                    "changed": [],
+                    "removed": list(before.get("records", {})),
+                }
+            )
+        return changes
+
+    def __stream_view_to_csv(
+        self, view: dict, name: str, now: str, chunk_size: int
+    ) -> Tuple[str, Tuple[int, int]]:
+        """Streams an export view to csv in chunks of chunk_size rows.
+        Views of more than one chunk are read twice: first the dtypes the columns
+        would have in one dataframe are determined from the raw data, then the chunks
+        are interpreted, cast to these dtypes and written.
+        Returns the destination path and the shape of the file."""
+        chunks = self.__view_data(view, chunk_size)
+        first = next(chunks)
+        second = next(chunks, None)
+        if second is None:
+            # A single chunk gets the same dtypes as in one dataframe
+            chunks, dtypes = iter([first]), None
+        else:
+            del first, second
+            dtypes = self.__stream_dtypes(view, chunk_size)
+            chunks = self.__view_data(view, chunk_size)
+        rows = 0
+        for data in chunks:
+            dataframe = self.__export_data(view, data, dtypes)
+            if rows == 0:
+                path = self.export_dataframe_to_csv(dataframe, name, now)
+            else:
+                dataframe.to_csv(
+                    path_or_buf=path, sep=";", index=False, header=False, mode="a"
+                )
+            rows += len(dataframe)
+        return path, (rows, len(dataframe.columns))
+
+    def __stream_dtypes(self, view: dict, chunk_size: int) -> Dict[str, Any]:
+        """Returns the dtypes that the columns of an export view would have
+        when the view was exported as one dataframe, without interpreting the data.
+        The dtypes of interpreted columns follow from the field type and the kinds
+        of raw values, see interpreted_dtypes. Columns of optiongroup and year fields
+        always get the same dtype, auxiliary columns the dtypes of the raw data."""
+        fields = {field.field_name: field for field in view["fields"]}
+        auxiliary = [name for name in view["column_order"] if name not in fields]
+        kinds = {
+            name: set()
+            for name, field in fields.items()
+            if interpreted_dtypes(field.field_type, {"filled"})
+        }
+        auxiliary_samples = []
+        for data in self.__view_data(view, chunk_size):
+            for name, column_kinds in kinds.items():
+                column_kinds.update(map(raw_value_kind, data[name].unique()))
+            # The first missing and filled in row of every column keep the chunk dtypes
+            positions = set()
+            for name in auxiliary:
+                nulls = data[name].isna().to_numpy()
+                positions.update(nulls.nonzero()[0][:1].tolist())
+                positions.update((~nulls).nonzero()[0][:1].tolist())
+            auxiliary_samples.append(data[auxiliary].iloc[sorted(positions)])
+        dtypes = self.__combined_dtypes(iter(auxiliary_samples))
+        for name, column_kinds in kinds.items():
+            for suffix, dtype in interpreted_dtypes(
+                fields[name].field_type, column_kinds
+            ).items():
+                dtypes[name + suffix] = dtype
+        return dtypes
+
+    @staticmethod
+    def __combined_dtypes(dataframes: Iterator[pd.DataFrame]) -> Dict[str, Any]:
+        """Returns the dtypes that the columns of the chunks would have
+        when the chunks were created as one dataframe."""
+        first, seen, missing = {}, {}, set()
+        for dataframe in dataframes:
+            for name, column in dataframe.items():
+                first.setdefault(name, column.dtype)
+                nulls = column.isna()
+                if nulls.any():
+                    missing.add(name)
+                # Columns without values don't determine the dtype
+                if not nulls.all():
+                    seen.setdefault(name, []).append(column.dtype)
+        dtypes = {}
+        for name, dtype in first.items():
+            chunk_dtypes = seen.get(name, [dtype])
+            dtype = chunk_dtypes[0]
+            if any(other != dtype for other in chunk_dtypes):
+                numeric = all(
+                    not pd.api.types.is_extension_array_dtype(other)
+                    and other.kind in "iuf"
+                    for other in chunk_dtypes
+                )
+                dtype = "float64" if numeric else object
+            # Missing values don't fit in numpy integer and boolean columns
+            if name in missing and not pd.api.types.is_extension_array_dtype(dtype):
+                if pd.api.types.is_integer_dtype(dtype):
+                    dtype = "float64"
+                elif pd.api.types.is_bool_dtype(dtype):
+                    dtype = object
+            dtypes[name] = dtype
+        return dtypes
 
     def export_dataframe_to_csv(
         self, dataframe: pd.DataFrame, name: str, now: str
@@ -378,30 +1780,128 @@ class CastorStudy:
         return str(path)
 
     def export_dataframe_to_feather(
-        self, dataframe: pd.DataFrame, name: str, now: str
+        self,
+        dataframe: pd.DataFrame,
+        name: str,
+        now: str,
+        *,
+        compression: str = "uncompressed",
+        batch_size: Optional[int] = None,
     ) -> str:
-        """Exports a single dataframe to feather and returns the destination path."""
+        """Exports a single dataframe to feather and returns the destination path.
+        Compression is uncompressed, lz4 or zstd. With batch_size, the dataframe is
+        converted and written in record batches of that many rows."""
         filename = re.sub(r"[^\w\-_\. ]", "_", name)
 
         path = pathlib.Path(
             pathlib.Path.cwd(), "output", f"{now} {self.study_id} {filename}.feather"
         )
-        if dataframe.empty:
-            # If dataframe is empty, set all dtypes to object
-            # See also https://github.com/reiniervlinschoten/castoredc_api/issues/44
-            dataframe = dataframe.astype("object")
+        dataframe = dataframe.reset_index(drop=True)
+        schema = pa.Schema.from_pandas(dataframe, preserve_index=False)
+        options = pa.ipc.IpcWriteOptions(
+            compression=None if compression == "uncompressed" else compression
+        )
+        # Feather files are Arrow IPC files
+        with pa.ipc.new_file(path, schema, options=options) as writer:
+            rows = batch_size or max(len(dataframe), 1)
+            # Empty dataframes are written as an empty batch to keep the categories
+            for start in range(0, max(len(dataframe), 1), rows):
+                writer.write_batch(
+                    pa.RecordBatch.from_pandas(
+                        dataframe.iloc[start : start + rows],
+                        schema=schema,
+                        preserve_index=False,
+                    )
+                )
+        return str(path)
 
-        dataframe.reset_index(drop=True).to_feather(
+    def export_dataframe_to_parquet(
+        self,
+        dataframe: pd.DataFrame,
+        name: str,
+        now: str,
+        *,
+        compression: str = "snappy",
+        partition_cols: Optional[List[str]] = None,
+    ) -> str:
+        """Exports a single dataframe to parquet and returns the destination path.
+        With partition_cols, the destination is a folder with a file per partition."""
+        filename = re.sub(r"[^\w\-_\. ]", "_", name)
+        path = pathlib.Path(
+            pathlib.Path.cwd(), "output", f"{now} {self.study_id} {filename}.parquet"
+        )
+        for column in partition_cols or []:
+            if column not in dataframe.columns:
+                raise CastorException(f"Can't partition {name} on missing {column}.")
+        dataframe.to_parquet(
             path,
-            compression="uncompressed",
+            compression=compression,
+            index=False,
+            partition_cols=partition_cols,
         )
         return str(path)
 
+    # Loaded on first access when map_structure skipped them
+    @property
+    def optiongroups(self) -> Dict[str, dict]:
+        """The optiongroups of the study on id, as returned by the API."""
+        if self._optiongroups is None:
+            self.progress.message("Downloading Optiongroups")
+            self.__load_optiongroups(self.client.all_field_optiongroups())
+        return self._optiongroups
+
+    @optiongroups.setter
+    def optiongroups(self, optiongroups: Dict[str, dict]) -> None:
+        self._optiongroups = optiongroups
+
+    @property
+    def all_survey_packages(self) -> Dict[str, dict]:
+        """The survey packages of the study on name."""
+        if "survey_packages" in self.pending_components:
+            self.load_components(["survey_packages"])
+        return self._all_survey_packages
+
+    @all_survey_packages.setter
+    def all_survey_packages(self, all_survey_packages: Dict[str, dict]) -> None:
+        self._all_survey_packages = all_survey_packages
+
     # HELPERS
     def get_single_optiongroup(self, optiongroup_id: str) -> Optional[Dict]:
-        """Get a single optiongroup based on id."""
+        """Get a single optiongroup based on id, as returned by the API.
+        After map_data the optiongroups are downloaded for this, unless the fields are
+        loaded. For the options use get_single_optiongroup_lookup instead."""
         return self.optiongroups.get(optiongroup_id)
 
+    def get_single_survey_package(self, package_name: str) -> Optional[Dict]:
+        """Get a single survey package based on name."""
+        return self.all_survey_packages.get(package_name)
+
+    def get_missing_dates(self, freq: str, output_format: str) -> Dict[str, str]:
+        """Get the formatted dates that represent user missings for a format.
+        These are created once per format and then reused."""
+        key = (freq, output_format)
+        if key not in self.missing_dates:
+            self.missing_dates[key] = format_missing_dates(freq, output_format)
+        return self.missing_dates[key]
+
+    def get_single_optiongroup_lookup(
+        self, optiongroup_id: str
+    ) -> Optional[CastorOptionGroup]:
+        """Get the lookup tables of a single optiongroup based on id.
+        Creates them if the optiongroup was added after loading the optiongroups.
+        Never downloads the optiongroups again, as the lookups hold all exported ones.
+        """
+        if "optiongroups" in self.pending_components:
+            self.load_components(["optiongroups"])
+        lookup = self.optiongroup_lookups.get(optiongroup_id)
+        if lookup is None:
+            optiongroup = (self._optiongroups or {}).get(optiongroup_id)
+            if optiongroup is None:
+                return None
+            lookup = CastorOptionGroup(optiongroup)
+            self.optiongroup_lookups[optiongroup_id] = lookup
+        return lookup
+
     def add_form(self, form: CastorForm) -> None:
         """Add a CastorForm to the study."""
         self.forms_on_id[form.form_id] = form
@@ -546,6 +2046,8 @@ class CastorStudy:
 
     def get_all_data_points(self) -> List["CastorDataPoint"]:
         """Returns all data_points of the study"""
+        if self.data_store is not None:
+            return self.data_store.get_all_data_points()
         data_points = list(
             itertools.chain.from_iterable(
                 [value.get_all_data_points() for key, value in self.records.items()]
@@ -557,6 +2059,10 @@ class CastorStudy:
         self, record_id: str, form_instance_id: str, field_id_or_name: str
     ) -> Optional["CastorDataPoint"]:
         """Returns a single data_point based on id."""
+        if self.data_store is not None:
+            return self.data_store.get_single_data_point(
+                record_id, form_instance_id, field_id_or_name
+            )
         form_instance = self.get_single_form_instance_on_id(record_id, form_instance_id)
         return form_instance.get_single_data_point(field_id_or_name)
 
@@ -576,15 +2082,40 @@ class CastorStudy:
         return form
 
     # PRIVATE HELPER FUNCTIONS
-    def __link_data(self, archived: bool) -> None:
-        """Links the study data"""
-        # Get the data from the API
-        print("Downloading Study Data.", flush=True, file=sys.stderr)
-        data = self.client.export_study_data(archived=archived)
+    def __link_data(self, archived: bool, record_data: List[dict]) -> None:
+        """Links the study data of the selection.
+        Downloads the data per record when that takes fewer requests than exporting all data.
+        """
+        record_ids = [
+            record["id"] for record in record_data if self.__selected(record["id"])
+        ]
+        requests = len(record_ids) * len(self.__selected_collections())
+        with self.metrics.phase("download_data") as phase:
+            if self.selected_records is not None and requests <= min(
+                RECORD_DOWNLOAD_LIMIT, len(record_data)
+            ):
+                self.progress.message("Downloading Record Data.")
+                data = list(
+                    itertools.chain.from_iterable(
+                        self.__download_records_data(record_ids).values()
+                    )
+                )
+            else:
+                # Get the data from the API
+                self.progress.message("Downloading Study Data.")
+                data = self.client.export_study_data(archived=archived)
+                if self.selected_records is not None or self.selected_forms is not None:
+                    data = [
+                        row
+                        for row in data
+                        if self.__selected(row["Record ID"], self.__row_form_id(row))
+                    ]
+            phase["rows"] = len(data)
 
         # Loop over all fields
-        for field in tqdm(data, desc="Mapping Data"):
-            self.__handle_row(field)
+        with self.metrics.phase("link_data", rows=len(data)):
+            for field in self.progress.track(data, "Mapping Data"):
+                self.__handle_row(field)
 
     def __handle_row(self, field):
         """Handles a row from the export data."""
@@ -622,6 +2153,12 @@ class CastorStudy:
 
     def __handle_data_point(self, field, form_instance):
         """Handles the data point from the export data"""
+        if self.data_store is not None:
+            # Duplicated data points are checked when the store is first queried
+            self.data_store.add_data_point(
+                field["Field ID"], field["Value"], field["Date"], form_instance
+            )
+            return
         # Check if the data point already exists
         # Should not happen, but just in case
         data_point = form_instance.get_single_data_point(field["Field ID"])
@@ -672,11 +2209,11 @@ class CastorStudy:
             record.add_form_instance(form_instance)
         return form_instance
 
-    def __export_study_data(self, archived) -> pd.DataFrame:
-        """Returns a dataframe containing all study data."""
+    def __export_study_view(self, archived) -> dict:
+        """Returns the export view of all study data."""
         # Get study forms
         forms = self.get_all_form_type_forms("Study")
-        df_study = self.__export_data(
+        return self.__export_view(
             forms,
             [
                 "record_id",
@@ -688,16 +2225,12 @@ class CastorStudy:
             "Study",
             archived,
         )
-        return df_study
-
-    def __export_survey_data(self, archived) -> Dict[str, pd.DataFrame]:
-        """Returns a dict of dataframes containing all survey data."""
-        dataframes = {}
-        # Get survey forms
-        forms = self.get_all_form_type_forms("Survey")
-        # For each survey form, create a distinct dataframe
-        for form in forms:
-            dataframe = self.__export_data(
+
+    def __export_survey_views(self, archived) -> Dict[str, dict]:
+        """Returns a dict of export views of all survey data."""
+        # For each survey form, create a distinct view
+        return {
+            form.form_name: self.__export_view(
                 [form],
                 [
                     "record_id",
@@ -715,18 +2248,14 @@ class CastorStudy:
                 "Survey",
                 archived,
             )
-            # Add to return dict
-            dataframes[form.form_name] = dataframe
-        return dataframes
+            for form in self.get_all_form_type_forms("Survey")
+        }
 
-    def __export_report_data(self, archived):
-        """Returns a dict of dataframes containing all report data."""
-        dataframes = {}
-        # Get survey forms
-        forms = self.get_all_form_type_forms("Report")
-        # For each survey form, create a distinct dataframe
-        for form in forms:
-            dataframe = self.__export_data(
+    def __export_report_views(self, archived) -> Dict[str, dict]:
+        """Returns a dict of export views of all report data."""
+        # For each report form, create a distinct view
+        return {
+            form.form_name: self.__export_view(
                 [form],
                 [
                     "record_id",
@@ -739,27 +2268,32 @@ class CastorStudy:
                 "Report",
                 archived,
             )
-            # Add to return dict
-            dataframes[form.form_name] = dataframe
-        return dataframes
+            for form in self.get_all_form_type_forms("Report")
+        }
 
-    def __export_data(
+    def __export_view(
         self,
         forms: List["CastorForm"],
         extra_columns: List[str],
         form_type: str,
         archived: bool,
-    ) -> pd.DataFrame:
-        """Exports given type of data and returns a dataframe."""
+    ) -> dict:
+        """Returns the export view of given type of data.
+        This holds a function yielding the rows of raw data
+        and the fields to create the dataframe from."""
         # Get all study fields
         fields = self.__filtered_fields_forms(forms)
         # Get all data points
         if form_type == "Study":
-            data = self.__get_all_data_points_study(fields, archived)
+            rows = functools.partial(self.__get_all_data_points_study, archived)
         elif form_type == "Survey":
-            data = self.__get_all_data_points_survey(forms[0], archived)
+            rows = functools.partial(
+                self.__get_all_data_points_survey, forms[0], archived
+            )
         elif form_type == "Report":
-            data = self.__get_all_data_points_report(forms[0], archived)
+            rows = functools.partial(
+                self.__get_all_data_points_report, forms[0], archived
+            )
         else:
             raise CastorException(
                 f"{form_type} is not a valid type. Use Study/Survey/Report."
@@ -772,181 +2306,220 @@ class CastorStudy:
         )
         # Define columns from study + auxiliary record columns
         column_order = extra_columns + [field.field_name for field in sorted_fields]
-        # Convert study data points to data frame
-        dataframe = pd.DataFrame.from_records(data, columns=column_order)
+        return {
+            "rows": rows,
+            "fields": fields,
+            "column_order": column_order,
+        }
+
+    @staticmethod
+    def __view_data(
+        view: dict, chunk_size: Optional[int] = None
+    ) -> Iterator[pd.DataFrame]:
+        """Yields the raw data of an export view as dataframes of chunk_size rows,
+        or as a single dataframe without chunk_size. Always yields at least one."""
+        rows = view["rows"]()
+        chunk = list(itertools.islice(rows, chunk_size))
+        while True:
+            yield pd.DataFrame.from_records(chunk, columns=view["column_order"])
+            chunk = list(itertools.islice(rows, chunk_size)) if chunk_size else []
+            if not chunk:
+                return
+
+    def __portable_view(self, view: dict) -> dict:
+        """Returns an export view that can be sent to another process.
+        Fields are copied without their links to the study, the optiongroup lookups
+        and settings of the study that the fields need are added."""
+        fields = [
+            CastorField(
+                field_name=field.field_name,
+                field_id=field.field_id,
+                field_type=field.field_type,
+                field_label=field.field_label,
+                field_required="1" if field.field_required else "0",
+                field_option_group=field.field_option_group,
+                field_order=field.field_order,
+            )
+            for field in view["fields"]
+        ]
+        optiongroups = {
+            field.field_option_group: self.get_single_optiongroup_lookup(
+                field.field_option_group
+            )
+            for field in fields
+            if field.field_option_group
+        }
+        return dict(
+            {key: value for key, value in view.items() if key != "rows"},
+            data=next(self.__view_data(view)),
+            fields=fields,
+            study_id=self.study_id,
+            configuration=self.configuration,
+            pass_keyerrors=self.pass_keyerrors,
+            optiongroup_lookups={
+                optiongroup_id: optiongroup
+                for optiongroup_id, optiongroup in optiongroups.items()
+                if optiongroup is not None
+            },
+        )
+
+    @classmethod
+    def dataframe_from_view(cls, view: dict) -> pd.DataFrame:
+        """Creates the dataframe from a portable export view in a worker process."""
+        study = cls(
+            "",
+            "",
+            view["study_id"],
+            "",
+            test=True,
+            format_options=view["configuration"],
+            pass_keyerrors=view["pass_keyerrors"],
+        )
+        study.optiongroup_lookups = view["optiongroup_lookups"]
+        return study.__export_data(view, view["data"])
+
+    def __export_data(
+        self,
+        view: dict,
+        data: pd.DataFrame,
+        dtypes: Optional[Dict[str, Any]] = None,
+    ) -> pd.DataFrame:
+        """Creates the dataframe from the raw data of an export view.
+        All columns are created separately and combined into the dataframe at once.
+        With dtypes, the columns are cast to these instead of inferring their dtypes."""
+        fields = view["fields"]
+        # Interpret the raw values column by column
+        with self.metrics.phase("interpret", rows=len(data)):
+            columns = self.__interpret_data(data, fields, dtypes or {})
         # Split up checkbox and numberdate fields (multiple values in one column)
-        dataframe, column_order = self.__split_up_checkbox_data(
-            dataframe, fields, column_order
+        columns, column_order = self.__split_up_checkbox_data(
+            columns, fields, list(view["column_order"])
         )
-        dataframe, column_order = self.__split_up_numberdate_data(
-            dataframe, fields, column_order
+        column_order = self.__split_up_numberdate_data(fields, column_order)
+        columns = self.__format_year(columns, fields)
+        columns = self.__format_categorical_fields(columns, fields)
+        # Combine the columns in order, auxiliary columns are taken from the data
+        dataframe = pd.concat(
+            [columns[name] if name in columns else data[name] for name in column_order],
+            axis=1,
+            keys=column_order,
         )
-        dataframe = self.__format_year(dataframe, fields)
-        dataframe = self.__format_categorical_fields(dataframe, fields)
-        # Order the dataframe
-        dataframe = dataframe[column_order]
-        return dataframe
+        return dataframe.astype(dtypes) if dtypes else dataframe
+
+    def __export_dataframes(self, views: List[dict], processes: Optional[int]):
+        """Creates the dataframes from the export views.
+        With processes, the dataframes are created in a pool of worker processes."""
+        if processes is None:
+            return [
+                self.__export_data(view, next(self.__view_data(view))) for view in views
+            ]
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            return list(
+                executor.map(
+                    CastorStudy.dataframe_from_view,
+                    [self.__portable_view(view) for view in views],
+                )
+            )
+
+    def __interpret_data(
+        self,
+        dataframe: pd.DataFrame,
+        fields: List[CastorField],
+        dtypes: Dict[str, Any],
+    ) -> Dict[str, pd.Series]:
+        """Interprets the raw values in the dataframe for all fields at once.
+        Returns the interpreted columns on name, cast to dtypes if given.
+        Numberdate fields are split up in a number and a date column."""
+        columns = {}
+        for field in fields:
+            if field.field_type == "numberdate":
+                numbers, dates = interpret_numberdate(dataframe[field.field_name], self)
+                columns[field.field_name + "_number"] = numbers
+                columns[field.field_name + "_date"] = dates
+            else:
+                columns[field.field_name] = interpret_column(
+                    dataframe[field.field_name], field, self
+                )
+        for name, column in columns.items():
+            if name not in dtypes:
+                columns[name] = column.infer_objects()
+            # Object columns keep the values as interpreted, like inferring would
+            elif dtypes[name] == object:
+                columns[name] = column.astype(object)
+            else:
+                columns[name] = column.infer_objects().astype(dtypes[name])
+        return columns
 
     def __format_categorical_fields(
-        self, dataframe: pd.DataFrame, fields: List[CastorField]
-    ) -> pd.DataFrame:
+        self, columns: Dict[str, pd.Series], fields: List[CastorField]
+    ) -> Dict[str, pd.Series]:
         """Sets categorical fields to use categorical dtype."""
         cat_fields = [
             field for field in fields if field.field_type in ["dropdown", "radio"]
         ]
         for field in cat_fields:
             # Get options + missings
-            options = self.get_single_optiongroup(field.field_option_group)["options"]
-            # Remove duplicates
-            option_names = list(
-                set(
-                    [option["name"] for option in options]
-                    + [
-                        "measurement failed",
-                        "not applicable",
-                        "not asked",
-                        "asked but unknown",
-                        "not done",
-                    ]
-                )
-            )
+            categories = self.get_single_optiongroup_lookup(
+                field.field_option_group
+            ).categories
 
             # Set columns to categorical
-            cat_type = pd.CategoricalDtype(categories=option_names, ordered=False)
-            dataframe[field.field_name] = dataframe[field.field_name].astype(cat_type)
-        return dataframe
+            cat_type = pd.CategoricalDtype(categories=categories, ordered=False)
+            columns[field.field_name] = columns[field.field_name].astype(cat_type)
+        return columns
 
     @staticmethod
     def __format_year(
-        dataframe: pd.DataFrame, fields: List[CastorField]
-    ) -> pd.DataFrame:
+        columns: Dict[str, pd.Series], fields: List[CastorField]
+    ) -> Dict[str, pd.Series]:
         """Casts year fields to the correct format."""
         # Year fields to Ints
         year_fields = [field for field in fields if field.field_type == "year"]
         for year in year_fields:
-            dataframe[year.field_name] = dataframe[year.field_name].astype("Int64")
-        return dataframe
+            columns[year.field_name] = columns[year.field_name].astype("Int64")
+        return columns
 
     @staticmethod
     def __split_up_numberdate_data(
-        dataframe: pd.DataFrame, fields: List[CastorField], column_order: List[str]
-    ) -> (pd.DataFrame, List[str]):
-        """Splits up the numberdate data in dummies and returns a new dataframe + column order."""
+        fields: List[CastorField], column_order: List[str]
+    ) -> List[str]:
+        """Replaces numberdate fields in the column order with their number and date columns.
+        These columns are created when interpreting the data."""
         # Select numberdate fields
         numberdate_fields = [
             field for field in fields if field.field_type == "numberdate"
         ]
         for numberdate in numberdate_fields:
-            # Create dummies
-            dummies = [
-                numberdate.field_name + "_number",
-                numberdate.field_name + "_date",
-            ]
-            # Get an array of the data and double the nans
-            temp_list = dataframe[numberdate.field_name].tolist()
-            temp_list = [
-                [item, item] if not pd.Series(item).any() else item
-                for item in temp_list
-            ]
-            # Add the dummies to the old data frame
-            dataframe[dummies] = pd.DataFrame(temp_list, index=dataframe.index)
             # Replace the old column in the order with the new dummy columns
             index = column_order.index(numberdate.field_name)
             column_order.pop(index)
-            for dummy in dummies:
-                column_order.insert(index, dummy)
-
-        return dataframe, column_order
+            for dummy in ["_number", "_date"]:
+                column_order.insert(index, numberdate.field_name + dummy)
+        return column_order
 
     def __split_up_checkbox_data(
         self,
-        dataframe: pd.DataFrame,
+        columns: Dict[str, pd.Series],
         fields: List[CastorField],
         column_order: List[str],
-    ) -> (pd.DataFrame, List[str]):
-        """Splits up the checkbox data in dummies and returns a new dataframe + column order."""
+    ) -> (Dict[str, pd.Series], List[str]):
+        """Splits up the checkbox data in dummies and returns the new columns + column order."""
         # Select checkbox fields
         checkbox_fields = [field for field in fields if field.field_type == "checkbox"]
-        # Create dummies
-        dataframe, column_order = self.__create_dummy_columns(
-            checkbox_fields, column_order, dataframe
-        )
-        # Fill in the correct values
-        dataframe = self.__update_dummy_values(checkbox_fields, dataframe)
-        return dataframe, column_order
-
-    def __update_dummy_values(
-        self, checkbox_fields: List, dataframe: pd.DataFrame
-    ) -> pd.DataFrame:
-        """Updates dummy values in a dataframe for checkbox fields."""
         for checkbox in checkbox_fields:
-            # Create a dataframe with dummies
-            # Cast to string because a completely NaN column throws an error (is float64)
-            temp_df = (
-                dataframe[checkbox.field_name].astype(str).str.get_dummies(sep="|")
-            )
-
-            # Rename the columns
-            temp_df.columns = [
-                checkbox.field_name + "#" + column for column in temp_df.columns
-            ]
-
-            missing_types = {
-                checkbox.field_name + "#" + "measurement failed": -95,
-                checkbox.field_name + "#" + "not applicable": -96,
-                checkbox.field_name + "#" + "not asked": -97,
-                checkbox.field_name + "#" + "asked but unknown": -98,
-                checkbox.field_name + "#" + "not done": -99,
-            }
-
-            # Add the new dummies to the old dataframe, update doesn't add new columns
-            dataframe.update(temp_df)
-
-            # Handle user missings and propagate them through all checkbox fields
-            options = self.get_single_optiongroup(checkbox.field_option_group)[
-                "options"
-            ]
-            option_names = [option["name"] for option in options]
+            option_names = self.get_single_optiongroup_lookup(
+                checkbox.field_option_group
+            ).option_names
 
             # Create new columns for these dummies
             new_column_names = [
                 checkbox.field_name + "#" + option_name for option_name in option_names
             ]
-
-            # Set all dummy columns to missing if one of the missings is True
-            for missing_type, value in missing_types.items():
-                try:
-                    dataframe.loc[temp_df[missing_type] == 1, new_column_names] = value
-                except KeyError:
-                    pass
-
-            # Set columns to categorical
-            cat_type = pd.CategoricalDtype(
-                categories=[0, 1, -95, -96, -97, -98, -99], ordered=False
-            )
-            for column in new_column_names:
-                dataframe[column] = dataframe[column].astype(cat_type)
-
-        return dataframe
-
-    def __create_dummy_columns(
-        self, checkbox_fields: List, column_order: List, dataframe: pd.DataFrame
-    ) -> (pd.DataFrame, List):
-        """Creates dummy columns in the dataframe for all checkbox fields"""
-        # Get all possible dummies
-        for checkbox in checkbox_fields:
-            options = self.get_single_optiongroup(checkbox.field_option_group)[
-                "options"
-            ]
-            option_names = [option["name"] for option in options]
-
-            # Create new columns for these dummies
-            new_column_names = [
-                checkbox.field_name + "#" + option_name for option_name in option_names
-            ]
-            dataframe = dataframe.reindex(
-                columns=dataframe.columns.tolist() + new_column_names, fill_value=0
-            )
+            interpreted = columns[checkbox.field_name]
+            for name, dummy in zip(
+                new_column_names, checkbox_dummies(interpreted, option_names)
+            ):
+                columns[name] = pd.Series(dummy, index=interpreted.index)
 
             # Replace the old column in the order with the new dummy columns
             index = column_order.index(checkbox.field_name)
@@ -954,7 +2527,7 @@ class CastorStudy:
             for dummy in new_column_names:
                 column_order.insert(index, dummy)
 
-        return dataframe, column_order
+        return columns, column_order
 
     @staticmethod
     def __filtered_fields_forms(forms: List[CastorForm]) -> List["CastorField"]:
@@ -965,63 +2538,55 @@ class CastorStudy:
         )
         # Filter out remark fields
         filtered_fields = [
-            field
-            for field in fields
-            if field.field_type
-            not in (
-                "remark",
-                "repeated_measures",
-                "add_report_button",
-                "summary",
-                "image",
-            )
+            field for field in fields if field.field_type not in NON_DATA_FIELD_TYPES
         ]
         return filtered_fields
 
-    def __get_all_data_points_study(self, fields: List, archived: bool) -> List[dict]:
-        """Returns a list of dicts of all study data points."""
+    def __get_raw_values(
+        self, form_instances: List["CastorFormInstance"]
+    ) -> Dict[str, str]:
+        """Returns the raw values of the form instances as {field_name: raw_value}."""
+        if self.data_store is not None:
+            return self.data_store.get_raw_values(form_instances)
+        return {
+            data_point.instance_of.field_name: data_point.raw_value
+            for instance in form_instances
+            for data_point in instance.get_all_data_points()
+        }
+
+    def __get_all_data_points_study(self, archived: bool) -> Iterator[dict]:
+        """Yields dicts of all study data points."""
         # Get all records
         records = self.get_all_records()
-        data = []
 
         for record in records:
             # Test whether data points should be extracted
             if archived or not record.archived:
-                data_points = record.get_all_data_points()
-                filtered_data_points = [
-                    data_point
-                    for data_point in data_points
-                    if data_point.instance_of in fields
-                ]
-                record_data = {
-                    data_point.instance_of.field_name: data_point.value
-                    for data_point in filtered_data_points
-                }
+                # Only study form instances hold data of study fields
+                record_data = self.__get_raw_values(
+                    [
+                        instance
+                        for instance in record.get_all_form_instances()
+                        if instance.instance_type == "Study"
+                    ]
+                )
                 record_data["record_id"] = record.record_id
                 record_data["institute"] = record.institute
                 record_data["randomisation_group"] = record.randomisation_group
                 record_data["randomisation_datetime"] = record.randomisation_datetime
                 record_data["archived"] = record.archived
-                data.append(record_data)
-
-        return data
+                yield record_data
 
     def __get_all_data_points_survey(
         self, form: "CastorForm", archived: bool
-    ) -> List[dict]:
-        """Returns a list of dicts of all survey data points."""
-        data = []
+    ) -> Iterator[dict]:
+        """Yields dicts of all survey data points."""
         form_instances = self.get_form_instances_by_form(form)
         for instance in form_instances:
             # Test whether data points should be extracted
             if archived or not (instance.record.archived or instance.archived):
-                # Get all data points and select only relevant ones
-                data_points = instance.get_all_data_points()
                 # Report data
-                record_form_data = {
-                    data_point.instance_of.field_name: data_point.value
-                    for data_point in data_points
-                }
+                record_form_data = self.__get_raw_values([instance])
                 # Auxiliary data
                 record_form_data["record_id"] = instance.record.record_id
                 record_form_data["institute"] = instance.record.institute
@@ -1035,27 +2600,18 @@ class CastorStudy:
                 record_form_data["package_name"] = instance.survey_package_name
                 record_form_data["archived"] = instance.archived
 
-                # Add to data
-                data.append(record_form_data)
-
-        return data
+                yield record_form_data
 
     def __get_all_data_points_report(
         self, form: "CastorForm", archived: bool
-    ) -> List[dict]:
-        """Returns a list of dicts of all report data points."""
-        data = []
+    ) -> Iterator[dict]:
+        """Yields dicts of all report data points."""
         form_instances = self.get_form_instances_by_form(form)
         for instance in form_instances:
             # Test whether data points should be extracted
             if archived or not (instance.record.archived or instance.archived):
-                # Get all data points and select only relevant ones
-                data_points = instance.get_all_data_points()
                 # Report data
-                record_form_data = {
-                    data_point.instance_of.field_name: data_point.value
-                    for data_point in data_points
-                }
+                record_form_data = self.__get_raw_values([instance])
                 # Auxiliary data
                 record_form_data["record_id"] = instance.record.record_id
                 record_form_data["institute"] = instance.record.institute
@@ -1064,10 +2620,7 @@ class CastorStudy:
                 record_form_data["parent"] = instance.parent
                 record_form_data["archived"] = instance.archived
 
-                # Add to data
-                data.append(record_form_data)
-
-        return data
+                yield record_form_data
 
     # Standard Operators
     def __eq__(self, other: Any) -> Union[bool, type(NotImplemented)]:
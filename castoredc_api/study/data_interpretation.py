@@ -0,0 +1,406 @@
+"""Module for interpreting the raw values of a Castor field as a column.
+Gives the same results as CastorDataPoint.value, but handles all values of a field at once."""
+import functools
+import typing
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from castoredc_api import CastorException
+
+if typing.TYPE_CHECKING:
+    from castoredc_api.study.castor_objects.castor_field import CastorField
+    from castoredc_api.study.castor_study import CastorStudy
+
+OPTIONGROUP_TYPES = ("checkbox", "dropdown", "radio")
+NUMERIC_TYPES = ("numeric", "slider", "randomization")
+TEXT_TYPES = ("string", "textarea", "upload", "calculation")
+
+# User missings in order of precedence with their numeric code
+USER_MISSINGS = {
+    "measurement failed": -95,
+    "not applicable": -96,
+    "not asked": -97,
+    "asked but unknown": -98,
+    "not done": -99,
+}
+USER_MISSING_STRINGS = {
+    missing_type: str(code) for missing_type, code in USER_MISSINGS.items()
+}
+# Raw values of the user missings as exported, for a lookup without scanning
+MISSING_RAW_VALUES = {
+    f"Missing ({missing_type})": missing_type for missing_type in USER_MISSINGS
+}
+NOT_RECOGNIZED = "Missing value not recognized"
+# Categories of the dummy columns of checkbox fields: unchecked, checked and user missings
+CHECKBOX_DTYPE = pd.CategoricalDtype(
+    categories=[0, 1] + list(USER_MISSINGS.values()), ordered=False
+)
+
+# Directives that pd.Period.strftime handles differently from datetime.strftime
+PERIOD_DIRECTIVES = ("%f", "%F", "%q", "%l", "%u", "%n")
+
+
+def user_missing_type(raw_value: str) -> typing.Optional[str]:
+    """Returns the user missing type in a raw value or None if not recognized."""
+    missing_type = MISSING_RAW_VALUES.get(raw_value)
+    if missing_type is not None:
+        return missing_type
+    for missing_type in USER_MISSINGS:
+        if missing_type in raw_value:
+            return missing_type
+    return None
+
+
+def raw_value_kind(raw_value: typing.Any) -> str:
+    """Returns the kind of a raw value: null (no value), empty, missing,
+    not_recognized (user missing of unknown type) or filled."""
+    if pd.isna(raw_value):
+        return "null"
+    if raw_value == "":
+        return "empty"
+    if "Missing" in str(raw_value):
+        return "not_recognized" if user_missing_type(raw_value) is None else "missing"
+    return "filled"
+
+
+def interpreted_dtypes(
+    field_type: str, kinds: typing.Set[str]
+) -> typing.Dict[str, typing.Any]:
+    """Returns the dtypes that the interpreted columns of a field get when inferred,
+    given the kinds of raw values in the column, see raw_value_kind.
+    Returns {column suffix: dtype}, empty for optiongroup and year fields,
+    which are cast to a fixed dtype after interpreting."""
+    if field_type in OPTIONGROUP_TYPES or field_type == "year":
+        return {}
+    # Type of the interpreted value per kind, NaN for the kinds that are left out
+    if field_type == "numberdate":
+        columns = {
+            "_number": {"missing": int, "filled": float},
+            "_date": {"missing": str, "filled": str},
+        }
+    elif field_type in NUMERIC_TYPES:
+        columns = {"": {"missing": int, "filled": float}}
+    elif field_type in ("date", "datetime"):
+        columns = {"": {"missing": str, "filled": str}}
+    else:
+        columns = {"": {"empty": str, "missing": str, "filled": str}}
+    dtypes = {}
+    for suffix, kind_types in columns.items():
+        types = {
+            kind_types.get(kind, str if kind == "not_recognized" else float)
+            for kind in kinds
+        }
+        if str in types:
+            dtypes[suffix] = object
+        else:
+            dtypes[suffix] = "int64" if types == {int} else "float64"
+    return dtypes
+
+
+# Data points share a few distinct dates, so parse each date once
+@functools.lru_cache(maxsize=4096)
+def parse_filled_in(filled_in: str) -> typing.Optional[datetime]:
+    """Returns the datetime a data point was filled in, None if empty."""
+    if filled_in == "":
+        return None
+    return datetime.strptime(filled_in, "%Y-%m-%d %H:%M:%S")
+
+
+def interpret_column(
+    raw_values: pd.Series, field: "CastorField", study: "CastorStudy"
+) -> pd.Series:
+    """Transforms a column of raw values of field into analysable data.
+    Rows without a value (NaN) are left as NaN."""
+    raw = raw_values.dropna().astype(object)
+    field_type = field.field_type
+    if field_type in OPTIONGROUP_TYPES:
+        interpreted = _interpret_optiongroup(raw, field, study)
+    elif field_type in NUMERIC_TYPES:
+        interpreted = _interpret_numeric(raw, float)
+    elif field_type == "year":
+        interpreted = _interpret_numeric(raw, int)
+    elif field_type in TEXT_TYPES:
+        interpreted = raw
+    elif field_type == "datetime":
+        datetime_format = study.configuration["datetime"]
+        interpreted = _interpret_datetime(
+            raw, datetime_format, study.get_missing_dates("S", datetime_format)
+        )
+    elif field_type == "date":
+        date_format = study.configuration["date"]
+        interpreted = _interpret_date(
+            raw, date_format, study.get_missing_dates("D", date_format)
+        )
+    elif field_type == "time":
+        interpreted = _interpret_time(raw, study.configuration["time"])
+    elif field_type == "numberdate":
+        date_format = study.configuration["date"]
+        interpreted = _interpret_numberdate(
+            raw, date_format, study.get_missing_dates("D", date_format)
+        )
+    else:
+        interpreted = pd.Series("Error", index=raw.index, dtype=object)
+    return interpreted.reindex(raw_values.index)
+
+
+def _split_missings(
+    raw: pd.Series,
+) -> typing.Tuple[pd.Series, pd.Series, pd.Series]:
+    """Splits raw values into empty, user missing and filled in values."""
+    empty = raw == ""
+    missing = ~empty & raw.str.contains("Missing", regex=False)
+    return raw[empty], raw[missing], raw[~(empty | missing)]
+
+
+def _map_missings(missing: pd.Series, table: dict, not_recognized: typing.Any):
+    """Maps user missing values through a table of {missing_type: value}."""
+    # Only a handful of distinct missings exist, so map with a single dict lookup
+    link = {
+        raw_value: table.get(user_missing_type(raw_value), not_recognized)
+        for raw_value in missing.unique()
+    }
+    return missing.map(link)
+
+
+def _combine(*parts: pd.Series) -> pd.Series:
+    """Combines interpreted parts of a column, keeping python objects intact."""
+    parts = [part.astype(object) for part in parts if not part.empty]
+    if not parts:
+        return pd.Series(dtype=object)
+    return pd.concat(parts)
+
+
+def _interpret_numeric(raw: pd.Series, cast: type) -> pd.Series:
+    """Interprets numeric and year data while handling user missings."""
+    empty, missing, filled = _split_missings(raw)
+    return _combine(
+        pd.Series(np.nan, index=empty.index, dtype=object),
+        _map_missings(missing, USER_MISSINGS, NOT_RECOGNIZED),
+        filled.astype(cast),
+    )
+
+
+def _interpret_optiongroup(
+    raw: pd.Series, field: "CastorField", study: "CastorStudy"
+) -> pd.Series:
+    """Interprets optiongroup data while handling user missings."""
+    empty, missing, filled = _split_missings(raw)
+    if not filled.empty:
+        filled = _map_options(filled, field, study)
+    return _combine(
+        empty,
+        _map_missings(
+            missing, {missing: missing for missing in USER_MISSINGS}, NOT_RECOGNIZED
+        ),
+        filled,
+    )
+
+
+def _map_options(
+    filled: pd.Series, field: "CastorField", study: "CastorStudy"
+) -> pd.Series:
+    """Maps optiongroup values to their names, multiple answers are separated with |"""
+    lookup = study.get_single_optiongroup_lookup(field.field_option_group)
+    if lookup is None:
+        raise CastorException(
+            "Optiongroup not found. Is id correct and are optiongroups loaded?"
+        )
+    link = lookup.value_to_name
+    # Single answers are mapped at once, the rest (checkboxes) one by one
+    names = filled.map(link).astype(object)
+    todo = names.isna()
+    names[todo] = filled[todo].map(
+        lambda raw_value: _map_option_values(raw_value, link, field, study)
+    )
+    return names
+
+
+def _map_option_values(
+    raw_value: str,
+    link: typing.Mapping[str, str],
+    field: "CastorField",
+    study: "CastorStudy",
+) -> str:
+    """Maps the ; separated values of a single raw value to their names."""
+    value_list = raw_value.split(";")
+    if study.pass_keyerrors:
+        new_values = [link.get(value, value) for value in value_list]
+    else:
+        try:
+            new_values = [link[value] for value in value_list]
+        except KeyError as error:
+            lookup = study.get_single_optiongroup_lookup(field.field_option_group)
+            raise CastorException(
+                f"Optional value mapping failed for optiongroup: "
+                f"{lookup.optiongroup_name} ({lookup.optiongroup_id}) "
+                f"Key `{raw_value}` not present in the keys of the optiongroup"
+                f"of field: {field.field_id} ({field.field_name})"
+            ) from error
+    return "|".join(new_values)
+
+
+def _format_dates(
+    filled: pd.Series, input_formats: typing.List[str], freq: str, output_format: str
+) -> pd.Series:
+    """Parses dates with the first matching input format and formats them.
+    Values that can't be handled vectorised are formatted one by one."""
+    # Dates repeat often, so only format every distinct date once
+    unique = pd.Series(filled.unique(), dtype=object)
+    parsed = pd.Series(pd.NaT, index=unique.index, dtype="datetime64[ns]")
+    if not any(directive in output_format for directive in PERIOD_DIRECTIVES):
+        for input_format in input_formats:
+            todo = parsed.isna()
+            parsed[todo] = pd.to_datetime(
+                unique[todo], format=input_format, errors="coerce"
+            )
+    formatted = parsed.dt.strftime(output_format).astype(object)
+    # Dates outside of the datetime64 range and unparseable values
+    todo = parsed.isna()
+    formatted[todo] = unique[todo].map(
+        lambda raw_value: _format_date(raw_value, input_formats, freq, output_format)
+    )
+    return filled.map(dict(zip(unique, formatted)))
+
+
+def _format_date(
+    raw_value: str, input_formats: typing.List[str], freq: str, output_format: str
+) -> str:
+    """Parses a single date with the first matching input format and formats it."""
+    for input_format in input_formats[:-1]:
+        try:
+            return pd.Period(
+                datetime.strptime(raw_value, input_format), freq=freq
+            ).strftime(output_format)
+        except ValueError:
+            pass
+    return pd.Period(
+        datetime.strptime(raw_value, input_formats[-1]), freq=freq
+    ).strftime(output_format)
+
+
+def format_missing_dates(freq: str, output_format: str) -> typing.Dict[str, str]:
+    """Returns the formatted dates that represent user missings.
+    Use CastorStudy.get_missing_dates for a cached version."""
+    return {
+        missing_type: pd.Period(year=2900 - code, month=1, day=1, freq=freq).strftime(
+            output_format
+        )
+        for missing_type, code in USER_MISSINGS.items()
+    }
+
+
+def _interpret_date(
+    raw: pd.Series, date_format: str, missing_dates: typing.Dict[str, str]
+) -> pd.Series:
+    """Interprets date data while handling user missings."""
+    empty, missing, filled = _split_missings(raw)
+    return _combine(
+        pd.Series(np.nan, index=empty.index, dtype=object),
+        _map_missings(missing, missing_dates, NOT_RECOGNIZED),
+        _format_dates(filled, ["%d-%m-%Y"], "D", date_format),
+    )
+
+
+def _interpret_datetime(
+    raw: pd.Series, datetime_format: str, missing_dates: typing.Dict[str, str]
+) -> pd.Series:
+    """Interprets datetime data while handling user missings."""
+    empty, missing, filled = _split_missings(raw)
+    return _combine(
+        pd.Series(np.nan, index=empty.index, dtype=object),
+        _map_missings(missing, missing_dates, NOT_RECOGNIZED),
+        _format_dates(filled, ["%d-%m-%Y;%H:%M", "%d-%m-%Y"], "S", datetime_format),
+    )
+
+
+def _interpret_time(raw: pd.Series, time_format: str) -> pd.Series:
+    """Interprets time data while handling user missings."""
+    empty, missing, filled = _split_missings(raw)
+    if any(directive in time_format for directive in PERIOD_DIRECTIVES):
+        formatted = filled.map(
+            lambda raw_value: datetime.strptime(raw_value, "%H:%M")
+            .time()
+            .strftime(time_format)
+        )
+    else:
+        formatted = pd.to_datetime(filled, format="%H:%M").dt.strftime(time_format)
+    return _combine(
+        empty,
+        _map_missings(missing, USER_MISSING_STRINGS, NOT_RECOGNIZED),
+        formatted,
+    )
+
+
+def interpret_numberdate(
+    raw_values: pd.Series, study: "CastorStudy"
+) -> typing.Tuple[pd.Series, pd.Series]:
+    """Transforms a column of raw numberdate values into a number and a date column.
+    Rows without a value (NaN) are left as NaN."""
+    raw = raw_values.dropna().astype(object)
+    date_format = study.configuration["date"]
+    numbers, dates = _split_numberdate(
+        raw, date_format, study.get_missing_dates("D", date_format)
+    )
+    return numbers.reindex(raw_values.index), dates.reindex(raw_values.index)
+
+
+def _interpret_numberdate(
+    raw: pd.Series, date_format: str, missing_dates: typing.Dict[str, str]
+) -> pd.Series:
+    """Interprets numberdate data while handling user missings."""
+    numbers, dates = _split_numberdate(raw, date_format, missing_dates)
+    return pd.Series(
+        [[number, date] for number, date in zip(numbers, dates)],
+        index=numbers.index,
+        dtype=object,
+    )
+
+
+def _split_numberdate(
+    raw: pd.Series, date_format: str, missing_dates: typing.Dict[str, str]
+) -> typing.Tuple[pd.Series, pd.Series]:
+    """Splits numberdate data in numbers and dates while handling user missings."""
+    empty, missing, filled = _split_missings(raw)
+    if filled.empty:
+        numbers = dates = filled
+    else:
+        # Get number and date from the string
+        parts = filled.str.split(";", expand=True)
+        numbers = parts[0].replace("", np.nan).astype(float)
+        dates = _format_dates(parts[1], ["%d-%m-%Y"], "D", date_format)
+    empty = pd.Series(np.nan, index=empty.index, dtype=object)
+    return (
+        _combine(empty, _map_missings(missing, USER_MISSINGS, NOT_RECOGNIZED), numbers),
+        _combine(empty, _map_missings(missing, missing_dates, NOT_RECOGNIZED), dates),
+    )
+
+
+def checkbox_dummies(
+    interpreted: pd.Series, option_names: typing.Sequence[str]
+) -> typing.List[pd.Categorical]:
+    """Returns a dummy column per option of an interpreted checkbox column.
+    Dummies are 1 when checked, 0 when not and set to the user missing code
+    for all options when the checkbox is user missing."""
+    positions = {name: position for position, name in enumerate(option_names)}
+    missing_codes = {
+        missing_type: CHECKBOX_DTYPE.categories.get_loc(code)
+        for missing_type, code in USER_MISSINGS.items()
+    }
+    # Create the category codes of the dummies once per distinct value
+    row_codes, values = pd.factorize(interpreted.astype(str))
+    table = np.zeros((len(values), len(option_names)), dtype=np.int8)
+    for row, value in enumerate(values):
+        checked = set(value.split("|"))
+        missing = [code for name, code in missing_codes.items() if name in checked]
+        if missing:
+            # The last user missing in order of precedence is used
+            table[row, :] = missing[-1]
+        else:
+            table[row, [positions[name] for name in checked if name in positions]] = 1
+    codes = table[row_codes]
+    return [
+        pd.Categorical.from_codes(codes[:, column], dtype=CHECKBOX_DTYPE)
+        for column in range(len(option_names))
+    ]
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+"""
+Shared fixtures for testing the CastorStudy class with an offline client.
+
+@author: R.C.A. van Linschoten
+https://orcid.org/0000-0003-3052-596X
+"""
+from typing import Optional
+
+import pytest
+
+from castoredc_api.study.castor_study import CastorStudy
+from castoredc_api.tests.test_castor_objects.fake_client import FakeCastorClient
+
+
+@pytest.fixture(scope="function")
+def fake_client() -> FakeCastorClient:
+    """Creates an offline client with two records with study, survey and report data.
+    Test modules can override this fixture to serve other data."""
+    client = FakeCastorClient()
+    client.add_record("110001", "30", "first")
+    client.add_record("110002", "Missing (not done)", "second")
+    client.add_survey("110001", "SURVEY-INSTANCE-ID1", "7")
+    client.add_survey("110002", "SURVEY-INSTANCE-ID2", None)
+    client.add_report("110002", "REPORT-INSTANCE-ID1", "Headache")
+    client.add_report("110002", "REPORT-INSTANCE-ID2", None)
+    return client
+
+
+@pytest.fixture(scope="function")
+def format_options() -> Optional[dict]:
+    """Format options of the study, test modules can override this fixture."""
+    return None
+
+
+@pytest.fixture(scope="function", params=["objects", "columnar"])
+def fake_study(request, fake_client, format_options) -> CastorStudy:
+    """Creates a CastorStudy with the offline client and mapped data,
+    once for every storage of the data points. The calls to the client are reset."""
+    study = CastorStudy(
+        "",
+        "",
+        "FAKE-ID",
+        "",
+        test=True,
+        format_options=format_options,
+        storage=request.param,
+    )
+    study.client = fake_client
+    study.map_data()
+    study.client.calls.clear()
+    return study
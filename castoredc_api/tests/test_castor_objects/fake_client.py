@@ -0,0 +1,294 @@
+# -*- coding: utf-8 -*-
+"""
+Offline stand-in for the CastorClient, serving a small study from memory.
+
+@author: R.C.A. van Linschoten
+https://orcid.org/0000-0003-3052-596X
+"""
+from collections import Counter
+
+
+class FakeCastorClient:
+    """Serves a study with a phase, a survey and a report from memory.
+    Counts the calls to each endpoint."""
+
+    # pylint: disable=too-many-public-methods
+    # One method per endpoint of the CastorClient
+
+    def __init__(self):
+        self.calls = Counter()
+        self.structure = [
+            {
+                "Form Type": form_type,
+                "Form Collection ID": f"FAKE-{form_type.upper()}-ID",
+                "Form Collection Name": form_name,
+                "Form Collection Order": str(number),
+                "Form ID": f"FAKE-{form_type.upper()}-STEP-ID",
+                "Form Name": form_name,
+                "Form Order": "1",
+                "Field ID": f"FAKE-FIELD-ID{number}",
+                "Field Variable Name": name,
+                "Field Label": name,
+                "Field Type": field_type,
+                "Field Required": "0",
+                "Field Option Group": "",
+                "Field Order": str(number),
+            }
+            for number, form_type, form_name, name, field_type in [
+                (1, "Study", "Baseline", "age", "numeric"),
+                (2, "Study", "Baseline", "comment", "string"),
+                (3, "Survey", "QOL Survey", "qol", "numeric"),
+                (4, "Report", "Adverse Event", "ae_description", "string"),
+            ]
+        ]
+        self.optiongroups = []
+        self.records = []
+        self.data = []
+        self.survey_packages = []
+        self.report_instances = []
+        self.events = []
+        # Time of the server, None to use the current time
+        self.server_time = None
+        self.audit_trail_dates = None
+
+    def add_record(self, record_id, age, comment, institute="Test Institute"):
+        """Adds a record with study data to the database."""
+        self.records.append(
+            {
+                "id": record_id,
+                "_embedded": {
+                    "institute": {"id": f"{institute.upper()}-ID", "name": institute}
+                },
+                "randomization_group_name": None,
+                "randomized_on": None,
+                "archived": False,
+            }
+        )
+        self.__add_row(record_id, "", "", "", field_id="", value="")
+        self.__add_row(
+            record_id, "Study", "", "Baseline", field_id="FAKE-FIELD-ID1", value=age
+        )
+        self.__add_row(
+            record_id, "Study", "", "Baseline", field_id="FAKE-FIELD-ID2", value=comment
+        )
+
+    def add_survey(self, record_id, instance_id, qol):
+        """Adds a survey to a record, empty if qol is None."""
+        self.survey_packages.append(
+            {
+                "id": f"PACKAGE-{instance_id}",
+                "record_id": record_id,
+                "survey_package_name": "QOL Package",
+                "created_on": {"date": "2021-01-15 13:39:47.000000"},
+                "sent_on": None,
+                "finished_on": {"date": "2021-01-16 10:00:00.000000"},
+                "archived": False,
+                "_embedded": {
+                    "survey_instances": [
+                        {
+                            "id": instance_id,
+                            "progress": 100,
+                            "_embedded": {"survey": {"name": "QOL Survey"}},
+                        }
+                    ]
+                },
+            }
+        )
+        self.__add_row(
+            record_id,
+            "Survey",
+            instance_id,
+            "QOL Survey",
+            field_id="" if qol is None else "FAKE-FIELD-ID3",
+            value="" if qol is None else qol,
+        )
+
+    def add_report(self, record_id, instance_id, description):
+        """Adds a report to a record, empty if description is None."""
+        self.report_instances.append(
+            {
+                "id": instance_id,
+                "name": f"AE {instance_id}",
+                "record_id": record_id,
+                "created_on": "2021-01-15 13:39:47",
+                "parent_type": "phase",
+                "parent_id": "FAKE-STUDY-ID",
+                "archived": False,
+                "_embedded": {"report": {"id": "FAKE-REPORT-ID"}},
+            }
+        )
+        if description is None:
+            self.__add_row(
+                record_id,
+                "Report",
+                instance_id,
+                f"AE {instance_id}",
+                field_id="",
+                value="",
+            )
+        else:
+            self.__add_row(
+                record_id,
+                "Report",
+                instance_id,
+                f"AE {instance_id}",
+                field_id="FAKE-FIELD-ID4",
+                value=description,
+            )
+
+    def __add_row(  # pylint: disable=too-many-arguments
+        self, record_id, form_type, instance_id, instance_name, *, field_id, value
+    ):
+        """Adds a row to the export data."""
+        self.data.append(
+            {
+                "Record ID": record_id,
+                "Form Type": form_type,
+                "Form Instance ID": instance_id,
+                "Form Instance Name": instance_name,
+                "Field ID": field_id,
+                "Value": value,
+                "Date": "2021-01-15 13:39:47" if field_id else "",
+            }
+        )
+
+    def update_value(self, record_id, field_id, value):
+        """Updates a value in the database and logs this in the audit trail."""
+        for row in self.data:
+            if row["Record ID"] == record_id and row["Field ID"] == field_id:
+                row["Value"] = value
+        self.events.append(
+            {
+                "event_type": "Study data point updated",
+                "event_details": {"Record ID": record_id, "Field ID": field_id},
+            }
+        )
+
+    # Structure
+    def export_study_structure(self):
+        self.calls["export_study_structure"] += 1
+        return [dict(row) for row in self.structure]
+
+    def all_fields(self):
+        self.calls["all_fields"] += 1
+        optiongroups = {
+            optiongroup["id"]: optiongroup for optiongroup in self.optiongroups
+        }
+        return [
+            {
+                "id": row["Field ID"],
+                "field_min": None,
+                "field_max": None,
+                "option_group": optiongroups.get(row["Field Option Group"]),
+            }
+            for row in self.structure
+        ]
+
+    def all_field_dependencies(self):
+        self.calls["all_field_dependencies"] += 1
+        return []
+
+    def all_field_optiongroups(self):
+        self.calls["all_field_optiongroups"] += 1
+        return self.optiongroups
+
+    def export_option_groups(self):
+        self.calls["export_option_groups"] += 1
+        return [
+            {
+                "Study ID": "FAKE-ID",
+                "Option Group Id": optiongroup["id"],
+                "Option Group Name": optiongroup["name"],
+                "Option Id": option["id"],
+                "Option Name": option["name"],
+                "Option Value": option["value"],
+            }
+            for optiongroup in self.optiongroups
+            for option in optiongroup["options"]
+        ]
+
+    def all_survey_packages(self):
+        self.calls["all_survey_packages"] += 1
+        return [{"id": "FAKE-PACKAGE-ID", "name": "QOL Package"}]
+
+    def all_surveys(self):
+        self.calls["all_surveys"] += 1
+        return [{"id": "FAKE-SURVEY-ID", "name": "QOL Survey"}]
+
+    # Data
+    def all_report_instances(self, archived=0):
+        self.calls["all_report_instances"] += 1
+        return [
+            instance
+            for instance in self.report_instances
+            if instance["archived"] == bool(archived)
+        ]
+
+    def all_survey_package_instances(self):
+        self.calls["all_survey_package_instances"] += 1
+        return self.survey_packages
+
+    def all_records(self, institute_id=None, archived=None):
+        self.calls["all_records"] += 1
+        return self.records
+
+    def export_study_data(self, archived=False):
+        self.calls["export_study_data"] += 1
+        return [dict(row) for row in self.data]
+
+    def audit_trail(self, date_from, date_to, user_id=None, event_types=None):
+        self.calls["audit_trail"] += 1
+        self.audit_trail_dates = (date_from, date_to)
+        return self.events
+
+    def all_data_points_records(self, record_ids, collection):
+        self.calls["all_data_points_records"] += 1
+        endpoint = {
+            "study": self.all_study_data_points_record,
+            "survey-instance": self.all_survey_data_points_record,
+            "report-instance": self.all_report_data_points_record,
+        }[collection]
+        return {record_id: endpoint(record_id) for record_id in record_ids}
+
+    def all_study_data_points_record(self, record_id):
+        self.calls["all_study_data_points_record"] += 1
+        return self.__record_data_points(record_id, "Study")
+
+    def all_survey_data_points_record(self, record_id):
+        self.calls["all_survey_data_points_record"] += 1
+        return [
+            dict(
+                data_point,
+                survey_instance_id=data_point["instance_id"],
+                survey_name=data_point["instance_name"],
+            )
+            for data_point in self.__record_data_points(record_id, "Survey")
+        ]
+
+    def all_report_data_points_record(self, record_id):
+        self.calls["all_report_data_points_record"] += 1
+        return [
+            dict(
+                data_point,
+                report_instance_id=data_point["instance_id"],
+                report_instance_name=data_point["instance_name"],
+            )
+            for data_point in self.__record_data_points(record_id, "Report")
+        ]
+
+    def __record_data_points(self, record_id, form_type):
+        """Returns the data points of a record as returned by the API."""
+        return [
+            {
+                "field_id": row["Field ID"],
+                "field_value": row["Value"],
+                "record_id": record_id,
+                "updated_on": row["Date"],
+                "instance_id": row["Form Instance ID"],
+                "instance_name": row["Form Instance Name"],
+            }
+            for row in self.data
+            if row["Record ID"] == record_id
+            and row["Form Type"] == form_type
+            and row["Field ID"]
+        ]
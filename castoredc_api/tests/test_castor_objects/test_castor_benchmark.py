@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+"""
+Testing class for the offline benchmarks against a mock of Castor EDC.
+
+@author: R.C.A. van Linschoten
+https://orcid.org/0000-0003-3052-596X
+"""
+import pytest
+
+from castoredc_api import CastorException
+from castoredc_api.benchmarks import (
+    BENCHMARKS,
+    MockCastor,
+    format_results,
+    run_benchmarks,
+)
+
+
+class TestCastorBenchmark:
+    """Testing class for the benchmarks of mapping, exporting and importing."""
+
+    def test_benchmarks(self):
+        """Tests that all benchmarks run offline and measure rows and requests."""
+        results = run_benchmarks(records=5, import_rows=5, repeat=1, memory=False)
+        assert [result["benchmark"] for result in results] == list(BENCHMARKS)
+        for result in results:
+            assert result["rows"] > 0
+            assert result["seconds"] > 0
+            assert result["throttled"] == 0
+        requests = {result["benchmark"]: result["requests"] for result in results}
+        assert requests["map_data"] > 0
+        assert requests["export_to_dataframe"] == 0
+        # The structure tables don't download the optiongroups again
+        assert requests["export_to_database"] == 0
+        rows = {result["benchmark"]: result["rows"] for result in results}
+        assert rows["export_to_csv_chunked"] == rows["export_to_csv"]
+        assert requests["import_data"] >= 5
+        assert "map_structure" in format_results(results)
+
+    def test_benchmarks_memory(self):
+        """Tests that the peak memory is measured."""
+        results = run_benchmarks(["map_structure"], records=2, repeat=1)
+        assert results[0]["peak_memory"] > 0
+
+    def test_benchmarks_throttled(self):
+        """Tests that throttled requests are reported instead of raised."""
+        results = run_benchmarks(
+            ["import_data"], import_rows=5, repeat=1, memory=False, rate_limit=2
+        )
+        assert results[0]["throttled"] > 0
+        assert "429" in results[0]["error"]
+
+    def test_benchmarks_keyword_options(self):
+        """Tests that the mock is sized with keyword options only."""
+        with pytest.raises(TypeError):
+            MockCastor(2)  # pylint: disable=too-many-function-args
+        mock = MockCastor(records=2, fields=3)
+        assert len(mock.records) == 2
+
+    def test_benchmarks_unknown(self):
+        """Tests that unknown benchmarks raise an error."""
+        with pytest.raises(CastorException) as error:
+            run_benchmarks(["map_everything"])
+        assert str(error.value).startswith("map_everything is not a benchmark.")
@@ -5,10 +5,16 @@ Testing class for the CastorDataPoint class.
 @author: R.C.A. van Linschoten
 https://orcid.org/0000-0003-3052-596X
 """
+import tracemalloc
+from datetime import datetime
+
 import numpy as np
 import pytest
 
-from castoredc_api.study.castor_objects.castor_data_point import CastorDataPoint
+from castoredc_api.study.castor_objects.castor_data_point import (
+    _UNSET,
+    CastorDataPoint,
+)
 from castoredc_api import CastorException
 
 
@@ -36,6 +42,90 @@ class TestCastorDataPoint:
             == "The field that this is an instance of does not exist in the study!"
         )
 
+    def test_data_point_slots(self, complete_study):
+        """Tests that data points don't carry a per-instance __dict__."""
+        data_point = CastorDataPoint(
+            "FAKE-STUDY-FIELD-ID4", "test", complete_study, "2021-01-15 13:39:47"
+        )
+        assert not hasattr(data_point, "__dict__")
+        with pytest.raises(AttributeError):
+            data_point.unknown_attribute = "test"
+
+    def test_data_point_memory(self, complete_study):
+        """Tests the memory footprint of many data points of the same field."""
+        tracemalloc.start()
+        try:
+            data_points = [
+                CastorDataPoint(
+                    "".join(["FAKE-STUDY-FIELD-ID", "4"]),
+                    "test",
+                    complete_study,
+                    "2021-01-15 13:39:47",
+                )
+                for _ in range(10000)
+            ]
+            size, _ = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        # Field ids are shared, so only the slotted objects themselves take memory
+        assert data_points[0].field_id is data_points[-1].field_id
+        assert size / len(data_points) < 150
+
+    def test_data_point_lazy_filled_in(self, complete_study):
+        """Tests that the filled in date is parsed on first access."""
+        data_point = CastorDataPoint(
+            "FAKE-STUDY-FIELD-ID4", "test", complete_study, "2021-01-15 13:39:47"
+        )
+        assert data_point._filled_in == "2021-01-15 13:39:47"
+        assert data_point.filled_in == datetime(2021, 1, 15, 13, 39, 47)
+        assert data_point._filled_in == datetime(2021, 1, 15, 13, 39, 47)
+
+    def test_data_point_lazy_filled_in_empty(self, complete_study):
+        """Tests that an empty filled in date is interpreted as None."""
+        data_point = CastorDataPoint("FAKE-STUDY-FIELD-ID4", "test", complete_study, "")
+        assert data_point.filled_in is None
+
+    def test_data_point_lazy_value(self, missing_data_study):
+        """Tests that the value is interpreted on first access and then cached."""
+        data_point = CastorDataPoint(
+            "MISSING-numeric-ID", "12.5", missing_data_study, "2021-01-15 13:39:47"
+        )
+        assert data_point._value is _UNSET
+        assert data_point.value == 12.5
+        assert data_point._value == 12.5
+        data_point.raw_value = "15"
+        assert data_point.value == 12.5
+
+    def test_data_point_lazy_value_none(self, missing_data_study):
+        """Tests that a value of None is kept instead of interpreted again."""
+        data_point = CastorDataPoint(
+            "MISSING-string-ID", None, missing_data_study, "2021-01-15 13:39:47"
+        )
+        assert data_point.value is None
+        data_point.raw_value = "test"
+        assert data_point.value is None
+
+    def test_data_point_value_read_only(self, missing_data_study):
+        """Tests that the interpreted value can't be overridden."""
+        data_point = CastorDataPoint(
+            "MISSING-numeric-ID", "12.5", missing_data_study, "2021-01-15 13:39:47"
+        )
+        with pytest.raises(AttributeError):
+            data_point.value = 13
+        assert data_point.value == 12.5
+
+    def test_data_point_lazy_value_error(self, missing_data_study):
+        """Tests that interpretation errors surface on access instead of on creation."""
+        data_point = CastorDataPoint(
+            "MISSING-checkbox-ID", "1", missing_data_study, "2021-01-15 13:39:47"
+        )
+        with pytest.raises(CastorException) as e:
+            data_point.value
+        assert (
+            str(e.value)
+            == "Optiongroup not found. Is id correct and are optiongroups loaded?"
+        )
+
     def test_data_point_missing_data_checkbox(self, missing_data_study):
         """Tests if missing data is handled correctly"""
         field_types = ["checkbox"]
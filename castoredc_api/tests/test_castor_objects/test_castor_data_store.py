@@ -0,0 +1,244 @@
+# -*- coding: utf-8 -*-
+"""
+Testing class for the CastorDataStore class.
+
+@author: R.C.A. van Linschoten
+https://orcid.org/0000-0003-3052-596X
+"""
+from datetime import datetime
+
+import pytest
+
+from castoredc_api import CastorException
+from castoredc_api.study.castor_objects.castor_data_point import _UNSET
+from castoredc_api.study.castor_objects.castor_data_store import (
+    CastorDataStore,
+    CastorDataPointView,
+)
+from castoredc_api.study.castor_objects.castor_record import CastorRecord
+from castoredc_api.study.castor_objects.castor_survey_form_instance import (
+    CastorSurveyFormInstance,
+)
+from castoredc_api.study.castor_study import CastorStudy
+
+
+@pytest.fixture(scope="function")
+def store(missing_data_study) -> CastorDataStore:
+    """Creates a CastorDataStore with data points for two records."""
+    store = CastorDataStore(missing_data_study)
+    for record_id, raw_value, filled_in in [
+        ("110001", "12.5", "2021-01-15 13:39:47"),
+        ("110002", "Missing (not done)", ""),
+    ]:
+        record = CastorRecord(record_id)
+        form_instance = CastorSurveyFormInstance(
+            "FAKE-SURVEY-INSTANCE-ID1", "Fake Survey", missing_data_study
+        )
+        record.add_form_instance(form_instance)
+        store.add_data_point("MISSING-numeric-ID", raw_value, filled_in, form_instance)
+        store.add_data_point("MISSING-string-ID", record_id, "", form_instance)
+    return store
+
+
+class TestCastorDataStore:
+    """Testing class for CastorDataStore object unit tests."""
+
+    def test_data_store_create(self, store):
+        """Tests adding data points to the store."""
+        assert len(store) == 4
+        assert store.record_column.tolist() == [0, 0, 1, 1]
+        assert store.instance_column.tolist() == [0, 0, 1, 1]
+        assert store.field_column.tolist() == [0, 1, 0, 1]
+        assert [field.field_id for field in store.fields] == [
+            "MISSING-numeric-ID",
+            "MISSING-string-ID",
+        ]
+
+    def test_data_store_field_not_found(self, store):
+        """Tests that data points need a field in the study."""
+        with pytest.raises(CastorException) as e:
+            store.add_data_point(
+                "FAKE-STUDY-FIELD-ID8", "test", "", store.form_instances[0]
+            )
+        assert (
+            str(e.value)
+            == "The field that this is an instance of does not exist in the study!"
+        )
+
+    def test_data_store_get_single_data_point(self, store):
+        """Tests getting a single data point on id and name."""
+        data_point = store.get_single_data_point(
+            "110002", "FAKE-SURVEY-INSTANCE-ID1", "MISSING-string-ID"
+        )
+        assert type(data_point) is CastorDataPointView
+        assert data_point.raw_value == "110002"
+        assert data_point.record.record_id == "110002"
+        assert data_point.form_instance == store.form_instances[1]
+        assert data_point == store.get_single_data_point(
+            "110002", "FAKE-SURVEY-INSTANCE-ID1", "Missing string"
+        )
+
+    def test_data_store_get_single_data_point_fail(self, store):
+        """Tests getting a non-existent data point."""
+        assert (
+            store.get_single_data_point(
+                "110003", "FAKE-SURVEY-INSTANCE-ID1", "MISSING-string-ID"
+            )
+            is None
+        )
+        assert (
+            store.get_single_data_point(
+                "110001", "FAKE-SURVEY-INSTANCE-ID1", "MISSING-date-ID"
+            )
+            is None
+        )
+
+    def test_data_store_get_all_data_points(self, store):
+        """Tests getting all data points grouped per record."""
+        data_points = store.get_all_data_points()
+        assert len(data_points) == 4
+        assert [data_point.raw_value for data_point in data_points] == [
+            "12.5",
+            "110001",
+            "Missing (not done)",
+            "110002",
+        ]
+
+    def test_data_store_values(self, store):
+        """Tests that values are interpreted as for CastorDataPoint."""
+        data_points = store.get_all_data_points()
+        assert [data_point.value for data_point in data_points] == [
+            12.5,
+            "110001",
+            -99,
+            "110002",
+        ]
+        with pytest.raises(AttributeError):
+            data_points[0].value = 13
+        assert data_points[0].value == 12.5
+
+    def test_data_store_remove_records(self, store):
+        """Tests that removing records keeps the other values interpreted."""
+        data_points = store.get_all_data_points()
+        assert data_points[2].value == -99
+        store.remove_records(["110001", "UNKNOWN"])
+        assert len(store) == 2
+        assert store.record_column.tolist() == [1, 1]
+        assert store.interpreted_fields == {0}
+        assert store.values.tolist() == [-99, _UNSET]
+        assert [data_point.value for data_point in store.get_all_data_points()] == [
+            -99,
+            "110002",
+        ]
+        assert (
+            store.get_single_data_point(
+                "110001", "FAKE-SURVEY-INSTANCE-ID1", "MISSING-numeric-ID"
+            )
+            is None
+        )
+
+    def test_data_store_add_after_interpreting(self, store):
+        """Tests that only added data points are interpreted on the next lookup."""
+        assert store.get_all_data_points()[0].value == 12.5
+        store.remove_records(["110002"])
+        record = CastorRecord("110002")
+        form_instance = CastorSurveyFormInstance(
+            "FAKE-SURVEY-INSTANCE-ID1", "Fake Survey", store.study
+        )
+        record.add_form_instance(form_instance)
+        store.add_data_point("MISSING-numeric-ID", "14", "", form_instance)
+        assert 0 not in store.interpreted_fields
+        assert store.values.tolist() == [12.5, _UNSET]
+        assert [data_point.value for data_point in store.get_all_data_points()] == [
+            12.5,
+            "110001",
+            14.0,
+        ]
+
+    def test_data_store_filled_in(self, store):
+        """Tests parsing the filled in datetime."""
+        data_points = store.get_all_data_points()
+        assert data_points[0].filled_in == datetime(2021, 1, 15, 13, 39, 47)
+        assert data_points[2].filled_in is None
+
+    def test_data_store_get_raw_values(self, store):
+        """Tests getting the raw values of a form instance."""
+        assert store.get_raw_values([store.form_instances[0]]) == {
+            "Missing numeric": "12.5",
+            "Missing string": "110001",
+        }
+
+    def test_data_store_duplicated(self, store):
+        """Tests that duplicated data points are found."""
+        store.add_data_point("MISSING-string-ID", "test", "", store.form_instances[0])
+        with pytest.raises(CastorException) as e:
+            store.get_all_data_points()
+        assert str(e.value) == "Duplicated data point found!"
+
+    def test_study_storage_fail(self):
+        """Tests that only known storages can be used."""
+        with pytest.raises(CastorException) as e:
+            CastorStudy("", "", "FAKE-ID", "", test=True, storage="rows")
+        assert str(e.value) == "rows is not a valid storage. Use objects/columnar."
+
+    def test_data_store_remove_records_stale_view(self, store):
+        """Tests that views created before removing records can't be used."""
+        data_point = store.get_single_data_point(
+            "110002", "FAKE-SURVEY-INSTANCE-ID1", "MISSING-string-ID"
+        )
+        store.remove_records(["110001"])
+        with pytest.raises(CastorException) as e:
+            data_point.value  # pylint: disable=pointless-statement
+        assert str(e.value).startswith("Data point view is outdated")
+        assert (
+            store.get_single_data_point(
+                "110002", "FAKE-SURVEY-INSTANCE-ID1", "MISSING-string-ID"
+            ).value
+            == "110002"
+        )
+
+
+class TestCastorDataStoreLookups:
+    """Testing class for the lookups of records and form instances in both storages."""
+
+    def test_record_get_all_data_points(self, fake_study):
+        """Tests getting all data points of a record."""
+        record = fake_study.get_single_record("110002")
+        assert sorted(
+            (data_point.form_instance.instance_id, data_point.field_id)
+            for data_point in record.get_all_data_points()
+        ) == [
+            ("FAKE-STUDY-ID", "FAKE-FIELD-ID1"),
+            ("FAKE-STUDY-ID", "FAKE-FIELD-ID2"),
+            ("REPORT-INSTANCE-ID1", "FAKE-FIELD-ID4"),
+        ]
+
+    def test_record_get_single_data_point(self, fake_study):
+        """Tests getting a single data point of a record on name."""
+        record = fake_study.get_single_record("110001")
+        assert record.get_single_data_point("comment", "FAKE-STUDY-ID").value == "first"
+
+    def test_form_instance_get_all_data_points(self, fake_study):
+        """Tests getting all data points of a form instance."""
+        survey = fake_study.get_single_form_instance_on_id(
+            "110001", "SURVEY-INSTANCE-ID1"
+        )
+        data_points = survey.get_all_data_points()
+        assert [data_point.field_id for data_point in data_points] == ["FAKE-FIELD-ID3"]
+        assert data_points[0].form_instance.record.record_id == "110001"
+        empty = fake_study.get_single_form_instance_on_id(
+            "110002", "SURVEY-INSTANCE-ID2"
+        )
+        assert empty.get_all_data_points() == []
+
+    def test_form_instance_get_single_data_point(self, fake_study):
+        """Tests getting a single data point of a form instance on id and name."""
+        report = fake_study.get_single_form_instance_on_id(
+            "110002", "REPORT-INSTANCE-ID1"
+        )
+        data_point = report.get_single_data_point("FAKE-FIELD-ID4")
+        assert data_point.raw_value == "Headache"
+        assert data_point == report.get_single_data_point(
+            data_point.instance_of.field_name
+        )
+        assert report.get_single_data_point("age") is None
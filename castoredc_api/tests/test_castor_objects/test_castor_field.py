@@ -24,3 +24,4 @@ class TestCastorField:
         )
         assert type(field) is CastorField
         assert field.field_id == "FAKE-SURVEY-FIELD-ID2"
+        assert not hasattr(field, "__dict__")
@@ -32,6 +32,7 @@ class TestCastorFormInstance:
         assert form_instance.instance_type == "Survey"
         assert form_instance.name_of_form == "Fake Survey"
         assert form_instance.instance_of.form_id == "FAKE-SURVEY-ID1"
+        assert not hasattr(form_instance, "__dict__")
 
     def test_report_form_instance_create(self, complete_study):
         """Tests creation of a Report form instance."""
@@ -43,6 +44,8 @@ class TestCastorFormInstance:
         assert form_instance.instance_type == "Report"
         assert form_instance.name_of_form == "Report Name #90212"
         assert form_instance.instance_of.form_id == "FAKE-REPORT-ID2"
+        assert form_instance.parent is None
+        assert not hasattr(form_instance, "__dict__")
 
     def test_study_form_instance_create(self, complete_study):
         """Tests creation of a Study form instance."""
@@ -56,6 +59,7 @@ class TestCastorFormInstance:
         assert (
             form_instance.instance_of.form_id == "FAKE-STUDYIDFAKE-STUDYIDFAKE-STUDYID"
         )
+        assert not hasattr(form_instance, "__dict__")
 
     def test_survey_form_instance_create_fail(self, complete_study):
         """Tests creation of a Survey form instance."""
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+"""
+Testing class for the CastorOptionGroup class.
+
+@author: R.C.A. van Linschoten
+https://orcid.org/0000-0003-3052-596X
+"""
+import pytest
+
+from castoredc_api.study.castor_objects.castor_option_group import CastorOptionGroup
+from castoredc_api.study.castor_study import CastorStudy
+
+OPTIONGROUP = {
+    "id": "FAKE-OPTIONGROUP-ID",
+    "name": "Yes/No",
+    "options": [
+        {"id": "FAKE-OPTION-ID1", "name": "Yes", "value": "1", "groupOrder": 0},
+        {"id": "FAKE-OPTION-ID2", "name": "No", "value": "0", "groupOrder": 1},
+    ],
+}
+
+
+class TestCastorOptionGroup:
+    """Testing class for CastorOptionGroup object unit tests."""
+
+    def test_optiongroup_create(self):
+        """Tests creation of an optiongroup."""
+        optiongroup = CastorOptionGroup(OPTIONGROUP)
+        assert type(optiongroup) is CastorOptionGroup
+        assert optiongroup.optiongroup_id == "FAKE-OPTIONGROUP-ID"
+        assert optiongroup.optiongroup_name == "Yes/No"
+        assert optiongroup.option_names == ("Yes", "No")
+        assert optiongroup.option_values == frozenset({"1", "0"})
+
+    def test_optiongroup_lookups(self):
+        """Tests the lookup tables of an optiongroup."""
+        optiongroup = CastorOptionGroup(OPTIONGROUP)
+        assert optiongroup.value_to_name == {"1": "Yes", "0": "No"}
+        assert optiongroup.name_to_value == {"Yes": "1", "No": "0"}
+        assert set(optiongroup.categories) == {
+            "Yes",
+            "No",
+            "measurement failed",
+            "not applicable",
+            "not asked",
+            "asked but unknown",
+            "not done",
+        }
+
+    def test_optiongroup_lookups_read_only(self):
+        """Tests that the lookup tables can't be changed."""
+        optiongroup = CastorOptionGroup(OPTIONGROUP)
+        with pytest.raises(TypeError):
+            optiongroup.value_to_name["2"] = "Maybe"
+        with pytest.raises(TypeError):
+            optiongroup.name_to_value["Maybe"] = "2"
+
+    def test_study_optiongroup_lookup(self):
+        """Tests that the study creates lookup tables for added optiongroups."""
+        study = CastorStudy("", "", "FAKE-ID", "", test=True)
+        assert study.get_single_optiongroup_lookup("FAKE-OPTIONGROUP-ID") is None
+        study.optiongroups = {"FAKE-OPTIONGROUP-ID": OPTIONGROUP}
+        lookup = study.get_single_optiongroup_lookup("FAKE-OPTIONGROUP-ID")
+        assert lookup == CastorOptionGroup(OPTIONGROUP)
+        assert study.get_single_optiongroup_lookup("FAKE-OPTIONGROUP-ID") is lookup
@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+"""
+Testing class for reporting the progress of the CastorStudy class.
+
+@author: R.C.A. van Linschoten
+https://orcid.org/0000-0003-3052-596X
+"""
+import logging
+
+import pandas as pd
+import pytest
+
+from castoredc_api import (
+    CallbackProgress,
+    CastorProgress,
+    LoggingProgress,
+    TqdmProgress,
+)
+from castoredc_api.benchmarks import MockCastor, mock_study
+from castoredc_api.importer.import_data import import_data
+from castoredc_api.study.castor_study import CastorStudy
+from castoredc_api.tests.test_castor_objects.fake_client import FakeCastorClient
+
+
+def fake_study(progress=None) -> CastorStudy:
+    """Creates a CastorStudy with an offline client."""
+    study = CastorStudy("", "", "FAKE-ID", "", test=True, progress=progress)
+    study.client = FakeCastorClient()
+    study.client.add_record("110001", "30", "first")
+    study.client.add_record("110002", "40", "second")
+    return study
+
+
+class TestCastorProgress:
+    """Testing class for the progress reporters of a study."""
+
+    def test_progress_default(self, capsys):
+        """Tests that the default progress reports nothing and adds no overhead."""
+        study = fake_study()
+        study.map_data()
+        assert capsys.readouterr().err == ""
+        data = [1, 2, 3]
+        assert CastorProgress().track(data, "Mapping Data") is data
+
+    def test_progress_tqdm(self, capsys):
+        """Tests that tqdm reports steps and progress bars on stderr."""
+        study = fake_study(TqdmProgress())
+        study.map_data()
+        output = capsys.readouterr().err
+        assert "Downloading Study Data." in output
+        assert "Mapping Data: 100%" in output
+
+    def test_progress_logging(self, caplog):
+        """Tests that steps and the start and end of loops are logged."""
+        study = fake_study(LoggingProgress())
+        with caplog.at_level(logging.INFO, logger="castoredc_api"):
+            study.map_data()
+        messages = [record.getMessage() for record in caplog.records]
+        assert "Downloading Study Data." in messages
+        assert "Mapping Data: started 6 items" in messages
+        assert any(
+            message.startswith("Mapping Data: finished 6 items in ")
+            for message in messages
+        )
+
+    @pytest.mark.parametrize(
+        "every, completed", [(1, [0, 1, 2, 3, 4, 5, 6]), (4, [0, 4, 6]), (6, [0, 6])]
+    )
+    def test_progress_callback(self, every, completed):
+        """Tests that the callback is called every so many items and at the end."""
+        events = []
+        study = fake_study(CallbackProgress(events.append, every=every))
+        study.map_data()
+        assert {
+            "description": "Downloading Study Data.",
+            "completed": None,
+            "total": None,
+        } in events
+        assert [
+            event["completed"]
+            for event in events
+            if event["description"] == "Mapping Data"
+        ] == completed
+        assert all(
+            event["total"] == 6
+            for event in events
+            if event["description"] == "Mapping Data"
+        )
+
+    def test_progress_import_summary(self, capsys, tmp_path, monkeypatch):
+        """Tests that the import summary is printed with the default progress."""
+        monkeypatch.chdir(tmp_path)
+        mock = MockCastor(records=2)
+        data, links = mock.upload_rows(3)
+        pd.DataFrame(data).to_excel("data.xlsx", index=False)
+        pd.DataFrame(links).to_excel("links.xlsx", index=False)
+        import_data(
+            data_source_path="data.xlsx",
+            column_link_path="links.xlsx",
+            study=mock_study(mock),
+            label_data=False,
+            target="Study",
+        )
+        captured = capsys.readouterr()
+        assert "Success: 3" in captured.out
+        assert captured.err == ""
@@ -26,6 +26,7 @@ class TestCastorRecord:
         assert type(record) is CastorRecord
         assert record.record_id == "110001"
         assert len(record.form_instances_ids) == 0
+        assert not hasattr(record, "__dict__")
 
     def test_record_add_form_instance(self, complete_study):
         """Tests adding a form instance to a record."""
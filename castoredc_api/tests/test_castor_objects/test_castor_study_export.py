@@ -0,0 +1,471 @@
+# -*- coding: utf-8 -*-
+"""
+Testing class for the export options of the CastorStudy class.
+
+@author: R.C.A. van Linschoten
+https://orcid.org/0000-0003-3052-596X
+"""
+import json
+import logging
+import pathlib
+import sqlite3
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from castoredc_api import CastorException, CastorMetrics
+from castoredc_api.study.castor_study import CastorStudy
+from castoredc_api.tests.test_castor_objects.fake_client import FakeCastorClient
+
+
+def assert_exports_equal(original: dict, exported: dict) -> None:
+    """Asserts that two exports of dataframes are equal."""
+    pd.testing.assert_frame_equal(original["Study"], exported["Study"])
+    for form_type in ["Surveys", "Reports"]:
+        assert list(original[form_type]) == list(exported[form_type])
+        for name, dataframe in original[form_type].items():
+            pd.testing.assert_frame_equal(dataframe, exported[form_type][name])
+
+
+class TestCastorStudyExport:
+    """Testing class for the export options of a study."""
+
+    def test_export_processes(self, fake_study):
+        """Tests that creating the dataframes in worker processes gives the same export."""
+        original = fake_study.export_to_dataframe(remap=False)
+        exported = fake_study.export_to_dataframe(remap=False, processes=2)
+        assert_exports_equal(original, exported)
+        assert exported["Study"]["age"].tolist() == [30, -99]
+
+    def test_export_keyword_options(self, fake_study):
+        """Tests that the options after archived can only be passed by keyword."""
+        with pytest.raises(TypeError):
+            fake_study.export_to_dataframe(False, False, False)
+        exported = fake_study.export_to_dataframe(False, remap=False)
+        assert exported["Study"]["age"].tolist() == [30, -99]
+
+    def test_export_value_read_only(self, fake_study):
+        """Tests that values can't be changed, as the export wouldn't include them."""
+        data_point = fake_study.get_single_data_point("110001", "FAKE-STUDY-ID", "age")
+        with pytest.raises(AttributeError):
+            data_point.value = 31
+        exported = fake_study.export_to_dataframe(remap=False)
+        assert exported["Study"]["age"].tolist() == [data_point.value, -99]
+
+    @pytest.mark.parametrize(
+        "values, numbers, dates",
+        [
+            (
+                ["5;12-05-2020", "", "Missing (not done)"],
+                [5.0, None, -99],
+                ["12-05-2020", None, "01-01-2999"],
+            ),
+            ([], [], []),
+        ],
+    )
+    def test_export_numberdate(self, values, numbers, dates):
+        """Tests that numberdate fields are exported as a number and a date column."""
+        study = CastorStudy("", "", "FAKE-ID", "", test=True)
+        study.client = FakeCastorClient()
+        study.client.structure[0]["Field Type"] = "numberdate"
+        for number, value in enumerate(values):
+            study.client.add_record(f"1100{number:02}", value, "comment")
+        dataframe = study.export_to_dataframe()["Study"]
+        assert list(dataframe.columns[-3:]) == ["age_date", "age_number", "comment"]
+        assert dataframe["age_number"].replace({np.nan: None}).tolist() == numbers
+        assert dataframe["age_date"].replace({np.nan: None}).tolist() == dates
+
+    @pytest.mark.parametrize("compression", ["snappy", "zstd"])
+    def test_export_parquet(self, fake_study, tmp_path, monkeypatch, compression):
+        """Tests that the parquet files hold the exported dataframes."""
+        monkeypatch.chdir(tmp_path)
+        original = fake_study.export_to_dataframe(remap=False)
+        paths = fake_study.export_to_parquet(remap=False, compression=compression)
+        assert paths["Study"].endswith("FAKE-ID Study.parquet")
+        exported = {
+            "Study": pd.read_parquet(paths["Study"]),
+            "Surveys": {
+                name: pd.read_parquet(path) for name, path in paths["Surveys"].items()
+            },
+            "Reports": {
+                name: pd.read_parquet(path) for name, path in paths["Reports"].items()
+            },
+        }
+        assert_exports_equal(original, exported)
+
+    def test_export_parquet_partitioned(self, fake_study, tmp_path, monkeypatch):
+        """Tests partitioning the parquet files on institute."""
+        monkeypatch.chdir(tmp_path)
+        paths = fake_study.export_to_parquet(remap=False, partition_cols=["institute"])
+        partitions = list(pathlib.Path(paths["Study"]).iterdir())
+        assert len(partitions) == 1
+        assert partitions[0].name.startswith("institute=Test")
+        exported = pd.read_parquet(
+            paths["Reports"]["Adverse Event"],
+            filters=[("institute", "=", "Test Institute")],
+        )
+        assert exported["custom_name"].tolist() == [
+            "AE REPORT-INSTANCE-ID1",
+            "AE REPORT-INSTANCE-ID2",
+        ]
+
+    def test_export_parquet_missing_partition(self, fake_study, tmp_path, monkeypatch):
+        """Tests partitioning on a column that doesn't exist."""
+        monkeypatch.chdir(tmp_path)
+        with pytest.raises(CastorException) as e:
+            fake_study.export_to_parquet(remap=False, partition_cols=["country"])
+        assert str(e.value) == "Can't partition Study on missing country."
+
+    @pytest.mark.parametrize(
+        "compression, batch_size", [("uncompressed", None), ("lz4", None), ("zstd", 1)]
+    )
+    def test_export_feather(
+        self, fake_study, tmp_path, monkeypatch, compression, batch_size
+    ):
+        """Tests that the feather files hold the exported dataframes."""
+        monkeypatch.chdir(tmp_path)
+        original = fake_study.export_to_dataframe(remap=False)
+        paths = fake_study.export_to_feather(
+            remap=False, compression=compression, batch_size=batch_size
+        )
+        exported = {
+            "Study": pd.read_feather(paths["Study"]),
+            "Surveys": {
+                name: pd.read_feather(path) for name, path in paths["Surveys"].items()
+            },
+            "Reports": {
+                name: pd.read_feather(path) for name, path in paths["Reports"].items()
+            },
+        }
+        assert_exports_equal(original, exported)
+
+    def test_export_feather_empty(self, tmp_path, monkeypatch):
+        """Tests that empty dataframes are written with their dtypes."""
+        monkeypatch.chdir(tmp_path)
+        study = CastorStudy("", "", "FAKE-ID", "", test=True)
+        study.client = FakeCastorClient()
+        study.client.structure[2]["Field Type"] = "year"
+        study.client.add_record("110001", "30", "first")
+        paths = study.export_to_feather(compression="lz4")
+        exported = pd.read_feather(paths["Surveys"]["QOL Survey"])
+        assert exported.empty
+        assert exported["qol"].dtype == "Int64"
+
+    def test_export_csv_manifest(self, fake_study, tmp_path, monkeypatch):
+        """Tests that files written in threads are listed in the manifest."""
+        monkeypatch.chdir(tmp_path)
+        paths = fake_study.export_to_csv(remap=False, threads=2, manifest=True)
+        manifests = list((tmp_path / "output").glob("* FAKE-ID manifest.json"))
+        assert len(manifests) == 1
+        manifest = json.loads(manifests[0].read_text(encoding="utf-8"))
+        assert [(file["form_type"], file["name"]) for file in manifest] == [
+            ("Study", "Study"),
+            ("Survey", "QOL Survey"),
+            ("Report", "Adverse Event"),
+        ]
+        assert manifest[0]["path"] == paths["Study"]
+        assert manifest[2]["path"] == paths["Reports"]["Adverse Event"]
+        assert [(file["rows"], file["columns"]) for file in manifest] == [
+            (2, 7),
+            (2, 12),
+            (2, 7),
+        ]
+        exported = pd.read_csv(paths["Surveys"]["QOL Survey"], sep=";")
+        assert exported["survey_instance_id"].tolist() == [
+            "SURVEY-INSTANCE-ID1",
+            "SURVEY-INSTANCE-ID2",
+        ]
+
+    @pytest.mark.parametrize(
+        "export, extension",
+        [("export_to_csv", ".csv"), ("export_to_feather", ".feather")],
+    )
+    def test_export_without_manifest(
+        self, fake_study, tmp_path, monkeypatch, export, extension
+    ):
+        """Tests that exports without manifest or delta only write the data files."""
+        monkeypatch.chdir(tmp_path)
+        getattr(fake_study, export)(remap=False)
+        assert (
+            sorted(path.suffix for path in (tmp_path / "output").iterdir())
+            == [extension] * 3
+        )
+
+    @pytest.mark.parametrize("chunk_size", [1, 2, 100])
+    def test_export_csv_chunks(self, fake_study, tmp_path, monkeypatch, chunk_size):
+        """Tests that streaming the csv files in chunks writes the same files."""
+        monkeypatch.chdir(tmp_path)
+        original = fake_study.export_to_csv(remap=False)
+        (tmp_path / "streamed").mkdir()
+        monkeypatch.chdir(tmp_path / "streamed")
+        streamed = fake_study.export_to_csv(remap=False, chunk_size=chunk_size)
+        for form_type in ["Surveys", "Reports"]:
+            assert list(original[form_type]) == list(streamed[form_type])
+        for path, streamed_path in [(original["Study"], streamed["Study"])] + [
+            (original[form_type][name], streamed[form_type][name])
+            for form_type in ["Surveys", "Reports"]
+            for name in original[form_type]
+        ]:
+            with open(path, encoding="utf-8") as file, open(
+                streamed_path, encoding="utf-8"
+            ) as streamed_file:
+                assert file.read() == streamed_file.read()
+
+    @pytest.mark.parametrize("chunk_size", [1, 100])
+    def test_export_csv_chunks_interpreted_once(
+        self, fake_study, tmp_path, monkeypatch, chunk_size
+    ):
+        """Tests that streaming interprets every row once, like the normal export."""
+        monkeypatch.chdir(tmp_path)
+        fake_study.export_to_csv(remap=False)
+        interpreted = fake_study.metrics.report()["phases"]["interpret"]["rows"]
+        fake_study.metrics.reset()
+        fake_study.export_to_csv(remap=False, chunk_size=chunk_size)
+        assert fake_study.metrics.report()["phases"]["interpret"]["rows"] == interpreted
+
+    def test_export_sqlite(self, fake_study, tmp_path):
+        """Tests that the tables of the SQLite database hold the exported data."""
+        original = fake_study.export_to_dataframe(remap=False)
+        path = tmp_path / "study.db"
+        fake_study.export_to_database(path, remap=False, batch_size=1)
+        # Exporting again replaces the tables
+        assert fake_study.export_to_database(path, remap=False) == str(path)
+        with sqlite3.connect(path) as connection:
+            tables = [
+                row[0]
+                for row in connection.execute(
+                    "SELECT name FROM sqlite_master WHERE type = 'table'"
+                )
+            ]
+            study = pd.read_sql('SELECT * FROM "Study"', connection)
+            reports = pd.read_sql('SELECT * FROM "Adverse Event"', connection)
+            fields = pd.read_sql('SELECT * FROM "Fields"', connection)
+            indexes = [
+                row[0]
+                for row in connection.execute(
+                    "SELECT name FROM sqlite_master WHERE type = 'index'"
+                )
+            ]
+        connection.close()
+        assert tables == [
+            "Study",
+            "QOL Survey",
+            "Adverse Event",
+            "Fields",
+            "Optiongroups",
+        ]
+        assert list(study.columns) == list(original["Study"].columns)
+        assert study["age"].tolist() == [30, -99]
+        assert study["archived"].tolist() == [0, 0]
+        assert reports["ae_description"].tolist() == ["Headache", None]
+        assert fields["field_name"].tolist() == [
+            "age",
+            "comment",
+            "qol",
+            "ae_description",
+        ]
+        assert "Study record_id" in indexes
+        assert "Fields record_id" not in indexes
+
+    def test_export_sqlite_optiongroups(self, fake_study, tmp_path):
+        """Tests that the Optiongroups table is built from the exported optiongroups,
+        without downloading the paginated optiongroups."""
+        fake_study.client.optiongroups.append(
+            {
+                "id": "FAKE-OPTIONGROUP-ID",
+                "name": "Yes/No",
+                "options": [
+                    {"id": "OPTION-ID1", "name": "Yes", "value": "1"},
+                    {"id": "OPTION-ID2", "name": "No", "value": "0"},
+                ],
+            }
+        )
+        path = fake_study.export_to_database(tmp_path / "study.db")
+        with sqlite3.connect(path) as connection:
+            optiongroups = pd.read_sql('SELECT * FROM "Optiongroups"', connection)
+        connection.close()
+        assert optiongroups.to_dict("records") == [
+            {
+                "optiongroup_id": "FAKE-OPTIONGROUP-ID",
+                "optiongroup_name": "Yes/No",
+                "option_name": "Yes",
+                "option_value": "1",
+            },
+            {
+                "optiongroup_id": "FAKE-OPTIONGROUP-ID",
+                "optiongroup_name": "Yes/No",
+                "option_name": "No",
+                "option_value": "0",
+            },
+        ]
+        assert fake_study.client.calls["export_option_groups"] == 1
+        assert fake_study.client.calls["all_field_optiongroups"] == 0
+
+    def test_export_sqlite_checkbox(self, tmp_path):
+        """Tests that the dummy columns of checkbox fields are stored as integers."""
+        study = CastorStudy("", "", "FAKE-ID", "", test=True)
+        study.client = FakeCastorClient()
+        study.client.structure[1]["Field Type"] = "checkbox"
+        study.client.structure[1]["Field Option Group"] = "FAKE-OPTIONGROUP-ID"
+        study.client.optiongroups.append(
+            {
+                "id": "FAKE-OPTIONGROUP-ID",
+                "name": "Symptoms",
+                "options": [
+                    {"id": "OPTION-ID1", "name": "Fever", "value": "1"},
+                    {"id": "OPTION-ID2", "name": "Cough", "value": "2"},
+                ],
+            }
+        )
+        study.client.add_record("110001", "30", "1;2")
+        study.client.add_record("110002", "40", "Missing (not done)")
+        path = study.export_to_database(tmp_path / "study.db")
+        with sqlite3.connect(path) as connection:
+            types = {
+                row[1]: row[2]
+                for row in connection.execute('PRAGMA table_info("Study")')
+            }
+            fever = [
+                row[0]
+                for row in connection.execute('SELECT "comment#Fever" FROM "Study"')
+            ]
+        connection.close()
+        assert types["comment#Fever"] == "INTEGER"
+        assert types["comment#Cough"] == "INTEGER"
+        assert fever == [1, -99]
+
+    def test_export_database_backends(self, fake_study, tmp_path, monkeypatch):
+        """Tests exporting to unknown backends and to DuckDB when it's not installed."""
+        with pytest.raises(CastorException) as e:
+            fake_study.export_to_database(tmp_path / "study.db", backend="postgres")
+        assert str(e.value) == "postgres is not a valid backend. Use sqlite/duckdb."
+        monkeypatch.setitem(sys.modules, "duckdb", None)
+        with pytest.raises(CastorException) as e:
+            fake_study.export_to_database(
+                tmp_path / "study.duckdb", remap=False, backend="duckdb"
+            )
+        assert str(e.value) == (
+            "Exporting to DuckDB requires duckdb, "
+            "install it with pip install castoredc_api[duckdb]."
+        )
+
+    def test_export_long(self, fake_study):
+        """Tests that the long export has a row per data point."""
+        dataframe = fake_study.export_long(remap=False)
+        assert list(dataframe.columns) == [
+            "record_id",
+            "form_type",
+            "form",
+            "instance_id",
+            "step",
+            "field",
+            "raw_value",
+            "value",
+            "filled_in",
+        ]
+        dataframe = dataframe.sort_values(["record_id", "field"], ignore_index=True)
+        assert dataframe["field"].tolist() == [
+            "age",
+            "comment",
+            "qol",
+            "ae_description",
+            "age",
+            "comment",
+        ]
+        assert dataframe["instance_id"].tolist()[2:4] == [
+            "SURVEY-INSTANCE-ID1",
+            "REPORT-INSTANCE-ID1",
+        ]
+        assert dataframe["raw_value"].tolist()[4] == "Missing (not done)"
+        assert dataframe["value"].tolist() == [
+            30,
+            "first",
+            7,
+            "Headache",
+            -99,
+            "second",
+        ]
+        assert (dataframe["filled_in"] == pd.Timestamp("2021-01-15 13:39:47")).all()
+
+    def test_export_delta(self, fake_study, tmp_path, monkeypatch):
+        """Tests that a delta export only writes the files that changed."""
+        monkeypatch.chdir(tmp_path)
+        previous = fake_study.export_to_csv(remap=False, delta=True)
+        fake_study.client.update_value("110001", "FAKE-FIELD-ID1", "31")
+        fake_study.client.add_record("110003", "50", "third")
+        paths = fake_study.export_to_csv(delta=True)
+        assert paths["Study"] != previous["Study"]
+        assert paths["Surveys"] == previous["Surveys"]
+        assert paths["Reports"] == previous["Reports"]
+        assert pd.read_csv(paths["Study"], sep=";")["age"].tolist() == [31, -99, 50]
+        first, second = [
+            json.loads(path.read_text(encoding="utf-8"))
+            for path in sorted((tmp_path / "output").glob("* FAKE-ID changes.json"))
+        ]
+        assert [change["status"] for change in first] == ["new", "new", "new"]
+        assert first[0]["added"] == ["110001", "110002"]
+        assert second == [
+            {
+                "form_type": "Study",
+                "name": "Study",
+                "status": "changed",
+                "added": ["110003"],
+                "changed": ["110001"],
+                "removed": [],
+            },
+            {
+                "form_type": "Survey",
+                "name": "QOL Survey",
+                "status": "unchanged",
+                "added": [],
+                "changed": [],
+                "removed": [],
+            },
+            {
+                "form_type": "Report",
+                "name": "Adverse Event",
+                "status": "unchanged",
+                "added": [],
+                "changed": [],
+                "removed": [],
+            },
+        ]
+        with pytest.raises(CastorException) as e:
+            fake_study.export_to_csv(remap=False, delta=True, chunk_size=10)
+        assert str(e.value) == "Delta exports can't be streamed, remove chunk_size."
+
+    def test_export_metrics(self, fake_study, tmp_path, monkeypatch, caplog):
+        """Tests that the phases of mapping and exporting are timed and emitted."""
+        monkeypatch.chdir(tmp_path)
+        events = []
+        fake_study.metrics = CastorMetrics(
+            logger=logging.getLogger("castoredc_api"), callback=events.append
+        )
+        with caplog.at_level(logging.INFO, logger="castoredc_api"):
+            fake_study.export_to_csv()
+        report = fake_study.metrics.report()
+        assert list(report["phases"]) == [
+            "map_structure",
+            "download_links",
+            "download_records",
+            "download_data",
+            "link_data",
+            "load_information",
+            "interpret",
+            "export_dataframes",
+            "write_files",
+        ]
+        assert report["phases"]["download_records"]["rows"] == 2
+        assert report["phases"]["download_data"]["rows"] == 10
+        assert report["phases"]["interpret"]["calls"] == 3
+        assert report["phases"]["export_dataframes"]["rows"] == 6
+        assert report["phases"]["write_files"]["rows"] == 6
+        assert len(events) == sum(phase["calls"] for phase in report["phases"].values())
+        assert events[-1]["phase"] == "write_files"
+        assert caplog.records[-1].getMessage().startswith("Phase write_files took ")
+        if sys.platform != "win32":
+            assert report["peak_memory"] > 0
+        fake_study.metrics.reset()
+        assert fake_study.metrics.report()["phases"] == {}
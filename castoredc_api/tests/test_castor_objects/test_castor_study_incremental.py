@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+"""
+Testing class for the incremental data mapping of the CastorStudy class.
+
+@author: R.C.A. van Linschoten
+https://orcid.org/0000-0003-3052-596X
+"""
+from datetime import date, datetime, timedelta, timezone
+
+import pandas as pd
+import pytest
+
+from castoredc_api.study.castor_study import CastorStudy
+from castoredc_api.tests.test_castor_objects.fake_client import FakeCastorClient
+
+
+class TestCastorStudyIncremental:
+    """Testing class for incremental data mapping."""
+
+    def test_incremental_changed_record(self, fake_study):
+        """Tests that only changed records are downloaded again."""
+        fake_study.client.update_value("110002", "FAKE-FIELD-ID1", "40")
+        fake_study.map_data(incremental=True)
+        assert fake_study.client.calls["export_study_data"] == 0
+        assert fake_study.client.calls["all_study_data_points_record"] == 1
+        assert (
+            fake_study.get_single_data_point("110002", "FAKE-STUDY-ID", "age").value
+            == 40
+        )
+        assert (
+            fake_study.get_single_data_point("110001", "FAKE-STUDY-ID", "age").value
+            == 30
+        )
+
+    def test_incremental_equals_full(self, fake_study):
+        """Tests that incremental mapping gives the same export as mapping all data."""
+        fake_study.client.update_value("110001", "FAKE-FIELD-ID2", "changed")
+        fake_study.client.update_value("110002", "FAKE-FIELD-ID4", "Nausea")
+        fake_study.client.add_record("110003", "50", "third")
+        fake_study.client.events.append(
+            {"event_type": "Record created", "event_details": {"Record ID": "110003"}}
+        )
+        fake_study.client.add_survey("110003", "SURVEY-INSTANCE-ID3", "9")
+        incremental = fake_study.export_to_dataframe(incremental=True)
+        full_study = CastorStudy("", "", "FAKE-ID", "", test=True)
+        full_study.client = fake_study.client
+        full = full_study.export_to_dataframe()
+        pd.testing.assert_frame_equal(incremental["Study"], full["Study"])
+        pd.testing.assert_frame_equal(
+            incremental["Surveys"]["QOL Survey"], full["Surveys"]["QOL Survey"]
+        )
+        pd.testing.assert_frame_equal(
+            incremental["Reports"]["Adverse Event"], full["Reports"]["Adverse Event"]
+        )
+        assert incremental["Study"]["comment"].tolist() == [
+            "changed",
+            "second",
+            "third",
+        ]
+        assert incremental["Surveys"]["QOL Survey"]["qol"].dropna().tolist() == [7, 9]
+        assert incremental["Reports"]["Adverse Event"][
+            "ae_description"
+        ].dropna().tolist() == ["Nausea"]
+
+    def test_incremental_server_time(self, fake_study):
+        """Tests that the audit trail is read from the day before the last mapping
+        until the day after now, on the time of the server."""
+        fake_study.client.server_time = datetime(
+            2021, 1, 15, 23, 30, tzinfo=timezone.utc
+        )
+        fake_study.map_data()
+        assert fake_study.mapped_on == fake_study.client.server_time
+        fake_study.map_data(incremental=True)
+        date_from, date_to = fake_study.client.audit_trail_dates
+        assert date_from.date() == date(2021, 1, 14)
+        assert date_to.date() == datetime.now(timezone.utc).date() + timedelta(days=1)
+
+    def test_incremental_structure_change(self, fake_study):
+        """Tests that a change in the structure maps all data."""
+        fake_study.client.events.append(
+            {"event_type": "Field created", "event_details": {"Field ID": "NEW"}}
+        )
+        fake_study.map_data(incremental=True)
+        assert fake_study.client.calls["export_study_data"] == 1
+        assert fake_study.client.calls["audit_trail"] == 1
+
+    def test_incremental_unknown_event(self, fake_study):
+        """Tests that an unknown change without a record maps all data."""
+        fake_study.client.events.append(
+            {"event_type": "Institute updated", "event_details": {"Name": "Test"}}
+        )
+        fake_study.map_data(incremental=True)
+        assert fake_study.client.calls["export_study_data"] == 1
+
+    def test_incremental_harmless_event(self, fake_study):
+        """Tests that a change without a record that can't change data is skipped."""
+        fake_study.client.events.append(
+            {"event_type": "User logged in", "event_details": {"User": "Test"}}
+        )
+        fake_study.map_data(incremental=True)
+        assert fake_study.client.calls["export_study_data"] == 0
+
+    @pytest.mark.parametrize(
+        "event_details",
+        [
+            [{"Field ID": "FAKE-FIELD-ID2"}, {"record_id": "110001"}],
+            {"data_point": {"field_id": "FAKE-FIELD-ID2", "participant_id": "110001"}},
+            {"changes": [{"old": "first"}, {"record": {"Record ID": "110001"}}]},
+        ],
+    )
+    def test_incremental_event_details(self, fake_study, event_details):
+        """Tests that records are found in list-shaped and nested event details."""
+        fake_study.client.update_value("110001", "FAKE-FIELD-ID2", "changed")
+        fake_study.client.events[-1]["event_details"] = event_details
+        fake_study.map_data(incremental=True)
+        assert fake_study.client.calls["export_study_data"] == 0
+        assert fake_study.client.calls["all_study_data_points_record"] == 1
+        assert (
+            fake_study.get_single_data_point("110001", "FAKE-STUDY-ID", "comment").value
+            == "changed"
+        )
+
+    def test_incremental_first_mapping(self):
+        """Tests that the first incremental mapping maps all data."""
+        study = CastorStudy("", "", "FAKE-ID", "", test=True)
+        study.client = FakeCastorClient()
+        study.client.add_record("110001", "30", "first")
+        study.map_data(incremental=True)
+        assert study.client.calls["export_study_data"] == 1
+        assert study.client.calls["audit_trail"] == 0
+        assert study.mapped_on is not None
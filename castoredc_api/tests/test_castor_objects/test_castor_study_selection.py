@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+"""
+Testing class for mapping a selection of the data of the CastorStudy class.
+
+@author: R.C.A. van Linschoten
+https://orcid.org/0000-0003-3052-596X
+"""
+import pytest
+
+from castoredc_api import CastorException
+from castoredc_api.tests.test_castor_objects.fake_client import FakeCastorClient
+
+
+@pytest.fixture(scope="function")
+def fake_client() -> FakeCastorClient:
+    """Creates an offline client with ten records in two institutes."""
+    client = FakeCastorClient()
+    for number in range(1, 11):
+        client.add_record(
+            f"1100{number:02}",
+            str(number * 10),
+            f"record {number}",
+            institute="Other Institute" if number in (4, 5) else "Test Institute",
+        )
+        client.add_survey(f"1100{number:02}", f"SURVEY-INSTANCE-ID{number}", "7")
+        client.add_report(f"1100{number:02}", f"REPORT-INSTANCE-ID{number}", "Flu")
+    client.add_report("110001", "REPORT-INSTANCE-ID11", None)
+    return client
+
+
+class TestCastorStudySelection:
+    """Testing class for mapping a selection of the study."""
+
+    def test_select_records(self, fake_study):
+        """Tests that a small selection of records is downloaded per record."""
+        fake_study.map_data(records=["110001", "110004"])
+        assert fake_study.client.calls["export_study_data"] == 0
+        assert fake_study.client.calls["all_data_points_records"] == 3
+        assert fake_study.client.calls["all_study_data_points_record"] == 2
+        assert [record.record_id for record in fake_study.get_all_records()] == [
+            "110001",
+            "110004",
+        ]
+        assert fake_study.get_single_record("110004").institute == "Other Institute"
+        dataframes = fake_study.export_to_dataframe(remap=False)
+        assert dataframes["Study"]["age"].tolist() == [10, 40]
+        assert dataframes["Surveys"]["QOL Survey"]["record_id"].tolist() == [
+            "110001",
+            "110004",
+        ]
+        assert sorted(dataframes["Reports"]["Adverse Event"]["custom_name"]) == [
+            "AE REPORT-INSTANCE-ID1",
+            "AE REPORT-INSTANCE-ID11",
+            "AE REPORT-INSTANCE-ID4",
+        ]
+
+    def test_select_institutes(self, fake_study):
+        """Tests selecting the records of institutes on name and id."""
+        fake_study.map_data(institutes=["Other Institute"])
+        assert list(fake_study.records) == ["110004", "110005"]
+        fake_study.map_data(institutes=["TEST INSTITUTE-ID"])
+        assert len(fake_study.records) == 8
+
+    def test_select_large(self, fake_study):
+        """Tests that a large selection of records is exported and filtered."""
+        fake_study.map_data(records=["110001", "110002", "110003", "110004"])
+        assert fake_study.client.calls["export_study_data"] == 1
+        assert fake_study.client.calls["all_data_points_records"] == 0
+        assert list(fake_study.records) == ["110001", "110002", "110003", "110004"]
+        assert fake_study.export_to_dataframe(remap=False)["Study"]["age"].tolist() == [
+            10,
+            20,
+            30,
+            40,
+        ]
+
+    def test_select_forms(self, fake_study):
+        """Tests that only data and auxiliary data of selected forms are mapped."""
+        fake_study.map_data(records=["110002"], forms=["FAKE-SURVEY-ID"])
+        assert fake_study.client.calls["all_data_points_records"] == 1
+        assert fake_study.client.calls["all_survey_data_points_record"] == 1
+        assert [
+            instance.instance_id
+            for instance in fake_study.get_single_record(
+                "110002"
+            ).get_all_form_instances()
+        ] == ["SURVEY-INSTANCE-ID2"]
+        survey = fake_study.get_single_form_instance_on_id(
+            "110002", "SURVEY-INSTANCE-ID2"
+        )
+        assert survey.survey_package_name == "QOL Package"
+
+    def test_select_forms_export(self, fake_study):
+        """Tests that the export data is filtered on selected forms."""
+        fake_study.map_data(forms=["Adverse Event"])
+        assert fake_study.client.calls["export_study_data"] == 1
+        assert fake_study.client.calls["all_survey_package_instances"] == 0
+        assert len(fake_study.records) == 10
+        assert {
+            instance.instance_type for instance in fake_study.get_all_form_instances()
+        } == {"Report"}
+        assert len(fake_study.get_all_form_instances()) == 11
+
+    def test_select_incremental(self, fake_study):
+        """Tests that incremental mapping keeps the selection."""
+        fake_study.map_data(records=["110001"])
+        fake_study.client.update_value("110001", "FAKE-FIELD-ID1", "11")
+        fake_study.client.update_value("110002", "FAKE-FIELD-ID1", "21")
+        fake_study.client.calls.clear()
+        fake_study.map_data(incremental=True, records=["110001"])
+        assert fake_study.client.calls["export_study_data"] == 0
+        assert fake_study.client.calls["all_study_data_points_record"] == 1
+        assert list(fake_study.records) == ["110001"]
+        assert (
+            fake_study.get_single_data_point("110001", "FAKE-STUDY-ID", "age").value
+            == 11
+        )
+
+    def test_select_not_found(self, fake_study):
+        """Tests selecting records and forms that don't exist."""
+        with pytest.raises(CastorException) as e:
+            fake_study.map_data(records=["110099"])
+        assert str(e.value) == "Record 110099 does not exist."
+        with pytest.raises(CastorException) as e:
+            fake_study.map_data(forms=["Follow-up"])
+        assert str(e.value) == "Form Follow-up does not exist."
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+"""
+Testing class for saving and loading snapshots of the CastorStudy class.
+
+@author: R.C.A. van Linschoten
+https://orcid.org/0000-0003-3052-596X
+"""
+import json
+
+import pandas as pd
+import pytest
+
+from castoredc_api import CastorException
+from castoredc_api.study.castor_study import CastorStudy
+
+
+@pytest.fixture(scope="function")
+def format_options() -> dict:
+    """Format options of the study, which snapshots keep."""
+    return {"date": "%B %e %Y"}
+
+
+class TestCastorStudySnapshot:
+    """Testing class for snapshots of a study."""
+
+    def test_snapshot_export(self, fake_study, tmp_path):
+        """Tests that a loaded snapshot exports the same data as the mapped study."""
+        fake_study.save_snapshot(tmp_path / "snapshot")
+        loaded = CastorStudy.load_snapshot(tmp_path / "snapshot")
+        assert loaded.storage == fake_study.storage
+        assert loaded.configuration == fake_study.configuration
+        assert loaded.mapped_on == fake_study.mapped_on
+        original = fake_study.export_to_dataframe(remap=False)
+        exported = loaded.export_to_dataframe(remap=False)
+        pd.testing.assert_frame_equal(original["Study"], exported["Study"])
+        for form_type in ["Surveys", "Reports"]:
+            assert original[form_type].keys() == exported[form_type].keys()
+            for name, dataframe in original[form_type].items():
+                pd.testing.assert_frame_equal(dataframe, exported[form_type][name])
+
+    def test_snapshot_objects(self, fake_study, tmp_path):
+        """Tests that the structure and data of the study are restored."""
+        fake_study.save_snapshot(tmp_path)
+        loaded = CastorStudy.load_snapshot(tmp_path)
+        assert [field.field_id for field in loaded.get_all_fields()] == [
+            field.field_id for field in fake_study.get_all_fields()
+        ]
+        assert loaded.get_single_field("age").field_min == float("-inf")
+        assert [record.record_id for record in loaded.get_all_records()] == [
+            "110001",
+            "110002",
+        ]
+        assert len(loaded.get_all_form_instances()) == 6
+        assert (
+            loaded.get_single_data_point("110002", "FAKE-STUDY-ID", "age").value == -99
+        )
+        survey = loaded.get_single_form_instance_on_id("110001", "SURVEY-INSTANCE-ID1")
+        assert survey.survey_package_name == "QOL Package"
+        assert survey.progress == 100
+        report = loaded.get_single_form_instance_on_id("110002", "REPORT-INSTANCE-ID2")
+        assert report.parent == "Baseline"
+        assert report.get_all_data_points() == []
+
+    def test_snapshot_incremental(self, fake_study, tmp_path):
+        """Tests that a loaded snapshot can be mapped incrementally,
+        as the state of the last mapping is saved with it."""
+        fake_study.save_snapshot(tmp_path)
+        loaded = CastorStudy.load_snapshot(tmp_path)
+        assert loaded.mapped_on == fake_study.mapped_on
+        assert loaded.mapped_archived == fake_study.mapped_archived
+        assert loaded.mapped_selection == fake_study.mapped_selection
+        loaded.client = fake_study.client
+        loaded.client.calls.clear()
+        loaded.client.update_value("110001", "FAKE-FIELD-ID2", "changed")
+        exported = loaded.export_to_dataframe(incremental=True)
+        assert loaded.client.calls["export_study_data"] == 0
+        assert exported["Study"]["comment"].tolist() == ["changed", "second"]
+
+    def test_snapshot_not_mapped(self, tmp_path):
+        """Tests that only mapped studies can be saved."""
+        study = CastorStudy("", "", "FAKE-ID", "", test=True)
+        with pytest.raises(CastorException) as e:
+            study.save_snapshot(tmp_path)
+        assert str(e.value) == "Map the study data before saving a snapshot."
+        with pytest.raises(CastorException) as e:
+            study.export_to_dataframe(remap=False)
+        assert str(e.value) == "No data mapped, export with remap=True."
+
+    def test_snapshot_version(self, fake_study, tmp_path):
+        """Tests that snapshots of other versions are not loaded."""
+        fake_study.save_snapshot(tmp_path)
+        metadata = json.loads((tmp_path / "metadata.json").read_text())
+        metadata["snapshot_version"] = 0
+        (tmp_path / "metadata.json").write_text(json.dumps(metadata))
+        with pytest.raises(CastorException) as e:
+            CastorStudy.load_snapshot(tmp_path)
+        assert str(e.value) == f"{tmp_path} is not a snapshot of version 1."
@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+"""
+Testing class for mapping the structure components of the CastorStudy class.
+
+@author: R.C.A. van Linschoten
+https://orcid.org/0000-0003-3052-596X
+"""
+import math
+
+import pytest
+
+from castoredc_api import CastorException
+from castoredc_api.study.castor_study import CastorStudy
+
+
+class TestCastorStudyStructure:
+    """Testing class for loading the structure components of a study."""
+
+    def test_structure_all(self, fake_study):
+        """Tests that all components are downloaded by default."""
+        fake_study.map_structure()
+        for endpoint in [
+            "export_study_structure",
+            "all_fields",
+            "all_field_dependencies",
+            "all_survey_packages",
+        ]:
+            assert fake_study.client.calls[endpoint] == 1
+        # Optiongroups are taken from the field data
+        assert sum(fake_study.client.calls.values()) == 4
+        assert fake_study.pending_components == set()
+
+    def test_structure_lazy(self, fake_study):
+        """Tests that skipped components are downloaded once on first access."""
+        fake_study.map_structure(components=[])
+        assert sum(fake_study.client.calls.values()) == 1
+        field = fake_study.get_single_field("age")
+        assert field.field_min == -math.inf
+        assert field.field_max == math.inf
+        assert fake_study.client.calls["all_fields"] == 1
+        assert fake_study.client.calls["all_field_dependencies"] == 0
+        assert field.field_dependency is None
+        assert fake_study.client.calls["all_field_dependencies"] == 1
+        assert fake_study.get_single_survey_package("QOL Package")["id"] == (
+            "FAKE-PACKAGE-ID"
+        )
+        assert fake_study.get_single_optiongroup("FAKE-OPTIONGROUP-ID") is None
+        assert fake_study.get_single_field("comment").field_dependency is None
+        assert sum(fake_study.client.calls.values()) == 4
+        assert fake_study.pending_components == set()
+
+    def test_structure_selection(self, fake_study):
+        """Tests that only the selected components are downloaded."""
+        fake_study.map_structure(components=["optiongroups", "survey_packages"])
+        assert fake_study.client.calls["export_option_groups"] == 1
+        assert fake_study.client.calls["all_survey_packages"] == 1
+        assert fake_study.client.calls["all_fields"] == 0
+        assert fake_study.pending_components == {"fields", "dependencies"}
+
+    def test_structure_map_data(self, fake_study, tmp_path):
+        """Tests that mapping data only downloads the optiongroups,
+        and that snapshots load the other components."""
+        fake_study.map_data()
+        assert fake_study.client.calls["export_option_groups"] == 1
+        assert fake_study.client.calls["all_fields"] == 0
+        fake_study.save_snapshot(tmp_path)
+        assert fake_study.client.calls["all_fields"] == 1
+        loaded = CastorStudy.load_snapshot(tmp_path)
+        assert loaded.get_single_field("age").field_max == math.inf
+        assert loaded.get_single_survey_package("QOL Package") is not None
+
+    def test_structure_survey_packages(self, fake_study):
+        """Tests that the survey packages are downloaded when first iterated."""
+        fake_study.map_data()
+        assert fake_study.client.calls["all_survey_packages"] == 0
+        assert list(fake_study.all_survey_packages) == ["QOL Package"]
+        assert fake_study.client.calls["all_survey_packages"] == 1
+        assert fake_study.get_single_survey_package("QOL Package") is not None
+        assert fake_study.client.calls["all_survey_packages"] == 1
+
+    def test_structure_optiongroups(self, fake_study):
+        """Tests that optiongroups from the export and from the field data are equal,
+        without downloading the paginated optiongroups."""
+        fake_study.client.optiongroups.append(
+            {
+                "id": "FAKE-OPTIONGROUP-ID",
+                "name": "Yes/No",
+                "options": [
+                    {"id": "OPTION-ID1", "name": "Yes", "value": "1"},
+                    {"id": "OPTION-ID2", "name": "No", "value": "0"},
+                ],
+            }
+        )
+        fake_study.client.structure[0]["Field Option Group"] = "FAKE-OPTIONGROUP-ID"
+        fake_study.map_structure(components=["optiongroups"])
+        exported = fake_study.get_single_optiongroup_lookup("FAKE-OPTIONGROUP-ID")
+        fake_study.map_structure(components=["fields", "optiongroups"])
+        embedded = fake_study.get_single_optiongroup_lookup("FAKE-OPTIONGROUP-ID")
+        assert (
+            exported.value_to_name
+            == embedded.value_to_name
+            == {
+                "1": "Yes",
+                "0": "No",
+            }
+        )
+        assert exported.option_names == embedded.option_names == ("Yes", "No")
+        assert fake_study.client.calls["export_option_groups"] == 1
+        assert fake_study.client.calls["all_field_optiongroups"] == 0
+
+    def test_structure_optiongroups_shape(self, fake_study):
+        """Tests that public optiongroups have the shape returned by the API,
+        whether the lookups were loaded from the export or from the field data."""
+        optiongroup = {
+            "id": "FAKE-OPTIONGROUP-ID",
+            "name": "Yes/No",
+            "description": "",
+            "layout": False,
+            "options": [
+                {"id": "OPTION-ID2", "name": "No", "value": "0", "groupOrder": 1},
+                {"id": "OPTION-ID1", "name": "Yes", "value": "1", "groupOrder": 0},
+            ],
+        }
+        fake_study.client.optiongroups.append(optiongroup)
+        fake_study.client.structure[0]["Field Option Group"] = "FAKE-OPTIONGROUP-ID"
+        fake_study.map_structure(components=["optiongroups"])
+        assert fake_study.client.calls["all_field_optiongroups"] == 0
+        exported = fake_study.get_single_optiongroup("FAKE-OPTIONGROUP-ID")
+        assert fake_study.client.calls["all_field_optiongroups"] == 1
+        fake_study.map_structure(components=["fields"])
+        embedded = fake_study.get_single_optiongroup("FAKE-OPTIONGROUP-ID")
+        assert exported == embedded == optiongroup
+        assert list(fake_study.optiongroups) == ["FAKE-OPTIONGROUP-ID"]
+        assert fake_study.client.calls["all_field_optiongroups"] == 1
+
+    def test_structure_unknown(self, fake_study):
+        """Tests that unknown components raise an error."""
+        with pytest.raises(CastorException) as e:
+            fake_study.map_structure(components=["forms"])
+        assert str(e.value) == (
+            "forms is not a structure component. "
+            "Choose from fields, dependencies, optiongroups, survey_packages."
+        )
@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+"""
+Testing class for the column-wise interpretation of data point values.
+
+@author: R.C.A. van Linschoten
+https://orcid.org/0000-0003-3052-596X
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from castoredc_api import CastorException
+from castoredc_api.study.castor_objects.castor_data_point import CastorDataPoint
+from castoredc_api.study.data_interpretation import (
+    CHECKBOX_DTYPE,
+    checkbox_dummies,
+    interpret_column,
+    interpret_numberdate,
+    user_missing_type,
+)
+
+MISSINGS = [
+    "",
+    "Missing (measurement failed)",
+    "Missing (not applicable)",
+    "Missing (not asked)",
+    "Missing (asked but unknown)",
+    "Missing (not done)",
+    "Missing (unknown reason)",
+]
+
+
+class TestColumnInterpretation:
+    """Testing class for column interpretation unit tests."""
+
+    @pytest.mark.parametrize(
+        "field_type, values",
+        [
+            ("checkbox", []),
+            ("numeric", ["12", "12.5", "-3"]),
+            ("year", ["1998", "2021"]),
+            ("string", ["test", "Missing"]),
+            ("datetime", ["12-05-2020;07:30", "11-05-2020", "01-01-1500;12:00"]),
+            ("date", ["12-05-2020", "31-12-1500"]),
+            ("time", ["09:25", "23:59"]),
+            ("numberdate", ["5;12-05-2020", ";12-05-2020", "2.5;01-01-1500"]),
+        ],
+    )
+    def test_column_equals_data_points(self, missing_data_study, field_type, values):
+        """Tests that a column is interpreted the same as separate data points."""
+        field_id = f"MISSING-{field_type}-ID"
+        raw_values = MISSINGS + values
+        expected = pd.Series(
+            [
+                CastorDataPoint(
+                    field_id, raw_value, missing_data_study, "2021-01-15 13:39:47"
+                ).value
+                for raw_value in raw_values
+            ]
+            + [np.nan],
+            dtype=object,
+        )
+        column = interpret_column(
+            pd.Series(raw_values + [np.nan], dtype=object),
+            missing_data_study.get_single_field(field_id),
+            missing_data_study,
+        )
+        pd.testing.assert_series_equal(column.astype(object), expected)
+
+    def test_column_formatting(self, missing_data_study):
+        """Tests that the configured date format is used."""
+        missing_data_study.configuration["date"] = "%B %d %Y"
+        try:
+            column = interpret_column(
+                pd.Series(["12-05-2020", "Missing (not done)"], dtype=object),
+                missing_data_study.get_single_field("MISSING-date-ID"),
+                missing_data_study,
+            )
+        finally:
+            missing_data_study.configuration["date"] = "%d-%m-%Y"
+        assert column.tolist() == ["May 12 2020", "January 01 2999"]
+
+    def test_column_optiongroup_not_found(self, missing_data_study):
+        """Tests that filled in optiongroup values need a loaded optiongroup."""
+        with pytest.raises(CastorException) as e:
+            interpret_column(
+                pd.Series(["1", ""], dtype=object),
+                missing_data_study.get_single_field("MISSING-checkbox-ID"),
+                missing_data_study,
+            )
+        assert (
+            str(e.value)
+            == "Optiongroup not found. Is id correct and are optiongroups loaded?"
+        )
+
+    def test_missing_dates_cached(self, missing_data_study):
+        """Tests that user missing dates are created once per format."""
+        missing_dates = missing_data_study.get_missing_dates("D", "%d-%m-%Y")
+        assert missing_dates == {
+            "measurement failed": "01-01-2995",
+            "not applicable": "01-01-2996",
+            "not asked": "01-01-2997",
+            "asked but unknown": "01-01-2998",
+            "not done": "01-01-2999",
+        }
+        assert missing_data_study.get_missing_dates("D", "%d-%m-%Y") is missing_dates
+        assert missing_data_study.get_missing_dates("D", "%Y")["not done"] == "2999"
+
+    @pytest.mark.parametrize(
+        "raw_value, missing_type",
+        [
+            ("Missing (not asked)", "not asked"),
+            ("Missing (asked but unknown)", "asked but unknown"),
+            ("User Missing: not done", "not done"),
+            ("Missing (unknown reason)", None),
+        ],
+    )
+    def test_user_missing_type(self, raw_value, missing_type):
+        """Tests recognizing the user missing type of a raw value."""
+        assert user_missing_type(raw_value) == missing_type
+
+    def test_checkbox_dummies(self):
+        """Tests creating the dummy columns of an interpreted checkbox column."""
+        dummies = checkbox_dummies(
+            pd.Series(
+                ["Yes|Maybe", "No", "", "not done", np.nan, "Yes", "Unknown"],
+                dtype=object,
+            ),
+            ("Yes", "No", "Maybe"),
+        )
+        assert [dummy.tolist() for dummy in dummies] == [
+            [1, 0, 0, -99, 0, 1, 0],
+            [0, 1, 0, -99, 0, 0, 0],
+            [1, 0, 0, -99, 0, 0, 0],
+        ]
+        assert all(dummy.dtype == CHECKBOX_DTYPE for dummy in dummies)
+
+    def test_numberdate_columns(self, missing_data_study):
+        """Tests that numberdate data is split up in a number and a date column."""
+        numbers, dates = interpret_numberdate(
+            pd.Series(
+                ["5;12-05-2020", "", "Missing (not done)", ";01-01-2000", np.nan],
+                dtype=object,
+            ),
+            missing_data_study,
+        )
+        assert numbers.isna().tolist() == [False, True, False, True, True]
+        assert numbers.dropna().tolist() == [5.0, -99]
+        assert dates.isna().tolist() == [False, True, False, False, True]
+        assert dates.dropna().tolist() == ["12-05-2020", "01-01-2999", "01-01-2000"]
@@ -1,11 +1,15 @@
+import asyncio
 import json
+import re
 import secrets
 import sys
+from datetime import datetime, timezone
 
 import httpx
 import pytest
-from castoredc_api import CastorClient
+from castoredc_api import CastorClient, CastorMetrics
 from pytest_httpx import HTTPXMock
+from ratelimiter import RateLimiter
 
 if sys.version_info >= (3, 8):
     from importlib import metadata as pkg_metadata
@@ -53,3 +57,168 @@ def test_client_sets_correct_user_agent(httpx_mock, mock_auth):
         httpx_mock.get_request().headers["user-agent"]
         == f"python-castoredc_api/{pkg_metadata.version('castoredc_api')}"
     )
+
+
+def test_all_data_points_records(httpx_mock, mock_auth):
+    client = CastorClient(
+        "DUMMY_CLIENT_ID", "DUMMY_CLIENT_SECRET", "data.castoredc.com"
+    )
+    client.link_study("FAKE-STUDY-ID")
+    record_ids = [f"1100{number:02}" for number in range(20)]
+    for record_id in record_ids:
+        httpx_mock.add_response(
+            url=f"https://data.castoredc.com/api/study/FAKE-STUDY-ID/record/{record_id}"
+            f"/data-point-collection/study",
+            json={"_embedded": {"items": [{"record_id": record_id}]}},
+        )
+
+    data_points = client.all_data_points_records(record_ids, "study")
+
+    assert list(data_points) == record_ids
+    assert all(
+        data_points[record_id] == [{"record_id": record_id}] for record_id in record_ids
+    )
+
+
+def test_all_data_points_records_running_loop(httpx_mock, mock_auth):
+    client = CastorClient(
+        "DUMMY_CLIENT_ID", "DUMMY_CLIENT_SECRET", "data.castoredc.com"
+    )
+    client.link_study("FAKE-STUDY-ID")
+    client.sync_rate_limiter = RateLimiter(max_calls=600, period=600)
+    record_ids = [f"1100{number:02}" for number in range(5)]
+    for record_id in record_ids:
+        httpx_mock.add_response(
+            url=f"https://data.castoredc.com/api/study/FAKE-STUDY-ID/record/{record_id}"
+            f"/data-point-collection/study",
+            json={"_embedded": {"items": [{"record_id": record_id}]}},
+        )
+
+    async def in_running_loop():
+        # E.g. in Jupyter, where the records are downloaded one by one
+        return client.all_data_points_records(record_ids, "study")
+
+    data_points = asyncio.run(in_running_loop())
+
+    assert list(data_points) == record_ids
+    assert len(client.sync_rate_limiter.calls) == len(record_ids)
+
+
+def test_client_metrics(httpx_mock, mock_auth):
+    """Counts the requests and downloaded bytes of synchronous and async requests."""
+    metrics = CastorMetrics()
+    client = CastorClient(
+        "DUMMY_CLIENT_ID", "DUMMY_CLIENT_SECRET", "data.castoredc.com", metrics=metrics
+    )
+    client.link_study("FAKE-STUDY-ID")
+    record_ids = ["110001", "110002"]
+    for record_id in record_ids:
+        httpx_mock.add_response(
+            url=f"https://data.castoredc.com/api/study/FAKE-STUDY-ID/record/{record_id}"
+            f"/data-point-collection/study",
+            json={"_embedded": {"items": [{"record_id": record_id}]}},
+        )
+
+    client.all_data_points_records(record_ids, "study")
+
+    assert metrics.requests == 3
+    # The token of the mock_auth response has a fixed length
+    token = httpx.Response(
+        status_code=200,
+        json={
+            "access_token": secrets.token_hex(32),
+            "expires_in": 18000,
+            "token_type": "Bearer",
+            "scope": "default",
+        },
+    )
+    assert metrics.bytes_downloaded == len(token.content) + sum(
+        len(
+            httpx.Response(
+                status_code=200,
+                json={"_embedded": {"items": [{"record_id": record_id}]}},
+            ).content
+        )
+        for record_id in record_ids
+    )
+
+
+def test_optiongroup_requests(httpx_mock, mock_auth):
+    """Counts the requests to download the optiongroups of a large study."""
+    client = CastorClient(
+        "DUMMY_CLIENT_ID", "DUMMY_CLIENT_SECRET", "data.castoredc.com"
+    )
+    client.link_study("FAKE-STUDY-ID")
+    optiongroups = [
+        {
+            "id": f"OPTIONGROUP-ID{number}",
+            "name": f"Optiongroup {number}",
+            "options": [
+                {"id": f"OPTION-ID{number}-{value}", "name": f"Option {value}"}
+                for value in range(3)
+            ],
+        }
+        for number in range(2500)
+    ]
+
+    def optiongroup_page(request: httpx.Request):
+        page = int(request.url.params["page"])
+        return httpx.Response(
+            status_code=200,
+            json={
+                "page_count": 3,
+                "_embedded": {
+                    "fieldOptionGroups": optiongroups[(page - 1) * 1000 : page * 1000]
+                },
+            },
+        )
+
+    httpx_mock.add_callback(
+        url=re.compile(
+            r"https://data.castoredc.com/api/study/FAKE-STUDY-ID/field-optiongroup.*"
+        ),
+        callback=optiongroup_page,
+    )
+    rows = [
+        f"FAKE-STUDY-ID;{group['id']};{group['name']};{option['id']};{option['name']};1"
+        for group in optiongroups
+        for option in group["options"]
+    ]
+    httpx_mock.add_response(
+        url="https://data.castoredc.com/api/study/FAKE-STUDY-ID/export/optiongroups",
+        headers={"content-type": "text/csv"},
+        content="\n".join(
+            [
+                "Study ID;Option Group Id;Option Group Name;Option Id;Option Name;"
+                "Option Value"
+            ]
+            + rows
+        ).encode(),
+    )
+
+    assert len(client.all_field_optiongroups()) == 2500
+    paginated = len(httpx_mock.get_requests()) - 1
+    assert len(client.export_option_groups()) == 7500
+    exported = len(httpx_mock.get_requests()) - 1 - paginated
+
+    assert paginated == 3
+    assert exported == 1
+
+
+def test_audit_trail_pages(httpx_mock, mock_auth):
+    """Tests that all pages of the audit trail are returned."""
+    client = CastorClient(
+        "DUMMY_CLIENT_ID", "DUMMY_CLIENT_SECRET", "data.castoredc.com"
+    )
+    client.link_study("STUDY-ID")
+    for page, items in enumerate(
+        [[{"event_type": "first"}], [{"event_type": "second"}]]
+    ):
+        httpx_mock.add_response(
+            url=re.compile(f".*/audit-trail.*page={page + 1}(&|$).*"),
+            json={"items": items, "page_count": 2},
+            headers={"Date": "Fri, 15 Jan 2021 13:39:47 GMT"},
+        )
+    events = client.audit_trail("2021-01-01", "2021-01-15")
+    assert [event["event_type"] for event in events] == ["first", "second"]
+    assert client.server_time == datetime(2021, 1, 15, 13, 39, 47, tzinfo=timezone.utc)
@@ -16,6 +16,7 @@ setup(
     install_requires=[
         "pandas>=1.4.3",
         "numpy>=1.23.2",
+        "pyarrow>=7.0.0",
         "openpyxl>=3.0.9",
         "tqdm>=4.64.0",
         "httpx>=0.23.0",
@@ -24,6 +25,7 @@ setup(
         # "importlib-metadata" package provides it for older Python versions.
         'importlib-metadata >= 1.0 ; python_version < "3.8"',
     ],
+    extras_require={"duckdb": ["duckdb>=0.8.0"]},
     tests_require=["pytest", "pytest-httpx"],
     license="MIT",
     long_description=long_description,